@@ -1,6 +1,7 @@
 from flask import Flask, request, jsonify
 from flask_cors import CORS
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event, or_, and_, text
 from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime
 import os
@@ -14,7 +15,8 @@ from PIL import Image
 import pyttsx3
 import threading
 import time
-from models_enhanced_people import EnhancedPeopleDetectionPipeline
+import atexit
+import multiprocessing
 
 # Load environment variables
 load_dotenv()
@@ -26,11 +28,32 @@ CORS(app)
 # Add current directory to path for config import
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 from config import Config
+from zones import load_zone_config
+from state_snapshot import PeriodicSnapshotter
+from reference_background import ReferenceBackgroundStore
+from frame_ingest import BINARY_FRAME_TYPES, decode_frame
+from stream_protocol import parse_frame_message, pack_result, pack_error, pack_dropped
+from pipeline_registry import PipelineRegistry, normalize_camera_id
+from detection_workers import DetectionWorkerPool, build_camera_pipeline
+from video_sources import VideoSourceManager, validate_source_uri
+from batch_analysis import BatchJobManager
+from frame_clock import monotonic_now, ingest_frame_timestamp
+from write_behind import WriteBehindBuffer
+from event_store import insert_event_rows, upsert_daily_stats, merge_duplicate_daily_stats
+from event_log_query import parse_event_query, encode_cursor, count_key, CountCache
+
+try:
+    from flask_sock import Sock
+except ImportError:
+    Sock = None
 app.config['SQLALCHEMY_DATABASE_URI'] = Config.SQLALCHEMY_DATABASE_URI
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = Config.SQLALCHEMY_TRACK_MODIFICATIONS
 
 db = SQLAlchemy(app)
 
+# Optional WebSocket streaming channel (requires flask-sock)
+sock = Sock(app) if Sock is not None else None
+
 # Database Models
 class Admin(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -45,6 +68,12 @@ class EventLog(db.Model):
     confidence = db.Column(db.Float, nullable=False)
     timestamp = db.Column(db.DateTime, default=datetime.utcnow)
     image_path = db.Column(db.String(255))
+    
+    # Keyset pagination walks these newest-first; id breaks timestamp ties
+    __table_args__ = (
+        db.Index('ix_event_log_timestamp', 'timestamp', 'id'),
+        db.Index('ix_event_log_type_timestamp', 'event_type', 'timestamp', 'id'),
+    )
 
 class DetectionStats(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -54,16 +83,59 @@ class DetectionStats(db.Model):
     face_cover_violations = db.Column(db.Integer, default=0)
     loitering_events = db.Column(db.Integer, default=0)
     posture_violations = db.Column(db.Integer, default=0)
+    
+    # Conflict target of the daily-stats upsert
+    __table_args__ = (
+        db.Index('ux_detection_stats_date', 'date', unique=True),
+    )
+
+# SQLite: WAL lets the flusher write while API requests read, and synchronous=NORMAL
+# fsyncs at checkpoints instead of on every commit
+if app.config['SQLALCHEMY_DATABASE_URI'].startswith('sqlite'):
+    with app.app_context():
+        @event.listens_for(db.engine, 'connect')
+        def set_sqlite_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            cursor.execute('PRAGMA journal_mode=WAL')
+            cursor.execute('PRAGMA synchronous=NORMAL')
+            cursor.close()
+
+def flush_detection_events(events, stats):
+    """Write-behind flush: buffered events in one transaction (stats are flushed separately)"""
+    with app.app_context():
+        try:
+            insert_event_rows(db.session.connection(), events, EventLog.__table__)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+def flush_detection_stats(stats):
+    """Write-behind flush: summed daily stats in their own transaction"""
+    with app.app_context():
+        try:
+            upsert_daily_stats(db.session.connection(), stats, DetectionStats.__table__)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+# Alerts and counters are buffered and written in bulk by a background flusher;
+# a failing stats upsert is retried on its own and never holds back event logging
+write_buffer = WriteBehindBuffer(flush_detection_events,
+                                 interval=Config.WRITE_FLUSH_INTERVAL_MS / 1000.0,
+                                 max_records=Config.WRITE_FLUSH_MAX_RECORDS,
+                                 flush_stats=flush_detection_stats)
 
 # Initialize TTS engine
 tts_engine = pyttsx3.init()
 tts_engine.setProperty('rate', 150)
 tts_engine.setProperty('volume', 0.8)
 
-# Global variables for detection pipeline
-detection_pipeline = None
+# Global variables for detection pipelines
 alert_counters = {}
-helmet_alert_timer = {}  # Track helmet alert timing
+helmet_alert_timer = {}  # Track helmet alert timing per camera
+decode_stats = {'frames': 0, 'reduced': {2: 0, 4: 0, 8: 0}}  # Frames decoded at reduced size
 
 def play_alarm_sound():
     """Play alarm sound for loitering detection"""
@@ -111,9 +183,198 @@ def speak_alert(message, alert_type=None, delay=0):
     thread.daemon = True
     thread.start()
 
-# Initialize Ultra-High Accuracy Detection Pipeline
-# This pipeline uses ensemble methods with multiple algorithms for each detection type
-detection_pipeline = EnhancedPeopleDetectionPipeline()
+# Initialize Ultra-High Accuracy Detection Pipelines
+# One pipeline per camera, built on demand; immutable models are shared between them
+zone_config = load_zone_config(Config.ZONES_CONFIG_PATH)
+snapshotter = PeriodicSnapshotter(Config.SNAPSHOT_DIR, Config.SNAPSHOT_INTERVAL)
+reference_store = ReferenceBackgroundStore(Config.REFERENCE_DIR)
+
+# Only the process that serves requests starts the worker pool, camera pipelines and
+# flusher: not a spawned child, and not the debug reloader's file watcher (`python
+# app.py` runs the server in a reloader child, which has WERKZEUG_RUN_MAIN set)
+is_server_process = (multiprocessing.parent_process() is None and
+                     (__name__ != '__main__' or os.environ.get('WERKZEUG_RUN_MAIN') == 'true'))
+
+# Optional detection worker processes; cameras are pinned to a worker and their
+# pipelines (and snapshots) live there
+worker_pool = None
+if Config.DETECTION_WORKERS > 0 and is_server_process:
+    worker_pool = DetectionWorkerPool(Config.DETECTION_WORKERS, {
+        'zones': zone_config,
+        'posture_backend': Config.POSTURE_BACKEND,
+        'face_backend': Config.FACE_BACKEND,
+        'snapshots_enabled': Config.SNAPSHOTS_ENABLED,
+        'snapshot_dir': Config.SNAPSHOT_DIR,
+        'snapshot_interval': Config.SNAPSHOT_INTERVAL,
+        'reference_dir': Config.REFERENCE_DIR
+    }, slots=Config.WORKER_RING_SLOTS, slot_bytes=Config.WORKER_SLOT_BYTES, timeout=Config.WORKER_TIMEOUT)
+
+def create_camera_pipeline(camera_id):
+    """A camera's pipeline: in-process, or a proxy to its pipeline in a worker"""
+    if worker_pool is not None:
+        return worker_pool.create_pipeline(camera_id)
+    return build_camera_pipeline(camera_id, zone_config, snapshotter, reference_store,
+                                 Config.POSTURE_BACKEND, Config.FACE_BACKEND, Config.SNAPSHOTS_ENABLED)
+
+def release_evicted_camera(camera_id, pipeline):
+    """Keep an evicted camera's state so it warm-restores when it comes back"""
+    snapshot = Config.SNAPSHOTS_ENABLED and Config.SNAPSHOT_ON_EVICT
+    if worker_pool is not None:
+        pipeline.release(snapshot)
+    elif snapshot:
+        snapshotter.snapshot_now(camera_id, pipeline)
+
+def run_detection(camera_id, pipeline, frame, timestamp=None):
+    """Run a camera's detection pipeline on a decoded BGR frame and handle its alerts"""
+    results = pipeline.process_frame(frame, timestamp)
+    # Worker processes snapshot their own pipelines
+    if Config.SNAPSHOTS_ENABLED and worker_pool is None:
+        snapshotter.maybe_snapshot(camera_id, pipeline)
+    
+    handle_detection_results(results, camera_id, timestamp)
+    return results
+
+def process_queued_frame(camera_id, pipeline, frame, timestamp=None):
+    """Frame-queue worker entry point: detection plus alert handling (DB writes are buffered)"""
+    return run_detection(camera_id, pipeline, frame, timestamp)
+
+# Per-camera pipelines and frame queues; detection for a camera only runs on its queue's worker
+camera_registry = PipelineRegistry(create_camera_pipeline, process_queued_frame,
+                                   idle_timeout=Config.PIPELINE_IDLE_TIMEOUT,
+                                   max_cameras=Config.MAX_CAMERAS,
+                                   queue_capacity=Config.FRAME_QUEUE_SIZE,
+                                   on_evict=release_evicted_camera)
+
+if is_server_process:
+    write_buffer.start()
+    camera_registry.start_janitor()
+    
+    # Warm the default camera at startup so the first frame does not pay for it
+    camera_registry.get('default')
+
+# Server-side video sources (files, capture devices, stream URLs) feeding camera queues
+video_sources = VideoSourceManager(camera_registry.get, default_fps=Config.SOURCE_FPS)
+
+def store_batch_events(job):
+    """Bulk-insert a finished batch job's events into event_log; returns the row count"""
+    rows = job.event_rows()
+    for start in range(0, len(rows), 1000):
+        insert_event_rows(db.session.connection(), rows[start:start + 1000], EventLog.__table__)
+    db.session.commit()
+    return len(rows)
+
+def store_batch_job(job):
+    with app.app_context():
+        try:
+            return store_batch_events(job)
+        except Exception:
+            db.session.rollback()
+            raise
+
+# Offline analysis of recorded video files in a process pool
+batch_jobs = BatchJobManager({
+    'posture_backend': Config.POSTURE_BACKEND,
+    'face_backend': Config.FACE_BACKEND,
+    'keyframes': Config.BATCH_KEYFRAMES,
+    'scene_change_ratio': Config.BATCH_SCENE_CHANGE_RATIO,
+    'min_keyframe_interval': Config.BATCH_MIN_KEYFRAME_INTERVAL
+}, max_workers=Config.BATCH_WORKERS, on_complete=store_batch_job)
+
+def shutdown_detection():
+    """Stop video sources, snapshot and release every camera, stop the workers and batch pool, flush buffered writes"""
+    video_sources.shutdown()
+    camera_registry.shutdown()
+    if worker_pool is not None:
+        worker_pool.shutdown()
+    batch_jobs.shutdown()
+    write_buffer.stop()
+
+if is_server_process:
+    atexit.register(shutdown_detection)
+
+def request_camera_id(data=None):
+    """camera_id from the query string, form fields or JSON body; 'default' when absent, None if invalid"""
+    camera_id = request.args.get('camera_id')
+    if camera_id is None and request.mimetype in ('multipart/form-data', 'application/x-www-form-urlencoded'):
+        camera_id = request.form.get('camera_id')
+    if camera_id is None and isinstance(data, dict):
+        camera_id = data.get('camera_id')
+    return normalize_camera_id(camera_id)
+
+def request_frame_timestamp(data=None):
+    """Client capture time from the query string, form fields or JSON body; ingest time if missing or implausible"""
+    value = request.args.get('timestamp')
+    if value is None and request.mimetype in ('multipart/form-data', 'application/x-www-form-urlencoded'):
+        value = request.form.get('timestamp')
+    if value is None and isinstance(data, dict):
+        value = data.get('timestamp')
+    
+    return ingest_frame_timestamp(value, Config.FRAME_TIMESTAMP_MAX_SKEW)
+
+def queued_detection_response(camera, frame, timestamp):
+    """Enqueue a frame and answer with the freshest completed result and queue counters"""
+    sequence = camera.frame_queue.submit(frame, timestamp=timestamp)
+    latest = camera.frame_queue.wait_for_result(sequence, Config.FRAME_WAIT_TIMEOUT)
+    
+    return jsonify({
+        'success': True,
+        'camera_id': camera.camera_id,
+        'results': latest['results'],
+        'sequence': sequence,
+        'result_sequence': latest['result_sequence'],
+        'queue': latest['queue']
+    })
+
+def handle_detection_results(results, camera_id='default', timestamp=None):
+    """Voice alerts, event logging and daily stats for one processed frame"""
+    # Alert timing follows the frame's clock, like the detectors
+    current_time = timestamp if timestamp is not None else monotonic_now()
+    
+    for alert in results['alerts']:
+        alert_type = alert['type']
+        
+        # Customize voice message based on detection type
+        if alert_type == 'people_count':
+            voice_message = "Please go out of the ATM. More than 2 people cannot stand inside the ATM."
+            speak_alert(voice_message, alert_type=alert_type)
+        
+        elif alert_type == 'helmet':
+            voice_message = "Please remove your helmet."
+            # Check if 10 seconds have passed since last helmet alert
+            timer_key = (camera_id, alert_type)
+            if timer_key not in helmet_alert_timer or (current_time - helmet_alert_timer[timer_key]) >= 10:
+                speak_alert(voice_message, alert_type=alert_type, delay=10)
+                helmet_alert_timer[timer_key] = current_time
+        
+        elif alert_type == 'face_cover':
+            voice_message = "Please uncover yourself."
+            speak_alert(voice_message, alert_type=alert_type)
+        
+        elif alert_type == 'loitering':
+            voice_message = "Loitering detected - Alarm activated"
+            # This will play alarm sound instead of speaking
+            speak_alert(voice_message, alert_type=alert_type)
+        
+        elif alert_type == 'posture':
+            voice_message = "Don't bend inside the ATM."
+            speak_alert(voice_message, alert_type=alert_type)
+        
+        # Log the event (written in bulk by the write-behind flusher)
+        write_buffer.add_event({
+            'event_type': alert['type'],
+            'description': alert['message'],  # Keep original description for logging
+            'confidence': float(alert['confidence']),
+            'timestamp': datetime.utcnow()
+        })
+    
+    # Update daily stats
+    write_buffer.add_stats(datetime.utcnow().date(), {
+        'people_count': results['people_count'],
+        'helmet_violations': int(results['helmet_violation']),
+        'face_cover_violations': int(results['face_cover_violation']),
+        'loitering_events': int(results['loitering']),
+        'posture_violations': int(results['posture_violation'])
+    })
 
 # Routes
 @app.route('/api/login', methods=['POST'])
@@ -155,10 +416,18 @@ def process_video():
         if not frame_data.startswith('data:image'):
             return jsonify({'error': 'Invalid frame data format'}), 400
         
+        camera_id = request_camera_id(data)
+        if camera_id is None:
+            return jsonify({'error': 'Invalid camera_id'}), 400
+        camera = camera_registry.get(camera_id)
+        timestamp = request_frame_timestamp(data)
+        
         # Decode base64 image
         try:
             image_data = base64.b64decode(frame_data.split(',')[1])
             image = Image.open(io.BytesIO(image_data))
+            # JPEG draft mode decodes at a reduced scale that still meets the detectors' minimum
+            image.draft('RGB', camera.pipeline.min_input_resolution())
             frame = cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGR)
         except Exception as e:
             return jsonify({'error': f'Error decoding image: {str(e)}'}), 400
@@ -167,98 +436,230 @@ def process_video():
         if frame is None or frame.size == 0:
             return jsonify({'error': 'Invalid frame dimensions'}), 400
         
-        # Process through detection pipeline
-        results = detection_pipeline.process_frame(frame)
-        
-        # Handle alerts with custom voice messages
-        current_time = time.time()
-        
-        for alert in results['alerts']:
-            alert_type = alert['type']
-            
-            # Customize voice message based on detection type
-            if alert_type == 'people_count':
-                voice_message = "Please go out of the ATM. More than 2 people cannot stand inside the ATM."
-                speak_alert(voice_message, alert_type=alert_type)
-                
-            elif alert_type == 'helmet':
-                voice_message = "Please remove your helmet."
-                # Check if 10 seconds have passed since last helmet alert
-                if alert_type not in helmet_alert_timer or (current_time - helmet_alert_timer[alert_type]) >= 10:
-                    speak_alert(voice_message, alert_type=alert_type, delay=10)
-                    helmet_alert_timer[alert_type] = current_time
-                    
-            elif alert_type == 'face_cover':
-                voice_message = "Please uncover yourself."
-                speak_alert(voice_message, alert_type=alert_type)
-                
-            elif alert_type == 'loitering':
-                voice_message = "Loitering detected - Alarm activated"
-                # This will play alarm sound instead of speaking
-                speak_alert(voice_message, alert_type=alert_type)
-                
-            elif alert_type == 'posture':
-                voice_message = "Don't bend inside the ATM."
-                speak_alert(voice_message, alert_type=alert_type)
-            
-            # Log the event
-            event = EventLog(
-                event_type=alert['type'],
-                description=alert['message'],  # Keep original description for logging
-                confidence=alert['confidence']
-            )
-            db.session.add(event)
-        
-        # Update daily stats
-        today = datetime.utcnow().date()
-        stats = DetectionStats.query.filter_by(date=today).first()
-        if not stats:
-            stats = DetectionStats(date=today)
-            db.session.add(stats)
+        # Queue for the camera's detection worker; answer with the freshest completed result
+        return queued_detection_response(camera, frame, timestamp)
+    
+    except Exception as e:
+        print(f"Error processing video frame: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({'error': f'Error processing video frame: {str(e)}'}), 500
+
+@app.route('/api/process-frame', methods=['POST'])
+def process_frame_binary():
+    """Binary frame ingestion: a raw image/jpeg body or a multipart upload named 'frame'"""
+    try:
+        if request.mimetype == 'multipart/form-data':
+            upload = request.files.get('frame')
+            if upload is None:
+                return jsonify({'error': 'No frame file provided'}), 400
+            payload = upload.read()
+        elif request.mimetype in BINARY_FRAME_TYPES:
+            payload = request.get_data(cache=False)
+        else:
+            return jsonify({'error': f'Unsupported content type: {request.mimetype}'}), 415
         
-        # Ensure all fields are initialized
-        if stats.people_count is None:
-            stats.people_count = 0
-        if stats.helmet_violations is None:
-            stats.helmet_violations = 0
-        if stats.face_cover_violations is None:
-            stats.face_cover_violations = 0
-        if stats.loitering_events is None:
-            stats.loitering_events = 0
-        if stats.posture_violations is None:
-            stats.posture_violations = 0
+        if not payload:
+            return jsonify({'error': 'No frame data provided'}), 400
         
-        stats.people_count += results['people_count']
-        if results['helmet_violation']:
-            stats.helmet_violations += 1
-        if results['face_cover_violation']:
-            stats.face_cover_violations += 1
-        if results['loitering']:
-            stats.loitering_events += 1
-        if results['posture_violation']:
-            stats.posture_violations += 1
+        camera_id = request_camera_id()
+        if camera_id is None:
+            return jsonify({'error': 'Invalid camera_id'}), 400
+        camera = camera_registry.get(camera_id)
+        timestamp = request_frame_timestamp()
         
-        db.session.commit()
+        # Decode straight to BGR - no base64, PIL or color conversion copies - and
+        # downscale large JPEGs in the DCT domain to the detectors' minimum resolution
+        frame = decode_uploaded_frame(payload, camera.pipeline)
+        if frame is None:
+            return jsonify({'error': 'Error decoding image'}), 400
         
-        return jsonify({
-            'success': True,
-            'results': results
-        })
+        return queued_detection_response(camera, frame, timestamp)
     
     except Exception as e:
-        print(f"Error processing video frame: {str(e)}")
+        print(f"Error processing binary frame: {str(e)}")
         import traceback
         traceback.print_exc()
-        return jsonify({'error': f'Error processing video frame: {str(e)}'}), 500
+        return jsonify({'error': f'Error processing binary frame: {str(e)}'}), 500
+
+def decode_uploaded_frame(payload, pipeline):
+    """Decode an uploaded frame at reduced scale where possible and count the reduction"""
+    frame, factor = decode_frame(payload, pipeline.min_input_resolution())
+    if frame is None or frame.size == 0:
+        return None
+    
+    decode_stats['frames'] += 1
+    if factor > 1:
+        decode_stats['reduced'][factor] += 1
+    return frame
+
+if sock is not None:
+    @sock.route('/api/stream')
+    def stream_frames(ws):
+        """
+        Persistent frame channel: binary messages carry a 4-byte sequence number and a
+        JPEG; each is answered with a compact JSON result carrying the same sequence,
+        or a 'dropped' message when the camera queue discarded it for a newer frame.
+        Clients may keep several frames in flight; they are processed in order.
+        The camera is chosen with the camera_id query parameter.
+        """
+        camera_id = request_camera_id()
+        if camera_id is None:
+            ws.send(pack_error(None, 'Invalid camera_id'))
+            return
+        send_lock = threading.Lock()
+        
+        def send(message):
+            # Results arrive on the queue worker while this thread is receiving
+            with send_lock:
+                ws.send(message)
+        
+        def reply(frame_queue, results, sequence):
+            if results is None:
+                send(pack_error(sequence, 'Error processing streamed frame'))
+            else:
+                send(pack_result(sequence, results, queue_depth=len(frame_queue.frames),
+                                 dropped=frame_queue.stats['dropped']))
+        
+        while True:
+            message = ws.receive()
+            if message is None:
+                break
+            
+            if isinstance(message, str):
+                # Text messages are control requests; 'config' returns the ingest settings
+                if message.strip() == 'config':
+                    send(get_ingest_config().get_data(as_text=True))
+                else:
+                    send(pack_error(None, 'Unknown control message'))
+                continue
+            
+            parsed = parse_frame_message(message)
+            if parsed is None:
+                send(pack_error(None, 'Malformed frame message'))
+                continue
+            
+            sequence, payload = parsed
+            # Streamed frames are timestamped on arrival
+            timestamp = monotonic_now()
+            try:
+                # Looked up per message so an open stream keeps its camera alive, and a
+                # camera evicted between messages is rebuilt rather than left stopped
+                camera = camera_registry.get(camera_id)
+                frame = decode_uploaded_frame(payload, camera.pipeline)
+                if frame is None:
+                    send(pack_error(sequence, 'Error decoding image'))
+                    continue
+                
+                frame_queue = camera.frame_queue
+                frame_queue.submit(frame, timestamp=timestamp,
+                                   on_result=lambda results, sequence=sequence, frame_queue=frame_queue:
+                                       reply(frame_queue, results, sequence),
+                                   on_drop=lambda sequence=sequence: send(pack_dropped(sequence)))
+            
+            except Exception as e:
+                print(f"Error queueing streamed frame: {str(e)}")
+                send(pack_error(sequence, f'Error queueing streamed frame: {str(e)}'))
+
+@app.route('/api/ingest-config', methods=['GET'])
+def get_ingest_config():
+    """Preferred upload format so clients can capture and encode frames at the size the detectors need"""
+    camera_id = request_camera_id()
+    if camera_id is None:
+        return jsonify({'error': 'Invalid camera_id'}), 400
+    pipeline = camera_registry.get(camera_id).pipeline
+    
+    width, height = pipeline.min_input_resolution()
+    return jsonify({
+        'camera_id': camera_id,
+        'preferred_width': width,
+        'preferred_height': height,
+        'endpoint': '/api/process-frame',
+        'stream_endpoint': '/api/stream' if sock is not None else None,
+        'content_types': list(BINARY_FRAME_TYPES),
+        'jpeg_quality': 0.8,
+        'detector_min_resolution': {name: list(size) for name, size in
+                                    pipeline.detector_min_resolution.items()},
+        'decode_stats': {
+            'frames': decode_stats['frames'],
+            'reduced': {str(factor): count for factor, count in decode_stats['reduced'].items()}
+        }
+    })
+
+def filter_event_logs(query):
+    """EventLog query with the type, text, confidence and time-range filters applied"""
+    logs = EventLog.query
+    if query['event_type']:
+        logs = logs.filter(EventLog.event_type == query['event_type'])
+    if query['search']:
+        escaped = query['search'].replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        pattern = f"%{escaped}%"
+        logs = logs.filter(or_(EventLog.description.ilike(pattern, escape='\\'),
+                               EventLog.event_type.ilike(pattern, escape='\\')))
+    if query['min_confidence'] is not None:
+        logs = logs.filter(EventLog.confidence >= query['min_confidence'])
+    if query['max_confidence'] is not None:
+        logs = logs.filter(EventLog.confidence <= query['max_confidence'])
+    if query['start'] is not None:
+        logs = logs.filter(EventLog.timestamp >= query['start'])
+    if query['end'] is not None:
+        logs = logs.filter(EventLog.timestamp < query['end'])
+    return logs
+
+def count_event_logs(query):
+    """(total, estimated): the planner's row estimate for an unfiltered PostgreSQL table, otherwise a cached COUNT"""
+    key = count_key(query)
+    if all(value is None for _, value in key) and db.engine.dialect.name == 'postgresql':
+        estimate = db.session.execute(
+            text("SELECT reltuples::bigint FROM pg_class WHERE relname = 'event_log'")
+        ).scalar()
+        # Negative or zero until the table has been analyzed
+        if estimate and estimate > 0:
+            return int(estimate), True
+    return event_counts.get(key, lambda: filter_event_logs(query).order_by(None).count()), False
+
+# Totals are recounted at most every EVENT_COUNT_CACHE_SECONDS per filter combination
+event_counts = CountCache(ttl=Config.EVENT_COUNT_CACHE_SECONDS)
 
 @app.route('/api/event-logs', methods=['GET'])
 def get_event_logs():
-    page = request.args.get('page', 1, type=int)
-    per_page = request.args.get('per_page', 10, type=int)
+    """
+    Event logs, filtered on the server and paged by keyset
+    Pass a page's next_cursor back as cursor to fetch the next one; page (OFFSET)
+    is still accepted for jumping to a shallow page
+    """
+    try:
+        query = parse_event_query(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     
-    logs = EventLog.query.order_by(EventLog.timestamp.desc()).paginate(
-        page=page, per_page=per_page, error_out=False
-    )
+    sort_by = query['sort_by']
+    per_page = query['per_page']
+    sort_column = getattr(EventLog, sort_by)
+    descending = query['sort_order'] == 'desc'
+    
+    logs = filter_event_logs(query)
+    if query['cursor'] is not None:
+        value, last_id = query['cursor']
+        if descending:
+            logs = logs.filter(or_(sort_column < value, and_(sort_column == value, EventLog.id < last_id)))
+        else:
+            logs = logs.filter(or_(sort_column > value, and_(sort_column == value, EventLog.id > last_id)))
+    elif query['page'] > 1:
+        logs = logs.offset((query['page'] - 1) * per_page)
+    
+    if descending:
+        logs = logs.order_by(sort_column.desc(), EventLog.id.desc())
+    else:
+        logs = logs.order_by(sort_column.asc(), EventLog.id.asc())
+    
+    # One extra row tells us whether there is a next page without counting
+    rows = logs.limit(per_page + 1).all()
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+    next_cursor = encode_cursor(getattr(rows[-1], sort_by), rows[-1].id) if has_more else None
+    
+    total, estimated = count_event_logs(query)
     
     return jsonify({
         'logs': [{
@@ -267,10 +668,14 @@ def get_event_logs():
             'description': log.description,
             'confidence': log.confidence,
             'timestamp': log.timestamp.isoformat()
-        } for log in logs.items],
-        'total': logs.total,
-        'pages': logs.pages,
-        'current_page': page
+        } for log in rows],
+        'next_cursor': next_cursor,
+        'has_more': has_more,
+        'total': total,
+        'total_estimated': estimated,
+        'pages': max(1, -(-total // per_page)),
+        'current_page': query['page'],
+        'per_page': per_page
     })
 
 @app.route('/api/analytics', methods=['GET'])
@@ -317,6 +722,174 @@ def get_analytics():
         'totals': totals
     })
 
+@app.route('/api/detection-stats', methods=['GET'])
+def get_detection_stats():
+    """A camera's pipeline profiling counters (temporal histories, evaluation paths, trackers) and frame queue"""
+    camera_id = request_camera_id()
+    camera = camera_registry.peek(camera_id) if camera_id else None
+    if camera is None:
+        return jsonify({'error': 'Unknown camera'}), 404
+    
+    stats = camera.pipeline.get_detection_stats()
+    stats['frame_queue'] = camera.frame_queue.get_stats()
+    stats['cameras'] = camera_registry.get_stats()
+    stats['write_behind'] = write_buffer.get_stats()
+    return jsonify(stats)
+
+@app.route('/api/cameras', methods=['GET'])
+def list_cameras():
+    """Active camera pipelines with idle time and queue counters"""
+    return jsonify({
+        'cameras': camera_registry.list_cameras(),
+        'registry': camera_registry.get_stats(),
+        'workers': worker_pool.get_stats() if worker_pool is not None else []
+    })
+
+@app.route('/api/sources', methods=['GET'])
+def list_video_sources():
+    """Server-side video sources with their status and frame counters"""
+    return jsonify({'sources': video_sources.list_sources()})
+
+@app.route('/api/sources', methods=['POST'])
+def start_video_source():
+    """Open a local video file, capture device ("0") or stream URL and feed a camera from it"""
+    data = request.get_json(silent=True) or {}
+    
+    uri = data.get('source')
+    error = validate_source_uri(uri)
+    if error:
+        return jsonify({'error': error}), 400
+    
+    camera_id = data.get('camera_id')
+    if camera_id is not None and normalize_camera_id(camera_id) is None:
+        return jsonify({'error': 'Invalid camera_id'}), 400
+    
+    try:
+        fps = float(data.get('fps') or Config.SOURCE_FPS)
+    except (TypeError, ValueError):
+        return jsonify({'error': 'fps must be a number'}), 400
+    if not 0 < fps <= 30:
+        return jsonify({'error': 'fps must be between 0 and 30'}), 400
+    
+    source = video_sources.start(uri, camera_id=camera_id, fps=fps, loop=bool(data.get('loop', False)))
+    return jsonify({'success': True, 'source': source.get_info()}), 201
+
+@app.route('/api/batch-jobs', methods=['POST'])
+def start_batch_job():
+    """Analyze a recorded video file offline and store its events in event_log"""
+    data = request.get_json(silent=True) or {}
+    
+    path = data.get('source')
+    if not isinstance(path, str) or not os.path.isfile(path):
+        return jsonify({'error': f'Video file not found: {path}'}), 400
+    
+    camera_id = request_camera_id(data)
+    if camera_id is None:
+        return jsonify({'error': 'Invalid camera_id'}), 400
+    
+    try:
+        fps = float(data.get('fps', Config.BATCH_FPS))
+        chunk_seconds = float(data.get('chunk_seconds', Config.BATCH_CHUNK_SECONDS))
+        overlap_seconds = float(data.get('overlap_seconds', Config.BATCH_OVERLAP_SECONDS))
+        recorded_at = datetime.fromisoformat(data['recorded_at']) if data.get('recorded_at') else None
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': f'Invalid job parameters: {str(e)}'}), 400
+    if fps <= 0 or chunk_seconds <= 0 or overlap_seconds < 0:
+        return jsonify({'error': 'fps and chunk_seconds must be positive'}), 400
+    
+    job = batch_jobs.start(path, fps=fps, chunk_seconds=chunk_seconds, overlap_seconds=overlap_seconds,
+                           recorded_at=recorded_at,
+                           zones=zone_config.get(camera_id, zone_config.get('default')))
+    return jsonify({'success': True, 'job': job.get_info()}), 202
+
+@app.route('/api/batch-jobs', methods=['GET'])
+def list_batch_jobs():
+    """Offline analysis jobs and their progress"""
+    return jsonify({'jobs': batch_jobs.list_jobs()})
+
+@app.route('/api/batch-jobs/<job_id>', methods=['GET'])
+def get_batch_job(job_id):
+    """Progress of one offline analysis job"""
+    job = batch_jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown job'}), 404
+    return jsonify({'job': job.get_info()})
+
+@app.route('/api/sources/<source_id>', methods=['DELETE'])
+def stop_video_source(source_id):
+    """Stop a video source"""
+    info = video_sources.stop(source_id)
+    if info is None:
+        return jsonify({'error': 'Unknown source'}), 404
+    return jsonify({'success': True, 'source': info})
+
+@app.route('/api/reference-background/capture', methods=['POST'])
+def capture_reference_background():
+    """Store the most recent frames as the empty-booth reference and seed from them"""
+    data = request.get_json(silent=True) or {}
+    try:
+        frame_count = reference_store.frame_count(data.get('frames'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    camera_id = request_camera_id(data)
+    camera = camera_registry.peek(camera_id) if camera_id else None
+    if camera is None:
+        return jsonify({'error': 'Unknown camera'}), 404
+    
+    with camera.frame_queue.processing_lock:
+        frames = list(camera.pipeline.recent_frames)[-frame_count:]
+    if not frames:
+        return jsonify({'error': 'No frames received yet'}), 400
+    
+    stored = reference_store.save(camera_id, frames)
+    if stored == 0:
+        return jsonify({'error': 'Could not store reference frames'}), 500
+    
+    with camera.frame_queue.processing_lock:
+        camera.pipeline.bootstrap_background(frames)
+    return jsonify({'success': True, 'frames': stored})
+
+@app.route('/api/reference-background/apply', methods=['POST'])
+def apply_reference_background():
+    """Re-seed the background models from the stored reference (e.g. after a lighting change)"""
+    camera_id = request_camera_id(request.get_json(silent=True))
+    if camera_id is None:
+        return jsonify({'error': 'Invalid camera_id'}), 400
+    
+    frames = reference_store.load(camera_id)
+    if not frames:
+        return jsonify({'error': 'No reference background stored'}), 404
+    
+    camera = camera_registry.get(camera_id)
+    with camera.frame_queue.processing_lock:
+        seeded = camera.pipeline.bootstrap_background(frames)
+    return jsonify({'success': seeded, 'frames': len(frames)})
+
+@app.route('/api/zones/heatmap', methods=['GET'])
+def get_zone_heatmap():
+    """Decaying occupancy heatmap and per-zone dwell times for the dashboard"""
+    camera_id = request_camera_id()
+    camera = camera_registry.peek(camera_id) if camera_id else None
+    if camera is None:
+        return jsonify({'error': 'Unknown camera'}), 404
+    
+    with camera.frame_queue.processing_lock:
+        zone_state = camera.pipeline.get_zone_heatmap()
+    if zone_state is None:
+        return jsonify({'error': 'No zones configured'}), 404
+    
+    # Downsample for transfer; the dashboard scales it back up
+    step = request.args.get('step', 4, type=int)
+    heatmap = zone_state['heatmap'][::max(1, step), ::max(1, step)]
+    
+    return jsonify({
+        'width': int(heatmap.shape[1]),
+        'height': int(heatmap.shape[0]),
+        'heatmap': heatmap.tolist(),
+        'zones': zone_state['zones']
+    })
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
     return jsonify({'status': 'healthy', 'timestamp': datetime.utcnow().isoformat()})
@@ -337,6 +910,14 @@ def create_admin_user():
 if __name__ == '__main__':
     with app.app_context():
         db.create_all()
+        # create_all() skips tables that already exist; add indexes missing from older databases.
+        # Older detection_stats tables may hold several rows per day, merged before the unique index
+        with db.engine.begin() as connection:
+            merged = merge_duplicate_daily_stats(connection, DetectionStats.__table__)
+        if merged:
+            print(f"[INFO] Merged {merged} duplicate daily stats rows")
+        for index in list(EventLog.__table__.indexes) + list(DetectionStats.__table__.indexes):
+            index.create(db.engine, checkfirst=True)
         create_admin_user()
     
     app.run(debug=True, host='0.0.0.0', port=5000)
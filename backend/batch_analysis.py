@@ -0,0 +1,258 @@
+import argparse
+import itertools
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta
+import cv2
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from batch_worker import analyze_chunk
+from process_spawn import spawn_context, hidden_main_module
+
+def probe_video(path):
+    """(fps, frame_count) of a video file, or None if it cannot be opened"""
+    capture = cv2.VideoCapture(path)
+    try:
+        if not capture.isOpened():
+            return None
+        fps = capture.get(cv2.CAP_PROP_FPS) or 25.0
+        frame_count = int(capture.get(cv2.CAP_PROP_FRAME_COUNT))
+        return fps, frame_count
+    finally:
+        capture.release()
+
+def plan_chunks(duration, chunk_seconds, overlap_seconds):
+    """
+    Split [0, duration) into (warmup_start, start, end) chunks in seconds
+    Each chunk starts decoding overlap_seconds early so background models and
+    temporal histories are warm by `start`; warm-up output is discarded
+    """
+    chunks = []
+    start = 0.0
+    while start < duration:
+        end = min(duration, start + chunk_seconds)
+        chunks.append((max(0.0, start - overlap_seconds), start, end))
+        start = end
+    return chunks
+
+class BatchJob:
+    """Progress and result of one offline analysis job"""
+
+    def __init__(self, job_id, path, fps, chunk_seconds, overlap_seconds, recorded_at=None, zones=None):
+        self.job_id = job_id
+        self.path = path
+        self.zones = zones
+        self.fps = fps
+        self.chunk_seconds = chunk_seconds
+        self.overlap_seconds = overlap_seconds
+        self.recorded_at = recorded_at
+
+        self.status = 'queued'
+        self.error = None
+        self.duration = 0.0
+        self.chunks_total = 0
+        self.chunks_done = 0
+        self.frames = 0
+        self.frames_decoded = 0
+        self.events = []
+        self.events_stored = 0
+        self.started_at = None
+        self.finished_at = None
+
+    def get_info(self):
+        elapsed = ((self.finished_at or time.time()) - self.started_at) if self.started_at else 0.0
+        processed_seconds = self.duration * self.chunks_done / max(self.chunks_total, 1)
+        return {
+            'job_id': self.job_id,
+            'source': self.path,
+            'status': self.status,
+            'error': self.error,
+            'fps': self.fps,
+            'duration_seconds': round(self.duration, 1),
+            'chunks_total': self.chunks_total,
+            'chunks_done': self.chunks_done,
+            'progress': round(self.chunks_done / self.chunks_total, 3) if self.chunks_total else 0.0,
+            'frames_decoded': self.frames_decoded,
+            'frames_processed': self.frames,
+            'events': len(self.events),
+            'events_stored': self.events_stored,
+            'elapsed_seconds': round(elapsed, 1),
+            'speed': round(processed_seconds / elapsed, 1) if elapsed > 0 else 0.0  # x real time
+        }
+
+    def event_rows(self):
+        """Events as event_log rows with absolute timestamps, in timestamp order"""
+        recorded_at = self.recorded_at or datetime.utcnow()
+        return [{
+            'event_type': event['event_type'],
+            'description': event['description'],
+            'confidence': event['confidence'],
+            'timestamp': recorded_at + timedelta(seconds=event['offset'])
+        } for event in self.events]
+
+class BatchJobManager:
+    """
+    Offline analysis jobs for recorded video files
+    - The video is split into overlapping time chunks, each analyzed with its own
+      pipeline, so throughput scales with cores
+    - All jobs share one process pool of max_workers processes, so concurrent
+      jobs queue their chunks instead of multiplying the process count
+    - Chunk events are stitched back together in timestamp order
+    - on_complete(job) stores the results (e.g. bulk insert into event_log)
+    """
+
+    def __init__(self, settings, max_workers=None, on_complete=None):
+        self.settings = settings
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.on_complete = on_complete
+        self.jobs = {}
+        self.job_ids = itertools.count(1)
+        self.lock = threading.Lock()
+        self.executor = None  # Created with the first job
+
+    def start(self, path, fps=2.0, chunk_seconds=300.0, overlap_seconds=30.0, recorded_at=None, zones=None):
+        """Queue a job and start it on a background thread; returns the BatchJob"""
+        with self.lock:
+            job = BatchJob(f"job-{next(self.job_ids)}", path, fps, chunk_seconds, overlap_seconds,
+                           recorded_at, zones)
+            self.jobs[job.job_id] = job
+
+        thread = threading.Thread(target=self.run, args=(job,), name=job.job_id, daemon=True)
+        thread.start()
+        return job
+
+    def get(self, job_id):
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def list_jobs(self):
+        with self.lock:
+            jobs = list(self.jobs.values())
+        return [job.get_info() for job in jobs]
+
+    def shutdown(self):
+        with self.lock:
+            executor, self.executor = self.executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _submit_chunks(self, job, chunks, settings):
+        with self.lock:
+            if self.executor is None:
+                self.executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=spawn_context())
+            executor = self.executor
+            # Pool processes are spawned on submit; they only import batch_worker, never app.py
+            with hidden_main_module():
+                return executor, [executor.submit(analyze_chunk, job.path, chunk, job.fps, settings)
+                                  for chunk in chunks]
+
+    def _discard_executor(self, executor):
+        """Replace a pool broken by a crashed process on the next job"""
+        with self.lock:
+            if self.executor is executor:
+                self.executor = None
+        executor.shutdown(wait=False)
+
+    def run(self, job):
+        """Run a job to completion on the calling thread"""
+        job.started_at = time.time()
+        try:
+            probe = probe_video(job.path)
+            if probe is None:
+                raise ValueError(f"Could not open video: {job.path}")
+            source_fps, frame_count = probe
+            job.duration = frame_count / source_fps
+            if job.recorded_at is None:
+                # Without a recording time, assume the file was last written when recording ended
+                job.recorded_at = (datetime.utcfromtimestamp(os.path.getmtime(job.path))
+                                   - timedelta(seconds=job.duration))
+
+            chunks = plan_chunks(job.duration, job.chunk_seconds, job.overlap_seconds)
+            job.chunks_total = len(chunks)
+            job.status = 'running'
+
+            settings = dict(self.settings, zones=job.zones)
+            events = []
+            executor, futures = self._submit_chunks(job, chunks, settings)
+            try:
+                for future in as_completed(futures):
+                    result = future.result()
+                    events.extend(result['events'])
+                    job.frames += result['frames']
+                    job.frames_decoded += result['decoded']
+                    job.chunks_done += 1
+            except BrokenProcessPool:
+                self._discard_executor(executor)
+                raise
+            except Exception:
+                for future in futures:
+                    future.cancel()
+                raise
+
+            # Chunks finish out of order; stitch events back into timestamp order
+            events.sort(key=lambda event: event['offset'])
+            job.events = events
+
+            if self.on_complete is not None:
+                job.status = 'storing'
+                job.events_stored = self.on_complete(job) or 0
+            job.status = 'completed'
+            print(f"[SUCCESS] Batch {job.job_id}: {len(events)} events from {job.duration:.0f}s of video "
+                  f"in {time.time() - job.started_at:.1f}s")
+
+        except Exception as e:
+            job.status = 'failed'
+            job.error = str(e)
+            print(f"[ERROR] Batch {job.job_id} failed: {e}")
+        finally:
+            job.finished_at = time.time()
+        return job
+
+def main():
+    parser = argparse.ArgumentParser(description='Offline analysis of a recorded ATM video')
+    parser.add_argument('video', help='Video file to analyze')
+    parser.add_argument('--fps', type=float, default=2.0, help='Candidate frames decoded per second of video')
+    parser.add_argument('--no-keyframes', action='store_true', help='Run detection on every candidate frame')
+    parser.add_argument('--min-keyframe-interval', type=float, default=2.0,
+                        help='Longest gap in seconds between detections in static scenes')
+    parser.add_argument('--chunk-seconds', type=float, default=300.0, help='Length of each parallel chunk')
+    parser.add_argument('--overlap-seconds', type=float, default=30.0, help='Warm-up before each chunk')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: CPU count)')
+    parser.add_argument('--recorded-at', help='Recording start time (ISO 8601, UTC)')
+    parser.add_argument('--store', action='store_true', help='Insert the events into event_log')
+    args = parser.parse_args()
+
+    on_complete = None
+    if args.store:
+        # Straight to the database; importing app would start the whole server
+        from config import Config
+        from event_store import store_event_rows
+
+        def on_complete(job):
+            return store_event_rows(Config.SQLALCHEMY_DATABASE_URI, job.event_rows())
+
+    recorded_at = datetime.fromisoformat(args.recorded_at) if args.recorded_at else None
+    manager = BatchJobManager({'keyframes': not args.no_keyframes,
+                               'min_keyframe_interval': args.min_keyframe_interval},
+                              max_workers=args.workers, on_complete=on_complete)
+    job = BatchJob('cli', args.video, args.fps, args.chunk_seconds, args.overlap_seconds, recorded_at)
+    manager.run(job)
+    manager.shutdown()
+
+    info = job.get_info()
+    if job.status != 'completed':
+        print(f"❌ {info['error']}")
+        return 1
+
+    for row in job.event_rows():
+        print(f"  {row['timestamp'].isoformat()}  {row['event_type']:14} {row['confidence']:.2f}  {row['description']}")
+    print(f"\n✅ {info['events']} events, {info['frames_processed']} of {info['frames_decoded']} frames analyzed, "
+          f"{info['duration_seconds']}s of video in {info['elapsed_seconds']}s ({info['speed']}x real time)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+import cv2
+from models_enhanced_people import EnhancedPeopleDetectionPipeline
+from keyframes import SceneChangeSampler
+
+# Chunk worker for BatchJobManager's process pool; kept apart from app.py and the
+# job manager so pool processes only import the detection pipeline
+
+def analyze_chunk(path, chunk, fps, settings):
+    """
+    Run a fresh pipeline over one chunk (executed in a pool process)
+    Candidate frames are decoded at `fps`; with keyframe sampling enabled, full
+    detection only runs on scene changes plus a minimum sampling floor.
+    Returns the chunk's events as {offset, event_type, description, confidence}
+    dicts (offset in seconds from the start of the video) and its frame counts
+    """
+    warmup_start, start, end = chunk
+    pipeline = EnhancedPeopleDetectionPipeline(zones=settings.get('zones'),
+                                               posture_backend=settings.get('posture_backend', 'silhouette'),
+                                               face_backend=settings.get('face_backend', 'haar'))
+    width, height = pipeline.min_input_resolution()
+    sampler = None
+    if settings.get('keyframes', True):
+        sampler = SceneChangeSampler(settings.get('scene_change_ratio', 0.02),
+                                     settings.get('min_keyframe_interval', 2.0))
+
+    capture = cv2.VideoCapture(path)
+    events = []
+    frames = 0
+    decoded = 0
+    try:
+        source_fps = capture.get(cv2.CAP_PROP_FPS) or 25.0
+        step = max(1, int(round(source_fps / fps)))
+        frame_index = int(warmup_start * source_fps)
+        end_index = int(end * source_fps)
+        capture.set(cv2.CAP_PROP_POS_FRAMES, frame_index)
+
+        while frame_index < end_index:
+            # Skipped frames are only grabbed, not decoded
+            if frame_index % step != 0:
+                if not capture.grab():
+                    break
+                frame_index += 1
+                continue
+
+            ok, frame = capture.read()
+            if not ok:
+                break
+            offset = frame_index / source_fps
+            frame_index += 1
+            decoded += 1
+
+            # Empty booths and people standing still skip detection until the floor is due;
+            # held frames keep the frame-count histories in step with fixed-rate sampling
+            if sampler is not None and not sampler.is_keyframe(frame, offset):
+                pipeline.hold_frame(offset)
+                continue
+
+            scale = min(1.0, max(width / frame.shape[1], height / frame.shape[0]))
+            if scale < 1.0:
+                frame = cv2.resize(frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+
+            # Detector clocks run on video time, so timings match the live path at any speed
+            results = pipeline.process_frame(frame, offset)
+            frames += 1
+            if offset < start:
+                continue  # Warm-up frames
+
+            for alert in results['alerts']:
+                events.append({
+                    'offset': offset,
+                    'event_type': alert['type'],
+                    'description': alert['message'],
+                    'confidence': float(alert['confidence'])
+                })
+    finally:
+        capture.release()
+
+    return {'chunk': chunk, 'events': events, 'frames': frames, 'decoded': decoded}
@@ -26,4 +26,72 @@ class Config:
         # SQLite configuration (fallback)
         SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL', 'sqlite:///atm_surveillance.db')
     
-    SQLALCHEMY_TRACK_MODIFICATIONS = False
\ No newline at end of file
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    
+    # Write-behind buffer for events and daily stats: flushed every interval or once this many events wait
+    WRITE_FLUSH_INTERVAL_MS = int(os.getenv('WRITE_FLUSH_INTERVAL_MS', '500'))
+    WRITE_FLUSH_MAX_RECORDS = int(os.getenv('WRITE_FLUSH_MAX_RECORDS', '500'))
+    # Seconds an /api/event-logs total is reused before counting again
+    EVENT_COUNT_CACHE_SECONDS = float(os.getenv('EVENT_COUNT_CACHE_SECONDS', '30'))
+    
+    # Per-camera loitering zones (JSON, normalized polygon coordinates)
+    ZONES_CONFIG_PATH = os.getenv(
+        'ZONES_CONFIG_PATH',
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), 'zones.json')
+    )
+    
+    # Periodic detector-state snapshots for warm restarts
+    SNAPSHOTS_ENABLED = os.getenv('SNAPSHOTS_ENABLED', 'true').lower() == 'true'
+    SNAPSHOT_DIR = os.getenv(
+        'SNAPSHOT_DIR',
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), 'snapshots')
+    )
+    SNAPSHOT_INTERVAL = float(os.getenv('SNAPSHOT_INTERVAL', '30'))
+    # Snapshot a camera's state when its pipeline is evicted for being idle
+    SNAPSHOT_ON_EVICT = os.getenv('SNAPSHOT_ON_EVICT', 'true').lower() == 'true'
+    
+    # Per-camera "empty booth" reference clips for background bootstrap
+    REFERENCE_DIR = os.getenv(
+        'REFERENCE_DIR',
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), 'reference_backgrounds')
+    )
+    
+    # Posture backend: 'silhouette' (foreground moments) or 'mediapipe' (pose on person crops)
+    POSTURE_BACKEND = os.getenv('POSTURE_BACKEND', 'silhouette').lower()
+    
+    # Face backend for face-cover detection: 'haar' (cascades) or 'mediapipe' (short-range detector)
+    FACE_BACKEND = os.getenv('FACE_BACKEND', 'haar').lower()
+    
+    # Per-camera frame queue: frames waiting for the detection worker (oldest dropped when full)
+    FRAME_QUEUE_SIZE = int(os.getenv('FRAME_QUEUE_SIZE', '2'))
+    # How long an HTTP upload waits for its own result before returning the freshest one
+    FRAME_WAIT_TIMEOUT = float(os.getenv('FRAME_WAIT_TIMEOUT', '0.5'))
+    # Client frame timestamps further than this many seconds from ingest time are replaced by it
+    FRAME_TIMESTAMP_MAX_SKEW = float(os.getenv('FRAME_TIMESTAMP_MAX_SKEW', '5'))
+    
+    # Per-camera pipelines: evicted after this many idle seconds, least recently used first beyond MAX_CAMERAS
+    PIPELINE_IDLE_TIMEOUT = float(os.getenv('PIPELINE_IDLE_TIMEOUT', '600'))
+    MAX_CAMERAS = int(os.getenv('MAX_CAMERAS', '32'))
+    
+    # Detection worker processes; 0 runs every camera pipeline in the server process
+    DETECTION_WORKERS = int(os.getenv('DETECTION_WORKERS', '0'))
+    # Shared-memory frame slots per worker and the largest decoded frame (bytes) a slot holds
+    WORKER_RING_SLOTS = int(os.getenv('WORKER_RING_SLOTS', '8'))
+    WORKER_SLOT_BYTES = int(os.getenv('WORKER_SLOT_BYTES', str(1280 * 720 * 3)))
+    # Seconds to wait for a worker to answer before the frame counts as an error
+    WORKER_TIMEOUT = float(os.getenv('WORKER_TIMEOUT', '30'))
+    
+    # Frames per second a server-side video source submits when the request does not say
+    SOURCE_FPS = float(os.getenv('SOURCE_FPS', '5'))
+    
+    # Offline batch analysis: worker processes (default CPU count), frames analyzed per
+    # second of video, chunk length and warm-up overlap in seconds
+    BATCH_WORKERS = int(os.getenv('BATCH_WORKERS', '0')) or None
+    BATCH_FPS = float(os.getenv('BATCH_FPS', '2'))
+    BATCH_CHUNK_SECONDS = float(os.getenv('BATCH_CHUNK_SECONDS', '300'))
+    BATCH_OVERLAP_SECONDS = float(os.getenv('BATCH_OVERLAP_SECONDS', '30'))
+    # Scene-change keyframes: detect only when this fraction of the frame changed, and at
+    # least every BATCH_MIN_KEYFRAME_INTERVAL seconds so dwell timings stay correct
+    BATCH_KEYFRAMES = os.getenv('BATCH_KEYFRAMES', 'true').lower() == 'true'
+    BATCH_SCENE_CHANGE_RATIO = float(os.getenv('BATCH_SCENE_CHANGE_RATIO', '0.02'))
+    BATCH_MIN_KEYFRAME_INTERVAL = float(os.getenv('BATCH_MIN_KEYFRAME_INTERVAL', '2'))
@@ -0,0 +1,411 @@
+import itertools
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from multiprocessing import shared_memory
+import numpy as np
+from models_enhanced_people import EnhancedPeopleDetectionPipeline
+from state_snapshot import PeriodicSnapshotter
+from reference_background import ReferenceBackgroundStore
+from process_spawn import spawn_context, hidden_main_module
+
+def build_camera_pipeline(camera_id, zone_config, snapshotter, reference_store,
+                          posture_backend='silhouette', face_backend='haar', snapshots_enabled=True):
+    """Build a camera's pipeline and warm it from its snapshot or reference clip"""
+    pipeline = EnhancedPeopleDetectionPipeline(zones=zone_config.get(camera_id, zone_config.get('default')),
+                                               posture_backend=posture_backend,
+                                               face_backend=face_backend)
+
+    # Warm-restore detector state (background models, histories, tracks) from the last snapshot
+    restored = snapshots_enabled and snapshotter.restore(camera_id, pipeline)
+
+    # Without a snapshot, bootstrap the background models from the empty-booth reference clip
+    if not restored and reference_store.exists(camera_id):
+        pipeline.bootstrap_background(reference_store.load(camera_id))
+    return pipeline
+
+class SharedFrameRing:
+    """
+    Fixed-size frame slots in one shared-memory block
+    The server process copies a decoded frame into a free slot and sends only the
+    slot number, shape and dtype; the worker copies it back out. That is one memcpy
+    on each side instead of pickling the frame through a pipe.
+    """
+
+    def __init__(self, slots, slot_bytes, name=None):
+        self.slots = slots
+        self.slot_bytes = slot_bytes
+        self.owner = name is None
+        self.shm = shared_memory.SharedMemory(name=name, create=self.owner, size=slots * slot_bytes)
+        self.name = self.shm.name
+
+        # Slot bookkeeping only happens in the owning (server) process
+        self.free = deque(range(slots))
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """A free slot number, or None when every slot is in flight"""
+        with self.lock:
+            return self.free.popleft() if self.free else None
+
+    def release(self, slot):
+        with self.lock:
+            self.free.append(slot)
+
+    def fits(self, frame):
+        return frame.nbytes <= self.slot_bytes
+
+    def write(self, slot, frame):
+        view = np.ndarray(frame.shape, dtype=frame.dtype, buffer=self.shm.buf, offset=slot * self.slot_bytes)
+        np.copyto(view, frame)
+
+    def read(self, slot, shape, dtype):
+        # Copied out because the pipeline keeps frames and the slot is reused
+        view = np.ndarray(shape, dtype=np.dtype(dtype), buffer=self.shm.buf, offset=slot * self.slot_bytes)
+        return view.copy()
+
+    def close(self):
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+# Pipeline calls a RemotePipeline can make besides processing frames
+REMOTE_CALLS = {
+    'get_detection_stats': lambda pipeline: pipeline.get_detection_stats(),
+    'get_zone_heatmap': lambda pipeline: pipeline.get_zone_heatmap(),
+    'bootstrap_background': lambda pipeline, frames: pipeline.bootstrap_background(frames),
+    'recent_frames': lambda pipeline: list(pipeline.recent_frames),
+}
+
+def _worker_main(conn, ring_name, slots, slot_bytes, settings):
+    """Detection worker process: owns the pipelines of the cameras pinned to it"""
+    ring = SharedFrameRing(slots, slot_bytes, name=ring_name)
+    snapshotter = PeriodicSnapshotter(settings['snapshot_dir'], settings['snapshot_interval'])
+    reference_store = ReferenceBackgroundStore(settings['reference_dir'])
+    pipelines = {}
+
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, OSError):
+            break
+        if message is None:
+            break
+
+        request_id, op, camera_id, payload = message
+        try:
+            if op == 'frame':
+                if payload[0] == 'shm':
+                    frame = ring.read(*payload[1:4])
+                else:
+                    frame = payload[1]
+                pipeline = pipelines[camera_id]
+                value = pipeline.process_frame(frame, payload[-1])
+                if settings['snapshots_enabled']:
+                    snapshotter.maybe_snapshot(camera_id, pipeline)
+
+            elif op == 'create':
+                pipeline = pipelines.get(camera_id)
+                if pipeline is None:
+                    pipeline = build_camera_pipeline(camera_id, settings['zones'], snapshotter, reference_store,
+                                                     settings['posture_backend'], settings['face_backend'],
+                                                     settings['snapshots_enabled'])
+                    pipelines[camera_id] = pipeline
+                value = {
+                    'min_input_resolution': pipeline.min_input_resolution(),
+                    'detector_min_resolution': dict(pipeline.detector_min_resolution)
+                }
+
+            elif op == 'call':
+                method, args = payload
+                value = REMOTE_CALLS[method](pipelines[camera_id], *args)
+
+            elif op == 'release':
+                pipeline = pipelines.pop(camera_id, None)
+                if pipeline is not None and payload:
+                    snapshotter.snapshot_now(camera_id, pipeline)
+                value = pipeline is not None
+
+            else:
+                raise ValueError(f"Unknown worker operation: {op}")
+
+            conn.send((request_id, True, value))
+
+        except Exception as e:
+            conn.send((request_id, False, f"{type(e).__name__}: {e}"))
+
+    # Let pending snapshot writes finish before the process exits
+    snapshotter.wait_for_writes(timeout=5)
+    ring.close()
+
+class DetectionWorker:
+    """
+    Server-side handle for one detection process
+    - Requests go down a Pipe; a reader thread resolves their futures
+    - Frames travel through the worker's SharedFrameRing when a slot is free,
+      otherwise they are pickled with the request
+    - A worker that dies is restarted; on_exit(worker, cameras) hands its cameras
+      back to the pool, and they are rebuilt (from their snapshots) on their next frame
+    """
+
+    def __init__(self, index, context, settings, slots, slot_bytes, on_exit=None):
+        self.index = index
+        self.context = context
+        self.settings = settings
+        self.on_exit = on_exit
+        self.ring = SharedFrameRing(slots, slot_bytes)
+
+        self.cameras = set()
+        self.pending = {}  # request_id -> (future, slot)
+        self.request_ids = itertools.count()
+        self.lock = threading.Lock()
+        # Separate from self.lock so a large send never blocks the reader thread
+        self.send_lock = threading.Lock()
+        self.running = True
+        self.generation = 0
+
+        self.stats = {'frames': 0, 'shared_memory': 0, 'pickled': 0, 'errors': 0, 'restarts': 0}
+        self.roundtrip_ms = 0.0
+
+        self._start()
+
+    def _start(self):
+        parent_conn, child_conn = self.context.Pipe()
+        self.process = self.context.Process(
+            target=_worker_main,
+            args=(child_conn, self.ring.name, self.ring.slots, self.ring.slot_bytes, self.settings),
+            name=f"detection-worker-{self.index}",
+            daemon=True)
+        # The worker only needs detection_workers and the pipeline modules, never app.py
+        with hidden_main_module():
+            self.process.start()
+        child_conn.close()
+
+        self.conn = parent_conn
+        self.generation += 1
+        reader = threading.Thread(target=self._read, args=(parent_conn, self.generation),
+                                  name=f"detection-worker-{self.index}-reader", daemon=True)
+        reader.start()
+
+    def request(self, op, camera_id, payload=None, timeout=30.0, slot=None):
+        """Send one request and wait for the worker's answer"""
+        future = Future()
+        with self.lock:
+            request_id = next(self.request_ids)
+            self.pending[request_id] = (future, slot)
+
+        try:
+            with self.send_lock:
+                self.conn.send((request_id, op, camera_id, payload))
+        except (OSError, ValueError) as e:
+            with self.lock:
+                registered = self.pending.pop(request_id, None) is not None
+            if registered and slot is not None:
+                self.ring.release(slot)
+            raise RuntimeError(f"Detection worker {self.index} unavailable: {e}")
+
+        return future.result(timeout)
+
+    def process_frame(self, camera_id, frame, timestamp=None, timeout=30.0):
+        """Run a camera's pipeline on a frame in the worker process"""
+        slot = self.ring.acquire() if self.ring.fits(frame) else None
+        if slot is not None:
+            self.ring.write(slot, frame)
+            payload = ('shm', slot, frame.shape, frame.dtype.str, timestamp)
+            self.stats['shared_memory'] += 1
+        else:
+            payload = ('array', frame, timestamp)
+            self.stats['pickled'] += 1
+
+        start = time.monotonic()
+        try:
+            results = self.request('frame', camera_id, payload, timeout, slot=slot)
+        except Exception:
+            self.stats['errors'] += 1
+            raise
+
+        self.stats['frames'] += 1
+        self.roundtrip_ms = (time.monotonic() - start) * 1000
+        return results
+
+    def stop(self):
+        with self.lock:
+            self.running = False
+        try:
+            with self.send_lock:
+                self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(timeout=10)
+        if self.process.is_alive():
+            self.process.terminate()
+        self.ring.close()
+
+    def get_stats(self):
+        return dict(self.stats,
+                    worker=self.index,
+                    pid=self.process.pid,
+                    alive=self.process.is_alive(),
+                    cameras=sorted(self.cameras),
+                    free_slots=len(self.ring.free),
+                    last_roundtrip_ms=round(self.roundtrip_ms, 1))
+
+    def _read(self, conn, generation):
+        while True:
+            try:
+                request_id, ok, value = conn.recv()
+            except (EOFError, OSError):
+                break
+
+            with self.lock:
+                future, slot = self.pending.pop(request_id, (None, None))
+            if slot is not None:
+                self.ring.release(slot)
+            if future is None:
+                continue
+            if ok:
+                future.set_result(value)
+            else:
+                future.set_exception(RuntimeError(value))
+
+        self._handle_exit(generation)
+
+    def _handle_exit(self, generation):
+        """Fail in-flight requests and restart the process if it died unexpectedly"""
+        with self.lock:
+            if generation != self.generation:
+                return
+            pending = list(self.pending.values())
+            self.pending.clear()
+            cameras = set(self.cameras)
+            self.cameras.clear()
+            # Before the restart bumps the generation, so reconnecting cameras are reassigned
+            if self.on_exit is not None:
+                self.on_exit(self, cameras)
+
+            if self.running:
+                self.process.join(timeout=1)
+                print(f"[ERROR] Detection worker {self.index} exited (code {self.process.exitcode}), restarting")
+                self.stats['restarts'] += 1
+                self._start()
+
+        for future, slot in pending:
+            if slot is not None:
+                self.ring.release(slot)
+            future.set_exception(RuntimeError(f"Detection worker {self.index} exited"))
+
+class RemotePipeline:
+    """
+    Server-side stand-in for a camera pipeline living in a worker process
+    Exposes the pipeline methods the server uses; frames, stats, heatmaps and
+    reference-background calls are forwarded to the camera's worker
+    """
+
+    def __init__(self, camera_id, worker, pool):
+        self.camera_id = camera_id
+        self.worker = worker
+        self.pool = pool
+        self.generation = None
+        self._connect()
+
+    def _connect(self):
+        generation = self.worker.generation
+        info = self.worker.request('create', self.camera_id, timeout=self.pool.timeout)
+        self.generation = generation
+        self._min_input_resolution = tuple(info['min_input_resolution'])
+        self.detector_min_resolution = {name: tuple(size) for name, size in
+                                        info['detector_min_resolution'].items()}
+
+    def _ensure_connected(self):
+        # The worker was restarted since this camera was created there: pin it again
+        # (possibly to another worker) and rebuild its pipeline
+        if self.worker.generation != self.generation:
+            self.worker = self.pool.assign(self.camera_id)
+            self._connect()
+
+    def _call(self, method, *args):
+        self._ensure_connected()
+        return self.worker.request('call', self.camera_id, (method, args), timeout=self.pool.timeout)
+
+    def process_frame(self, frame, timestamp=None):
+        self._ensure_connected()
+        return self.worker.process_frame(self.camera_id, frame, timestamp, timeout=self.pool.timeout)
+
+    def min_input_resolution(self):
+        return self._min_input_resolution
+
+    @property
+    def recent_frames(self):
+        return self._call('recent_frames')
+
+    def bootstrap_background(self, frames):
+        return self._call('bootstrap_background', list(frames))
+
+    def get_zone_heatmap(self):
+        return self._call('get_zone_heatmap')
+
+    def get_detection_stats(self):
+        stats = self._call('get_detection_stats')
+        stats['worker'] = self.worker.index
+        return stats
+
+    def release(self, snapshot=False):
+        """Drop the camera's pipeline from its worker, optionally snapshotting it first"""
+        self.pool.release(self.camera_id, self.worker)
+        try:
+            self.worker.request('release', self.camera_id, snapshot, timeout=self.pool.timeout)
+        except Exception as e:
+            print(f"[ERROR] Error releasing camera {self.camera_id} on worker {self.worker.index}: {e}")
+
+class DetectionWorkerPool:
+    """
+    N detection processes with cameras pinned to workers
+    - Each camera's pipeline lives in exactly one worker, so its state stays local
+    - New cameras go to the worker with the fewest cameras
+    - Pipelines run without sharing a GIL, so multi-camera throughput scales with cores
+    """
+
+    def __init__(self, num_workers, settings, slots=8, slot_bytes=1280 * 720 * 3, timeout=30.0):
+        self.timeout = timeout
+        self.assignments = {}  # camera_id -> DetectionWorker
+        self.lock = threading.Lock()
+
+        context = spawn_context()
+        self.workers = [DetectionWorker(index, context, settings, slots, slot_bytes, on_exit=self._worker_exited)
+                        for index in range(num_workers)]
+        print(f"[SUCCESS] Started {num_workers} detection worker processes")
+
+    def assign(self, camera_id):
+        """The worker a camera is pinned to, pinning it to the least-loaded worker if needed"""
+        with self.lock:
+            worker = self.assignments.get(camera_id)
+            if worker is None:
+                worker = min(self.workers, key=lambda w: len(w.cameras))
+                self.assignments[camera_id] = worker
+            worker.cameras.add(camera_id)
+        return worker
+
+    def create_pipeline(self, camera_id):
+        """Pin a camera to a worker and build its pipeline there"""
+        return RemotePipeline(camera_id, self.assign(camera_id), self)
+
+    def release(self, camera_id, worker):
+        with self.lock:
+            if self.assignments.get(camera_id) is worker:
+                del self.assignments[camera_id]
+            worker.cameras.discard(camera_id)
+
+    def _worker_exited(self, worker, cameras):
+        """A worker died: its cameras lost their pipelines and are pinned again on their next frame"""
+        with self.lock:
+            for camera_id in cameras:
+                if self.assignments.get(camera_id) is worker:
+                    del self.assignments[camera_id]
+
+    def shutdown(self):
+        for worker in self.workers:
+            worker.stop()
+
+    def get_stats(self):
+        return [worker.get_stats() for worker in self.workers]
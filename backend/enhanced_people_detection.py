@@ -1,6 +1,7 @@
 import cv2
 import numpy as np
 import time
+import threading
 from collections import deque, Counter
 import math
 
@@ -14,6 +15,30 @@ class EnhancedPeopleDetection:
     - Advanced filtering and validation
     """
     
+    # HOG detectors are read-only after construction, so every camera shares one set
+    _shared_hogs = None
+    _shared_hogs_lock = threading.Lock()
+    
+    @classmethod
+    def shared_hog_detectors(cls):
+        """HOG detectors built once per process"""
+        with cls._shared_hogs_lock:
+            if cls._shared_hogs is None:
+                # Multiple HOG detectors with different configurations
+                hog_default = cv2.HOGDescriptor()
+                hog_default.setSVMDetector(cv2.HOGDescriptor_getDefaultPeopleDetector())
+                
+                # Daimler HOG detector for better accuracy
+                hog_daimler = cv2.HOGDescriptor((48, 96), (16, 16), (8, 8), (8, 8), 9)
+                hog_daimler.setSVMDetector(cv2.HOGDescriptor_getDaimlerPeopleDetector())
+                
+                # Custom HOG detector with different parameters
+                hog_custom = cv2.HOGDescriptor((64, 128), (16, 16), (8, 8), (8, 8), 9)
+                hog_custom.setSVMDetector(cv2.HOGDescriptor_getDefaultPeopleDetector())
+                
+                cls._shared_hogs = (hog_default, hog_daimler, hog_custom)
+            return cls._shared_hogs
+    
     def __init__(self):
         self.initialize_enhanced_models()
         
@@ -24,6 +49,13 @@ class EnhancedPeopleDetection:
         self.tracking_ids = []
         self.next_id = 1
         
+        # Validated HOG person boxes from the last frame, in resized (320x240) coordinates
+        self.person_boxes = []
+        self.person_boxes_shape = (240, 320)
+        
+        # Last MOG2 foreground mask (resized coordinates), shared with zone dwell tracking
+        self.last_fg_mask = None
+        
         # Performance optimization
         self.frame_skip = 1  # Process every frame for faster response
         self.frame_count = 0
@@ -31,17 +63,8 @@ class EnhancedPeopleDetection:
     def initialize_enhanced_models(self):
         """Initialize all detection models with optimized parameters"""
         try:
-            # Multiple HOG detectors with different configurations
-            self.hog_default = cv2.HOGDescriptor()
-            self.hog_default.setSVMDetector(cv2.HOGDescriptor_getDefaultPeopleDetector())
-            
-            # Daimler HOG detector for better accuracy
-            self.hog_daimler = cv2.HOGDescriptor((48, 96), (16, 16), (8, 8), (8, 8), 9)
-            self.hog_daimler.setSVMDetector(cv2.HOGDescriptor_getDaimlerPeopleDetector())
-            
-            # Custom HOG detector with different parameters
-            self.hog_custom = cv2.HOGDescriptor((64, 128), (16, 16), (8, 8), (8, 8), 9)
-            self.hog_custom.setSVMDetector(cv2.HOGDescriptor_getDefaultPeopleDetector())
+            # Shared HOG detectors (immutable); everything below is per-camera state
+            self.hog_default, self.hog_daimler, self.hog_custom = self.shared_hog_detectors()
             
             # Background subtractors with different parameters
             self.bg_subtractor_mog2 = cv2.createBackgroundSubtractorMOG2(
@@ -85,6 +108,7 @@ class EnhancedPeopleDetection:
             
             # Method 1: Multi-scale HOG detection
             hog_detections = self._detect_people_hog_enhanced(frame_resized)
+            self.person_boxes_shape = frame_resized.shape[:2]
             
             # Method 2: Advanced background subtraction
             bg_detections = self._detect_people_background_enhanced(gray, frame.shape)
@@ -157,22 +181,39 @@ class EnhancedPeopleDetection:
             filtered_boxes = self._apply_nms(all_boxes, all_weights, overlap_threshold=0.3)
             
             # Validate detections
-            valid_detections = 0
-            for box in filtered_boxes:
-                if self._validate_person_detection(box, frame.shape):
-                    valid_detections += 1
+            valid_boxes = [box for box in filtered_boxes
+                           if self._validate_person_detection(box, frame.shape)]
+            self.person_boxes = valid_boxes
             
-            return valid_detections
+            return len(valid_boxes)
             
         except Exception as e:
             print(f"HOG detection error: {e}")
+            self.person_boxes = []
             return 0
     
+    def get_person_boxes(self, frame_shape):
+        """Return the last validated person boxes scaled to a frame of the given shape"""
+        try:
+            scale_y = frame_shape[0] / self.person_boxes_shape[0]
+            scale_x = frame_shape[1] / self.person_boxes_shape[1]
+            
+            boxes = []
+            for x, y, w, h in self.person_boxes:
+                boxes.append((int(x * scale_x), int(y * scale_y),
+                              int(w * scale_x), int(h * scale_y)))
+            return boxes
+            
+        except Exception as e:
+            print(f"Person box scaling error: {e}")
+            return []
+    
     def _detect_people_background_enhanced(self, gray, frame_shape):
         """Enhanced background subtraction with multiple methods"""
         try:
             # Method 1: MOG2
             fg_mask_mog2 = self.bg_subtractor_mog2.apply(gray)
+            self.last_fg_mask = fg_mask_mog2
             people_mog2 = self._count_people_from_mask_enhanced(fg_mask_mog2, frame_shape)
             
             # Method 2: KNN
@@ -459,6 +500,12 @@ class EnhancedPeopleDetection:
             print(f"Temporal consistency error: {e}")
             return people_count
     
+    def hold_frame(self):
+        """Repeat the last frame's people count in the frame histories (frame skipped as unchanged)"""
+        if self.people_history:
+            people_count = self._apply_temporal_consistency(self.people_history[-1])
+            self.detection_history.append(people_count)
+    
     def _update_tracking(self, frame, people_count):
         """Update people tracking for better consistency"""
         try:
@@ -497,6 +544,101 @@ class EnhancedPeopleDetection:
             print(f"Fallback people detection error: {e}")
             return 0
     
+    def seed_background_models(self, images, bursts=5):
+        """
+        Seed every background subtractor from known background images
+        A learning rate of 1.0 re-initializes each model from the image, so
+        masks are usable immediately instead of after `history` frames; KNN
+        stores no samples at rate 1.0, so the bursts that fill its sample
+        buffers use a high rate just below it
+        """
+        try:
+            subtractors = [self.bg_subtractor_mog2, self.bg_subtractor_knn, self.bg_subtractor_mog2_alt]
+            for subtractor, image in zip(subtractors, images):
+                if image is None:
+                    continue
+                if image.ndim == 3:
+                    image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+                subtractor.apply(image, learningRate=1.0)
+                for _ in range(bursts):
+                    subtractor.apply(image, learningRate=0.9)
+            return True
+            
+        except Exception as e:
+            print(f"Background seeding error: {e}")
+            return False
+    
+    def bootstrap_background(self, frames, passes=3):
+        """
+        Fast background-model convergence from a reference clip of the empty scene
+        The first frame re-initializes each model (learning rate 1.0), then the clip
+        is replayed with decaying high learning rates so the models also learn the
+        scene's normal noise, instead of waiting for `history` live frames
+        """
+        try:
+            grays = []
+            for frame in frames:
+                if frame.shape[:2] != (240, 320):
+                    frame = cv2.resize(frame, (320, 240))
+                if frame.ndim == 3:
+                    frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+                grays.append(frame)
+            
+            if not grays:
+                return False
+            
+            for subtractor in [self.bg_subtractor_mog2, self.bg_subtractor_knn, self.bg_subtractor_mog2_alt]:
+                subtractor.apply(grays[0], learningRate=1.0)
+                for _ in range(passes):
+                    for i, gray in enumerate(grays):
+                        subtractor.apply(gray, learningRate=max(0.05, 1.0 / (i + 2)))
+            
+            # Optical flow restarts from the reference scene
+            self.prev_gray = grays[-1]
+            return True
+            
+        except Exception as e:
+            print(f"Background bootstrap error: {e}")
+            return False
+    
+    def export_state(self):
+        """Background model images and rolling histories for snapshots"""
+        state = {
+            'people_history': list(self.people_history),
+            'detection_history': list(self.detection_history),
+            'frame_count': self.frame_count
+        }
+        
+        backgrounds = {
+            'mog2': self.bg_subtractor_mog2,
+            'knn': self.bg_subtractor_knn,
+            'mog2_alt': self.bg_subtractor_mog2_alt
+        }
+        for name, subtractor in backgrounds.items():
+            image = subtractor.getBackgroundImage()
+            if image is not None:
+                state[f'background_{name}'] = image
+        
+        if self.prev_gray is not None:
+            state['prev_gray'] = self.prev_gray.copy()
+        
+        return state
+    
+    def import_state(self, state):
+        """Restore a state exported by export_state"""
+        self.people_history.clear()
+        self.people_history.extend(state.get('people_history', []))
+        self.detection_history.clear()
+        self.detection_history.extend(state.get('detection_history', []))
+        self.frame_count = state.get('frame_count', 0)
+        self.prev_gray = state.get('prev_gray')
+        
+        self.seed_background_models([
+            state.get('background_mog2'),
+            state.get('background_knn'),
+            state.get('background_mog2_alt')
+        ])
+    
     def get_detection_stats(self):
         """Get detection statistics for analysis"""
         try:
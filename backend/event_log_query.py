@@ -0,0 +1,133 @@
+import base64
+import json
+import math
+import threading
+import time
+from datetime import datetime, timezone
+
+SORT_FIELDS = ('timestamp', 'event_type', 'confidence')
+MAX_PER_PAGE = 100
+
+def parse_time(value):
+    """ISO 8601 time (naive UTC, like stored event timestamps), or None if missing; raises ValueError"""
+    if value is None or value == '':
+        return None
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+def parse_confidence(value):
+    if value is None or value == '':
+        return None
+    confidence = float(value)
+    if not math.isfinite(confidence):
+        raise ValueError(f'Invalid confidence: {value}')
+    return confidence
+
+def encode_cursor(sort_value, row_id):
+    """Opaque keyset cursor: the sort value and id of the last row on a page"""
+    if isinstance(sort_value, datetime):
+        sort_value = sort_value.isoformat()
+    payload = json.dumps([sort_value, row_id], separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip('=')
+
+def decode_cursor(cursor, sort_by):
+    """(sort_value, id) from encode_cursor(); raises ValueError for a malformed cursor"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except Exception:
+        raise ValueError('Invalid cursor')
+    if not isinstance(row_id, int):
+        raise ValueError('Invalid cursor')
+
+    if sort_by == 'timestamp':
+        try:
+            sort_value = parse_time(sort_value) if isinstance(sort_value, str) else None
+        except ValueError:
+            sort_value = None
+    elif sort_by == 'confidence':
+        sort_value = float(sort_value) if isinstance(sort_value, (int, float)) else None
+    elif not isinstance(sort_value, str):
+        sort_value = None
+    if sort_value is None:
+        raise ValueError('Invalid cursor')
+    return sort_value, row_id
+
+def parse_event_query(args):
+    """
+    Validated /api/event-logs query from request args; raises ValueError with a
+    message suitable for a 400 response
+    - filter/event_type ('all' = any), search, min_confidence/max_confidence,
+      start/end (ISO 8601, UTC)
+    - sort_by (timestamp, event_type, confidence), sort_order (asc, desc)
+    - cursor from a previous page's next_cursor, or page for offset paging
+    """
+    event_type = args.get('event_type') or args.get('filter')
+    sort_by = args.get('sort_by') or 'timestamp'
+    sort_order = (args.get('sort_order') or 'desc').lower()
+    if sort_by not in SORT_FIELDS:
+        raise ValueError(f'Unsupported sort_by: {sort_by}')
+    if sort_order not in ('asc', 'desc'):
+        raise ValueError(f'Unsupported sort_order: {sort_order}')
+
+    try:
+        per_page = int(args.get('per_page') or 10)
+        page = int(args.get('page') or 1)
+    except (TypeError, ValueError):
+        raise ValueError('page and per_page must be integers')
+
+    try:
+        query = {
+            'event_type': None if event_type in (None, '', 'all') else event_type,
+            'search': (args.get('search') or '').strip() or None,
+            'min_confidence': parse_confidence(args.get('min_confidence')),
+            'max_confidence': parse_confidence(args.get('max_confidence')),
+            'start': parse_time(args.get('start')),
+            'end': parse_time(args.get('end')),
+        }
+    except ValueError as e:
+        raise ValueError(f'Invalid filter: {e}')
+
+    cursor = args.get('cursor')
+    query.update(sort_by=sort_by,
+                 sort_order=sort_order,
+                 per_page=max(1, min(per_page, MAX_PER_PAGE)),
+                 page=max(1, page),
+                 cursor=decode_cursor(cursor, sort_by) if cursor else None)
+    return query
+
+def count_key(query):
+    """Cache key for the total of a query: its filters, not its sort or position"""
+    return tuple((name, query[name]) for name in
+                 ('event_type', 'search', 'min_confidence', 'max_confidence', 'start', 'end'))
+
+class CountCache:
+    """
+    Short-lived cache of event-log totals per filter combination
+    A COUNT(*) over tens of millions of rows costs more than the page itself,
+    so each filter's total is computed at most once per ttl seconds
+    """
+
+    def __init__(self, ttl=30.0, max_entries=256):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.entries = {}  # key -> (count, computed_at)
+        self.lock = threading.Lock()
+
+    def get(self, key, compute):
+        """Cached count for key, calling compute() when missing or stale"""
+        now = time.monotonic()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and now - entry[1] < self.ttl:
+                return entry[0]
+
+        count = compute()
+        with self.lock:
+            if len(self.entries) >= self.max_entries:
+                # Drop the oldest entry
+                del self.entries[min(self.entries, key=lambda k: self.entries[k][1])]
+            self.entries[key] = (count, now)
+        return count
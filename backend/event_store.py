@@ -0,0 +1,104 @@
+import csv
+import io
+from datetime import datetime
+from sqlalchemy import MetaData, Table, Column, Index, Integer, String, Text, Float, DateTime, Date, create_engine, func, select
+
+# Core definitions of the tables written in bulk, matching the models in app.py and
+# the setup scripts, so the writers here work without importing the Flask app
+metadata = MetaData()
+
+event_log = Table(
+    'event_log', metadata,
+    Column('id', Integer, primary_key=True),
+    Column('event_type', String(100), nullable=False),
+    Column('description', Text, nullable=False),
+    Column('confidence', Float, nullable=False),
+    Column('timestamp', DateTime, default=datetime.utcnow),
+    Column('image_path', String(255))
+)
+
+detection_stats = Table(
+    'detection_stats', metadata,
+    Column('id', Integer, primary_key=True),
+    Column('date', Date),
+    Column('people_count', Integer, default=0),
+    Column('helmet_violations', Integer, default=0),
+    Column('face_cover_violations', Integer, default=0),
+    Column('loitering_events', Integer, default=0),
+    Column('posture_violations', Integer, default=0),
+    # The daily-stats upsert's conflict target
+    Index('ux_detection_stats_date', 'date', unique=True)
+)
+
+EVENT_COLUMNS = ('event_type', 'description', 'confidence', 'timestamp')
+STATS_COLUMNS = ('people_count', 'helmet_violations', 'face_cover_violations', 'loitering_events', 'posture_violations')
+
+def insert_event_rows(connection, rows, table=event_log):
+    """Bulk-insert event_log rows on a connection: COPY on PostgreSQL, executemany elsewhere"""
+    if not rows:
+        return
+    if connection.dialect.name == 'postgresql':
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow([row['event_type'], row['description'], row['confidence'], row['timestamp'].isoformat()])
+        buffer.seek(0)
+
+        cursor = connection.connection.cursor()
+        cursor.copy_expert(f"COPY {table.name} ({', '.join(EVENT_COLUMNS)}) FROM STDIN WITH (FORMAT csv)", buffer)
+        cursor.close()
+    else:
+        connection.execute(table.insert(), rows)
+
+def store_event_rows(database_uri, rows, batch_size=1000):
+    """Insert event rows in one transaction on a short-lived engine, without the Flask app; returns the row count"""
+    engine = create_engine(database_uri)
+    try:
+        with engine.begin() as connection:
+            for start in range(0, len(rows), batch_size):
+                insert_event_rows(connection, rows[start:start + batch_size])
+    finally:
+        engine.dispose()
+    return len(rows)
+
+def merge_duplicate_daily_stats(connection, table=detection_stats):
+    """
+    Sum detection_stats rows sharing a date into the oldest one and delete the others
+    Tables created before date was unique may hold duplicates, which would keep the
+    unique date index from being created; returns the number of rows removed
+    """
+    duplicates = connection.execute(
+        select(table.c.date).group_by(table.c.date).having(func.count() > 1)).scalars().all()
+
+    removed = 0
+    for date in duplicates:
+        rows = connection.execute(select(table).where(table.c.date == date).order_by(table.c.id)).mappings().all()
+        totals = {column: sum(row[column] or 0 for row in rows) for column in STATS_COLUMNS}
+        connection.execute(table.update().where(table.c.id == rows[0]['id']).values(**totals))
+        removed += connection.execute(
+            table.delete().where(table.c.date == date, table.c.id != rows[0]['id'])).rowcount
+    return removed
+
+def upsert_daily_stats(connection, stats, table=detection_stats):
+    """
+    Add summed counters ({date: {column: n}}) to detection_stats in one INSERT ... ON CONFLICT(date) DO UPDATE
+    Needs the unique date index (created at startup, after merge_duplicate_daily_stats)
+    """
+    if not stats:
+        return
+    if connection.dialect.name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+
+    rows = [dict({column: int(increments.get(column, 0)) for column in STATS_COLUMNS}, date=date)
+            for date, increments in stats.items()]
+    statement = insert(table).values(rows)
+    # The increment is applied by the database, so concurrent writers cannot lose updates;
+    # older rows may hold NULL counters, which count as 0
+    statement = statement.on_conflict_do_update(
+        index_elements=[table.c.date],
+        set_={column: func.coalesce(table.c[column], 0) + statement.excluded[column]
+              for column in STATS_COLUMNS}
+    )
+    connection.execute(statement)
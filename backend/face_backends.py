@@ -0,0 +1,129 @@
+import cv2
+import numpy as np
+
+try:
+    import mediapipe as mp
+except ImportError:
+    mp = None
+
+class HaarFaceBackend:
+    """
+    Haar cascade face detection for the face-cover path
+    Frontal cascades are tried in order and the search stops at the first hit;
+    the profile cascade is only reached when every frontal cascade misses.
+    Haar faces carry no keypoints.
+    """
+
+    name = 'haar'
+
+    def __init__(self):
+        self.face_cascade_default = cv2.CascadeClassifier(
+            cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
+        self.face_cascade_alt = cv2.CascadeClassifier(
+            cv2.data.haarcascades + 'haarcascade_frontalface_alt.xml')
+        self.face_cascade_alt2 = cv2.CascadeClassifier(
+            cv2.data.haarcascades + 'haarcascade_frontalface_alt2.xml')
+        self.profile_cascade = cv2.CascadeClassifier(
+            cv2.data.haarcascades + 'haarcascade_profileface.xml')
+
+        # Cascade search order - frontal cascades first, profile only as a last resort
+        self.face_cascade_order = [
+            ('default', self.face_cascade_default),
+            ('alt2', self.face_cascade_alt2),
+            ('alt', self.face_cascade_alt),
+            ('profile', self.profile_cascade)
+        ]
+
+    @property
+    def available(self):
+        return True
+
+    def detect(self, frame, gray, region, scale, min_face_size):
+        """Faces in a downscaled region as (box, keypoints) pairs in frame coordinates"""
+        x0, y0, x1, y1 = region
+        roi = gray[y0:y1, x0:x1]
+        if roi.size == 0:
+            return []
+
+        if scale < 1.0:
+            roi = cv2.resize(roi, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+
+        # Haar cascades are trained at ~24px, so never ask for smaller windows
+        min_size = max(24, int(min_face_size * scale))
+        if roi.shape[0] < min_size or roi.shape[1] < min_size:
+            return []
+
+        for name, cascade in self.face_cascade_order:
+            detected = cascade.detectMultiScale(roi, 1.1, 5, minSize=(min_size, min_size))
+            if len(detected) > 0:
+                return [((x0 + int(fx / scale), y0 + int(fy / scale), int(fw / scale), int(fh / scale)), None)
+                        for (fx, fy, fw, fh) in detected]
+
+        return []
+
+class MediaPipeFaceBackend:
+    """
+    MediaPipe short-range face detection for the face-cover path
+    One detector pass per region replaces the four Haar cascades, and each face
+    comes with six keypoints (normalized to the face box) that the lower-face
+    and eye-visibility scores use directly
+    """
+
+    name = 'mediapipe'
+    KEYPOINT_NAMES = ('right_eye', 'left_eye', 'nose_tip', 'mouth_center', 'right_ear', 'left_ear')
+
+    def __init__(self, min_detection_confidence=0.5):
+        self.detector = None
+        if mp is not None:
+            try:
+                # model_selection=0 is the short-range model (faces within ~2m of the camera)
+                self.detector = mp.solutions.face_detection.FaceDetection(
+                    model_selection=0, min_detection_confidence=min_detection_confidence)
+            except Exception as e:
+                print(f"[ERROR] Error initializing MediaPipe face detection: {e}")
+
+    @property
+    def available(self):
+        return self.detector is not None
+
+    def detect(self, frame, gray, region, scale, min_face_size):
+        """Faces in a downscaled region as (box, keypoints) pairs in frame coordinates"""
+        x0, y0, x1, y1 = region
+        roi = frame[y0:y1, x0:x1]
+        if roi.size == 0:
+            return []
+
+        if scale < 1.0:
+            roi = cv2.resize(roi, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+
+        result = self.detector.process(cv2.cvtColor(roi, cv2.COLOR_BGR2RGB))
+        if not result.detections:
+            return []
+
+        region_w, region_h = x1 - x0, y1 - y0
+        faces = []
+        for detection in result.detections:
+            box = detection.location_data.relative_bounding_box
+            fx = x0 + int(max(0.0, box.xmin) * region_w)
+            fy = y0 + int(max(0.0, box.ymin) * region_h)
+            fw = int(min(box.width, 1.0 - max(0.0, box.xmin)) * region_w)
+            fh = int(min(box.height, 1.0 - max(0.0, box.ymin)) * region_h)
+            if fw < min_face_size or fh < min_face_size:
+                continue
+
+            # Keypoints relative to the face box, so they index straight into face crops
+            keypoints = np.array([((x0 + kp.x * region_w - fx) / fw, (y0 + kp.y * region_h - fy) / fh)
+                                  for kp in detection.location_data.relative_keypoints],
+                                 dtype=np.float64)
+            faces.append(((fx, fy, fw, fh), dict(zip(self.KEYPOINT_NAMES, keypoints))))
+
+        return faces
+
+def create_face_backend(name):
+    """Face backend by name, falling back to Haar cascades when MediaPipe is unavailable"""
+    if name == 'mediapipe':
+        backend = MediaPipeFaceBackend()
+        if backend.available:
+            return backend
+        print("[WARNING] MediaPipe face detection unavailable, using Haar cascades")
+    return HaarFaceBackend()
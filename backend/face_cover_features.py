@@ -0,0 +1,201 @@
+import cv2
+import numpy as np
+
+class FaceRegionFeatures:
+    """
+    Single-pass feature extraction for the face-cover ensemble
+    Converts a face region to HSV and gray once, builds the Laplacian texture map,
+    the edge map and the mask-color coverage, and exposes a compact feature vector
+    that every face-cover score reads from
+    """
+
+    FEATURE_NAMES = (
+        'mask_coverage',          # Mask-colored fraction of the whole face
+        'lower_mask_coverage',    # Mask-colored fraction below 40% of the face height
+        'lower_face_mask_ratio',  # Summed per-range mask hits over the lower half
+        'lower_face_uniformity',  # 1 - mean HSV std of the lower half / 255
+        'texture_variance',       # Variance of the Laplacian texture map
+        'edge_density'            # Fraction of pixels on the combined Canny edge map
+    )
+
+    TEXTURE_KERNEL = np.array([[-1, -1, -1], [-1, 8, -1], [-1, -1, -1]])
+
+    # Face keypoints normalized to the region, set when the face backend provides them
+    keypoints = None
+
+    def __init__(self, face_region, mask_ranges):
+        h, w = face_region.shape[:2]
+
+        # Shared conversions
+        self.face_region = face_region
+        self.hsv = cv2.cvtColor(face_region, cv2.COLOR_BGR2HSV)
+        self._gray = cv2.cvtColor(face_region, cv2.COLOR_BGR2GRAY)
+        self.texture = cv2.filter2D(self._gray, -1, self.TEXTURE_KERNEL)
+        self.edges = cv2.bitwise_or(cv2.Canny(self._gray, 30, 100), cv2.Canny(self._gray, 50, 150))
+
+        # Evaluate every mask color range exactly once
+        range_masks = [cv2.inRange(self.hsv, lower, upper)
+                       for ranges in mask_ranges.values()
+                       for lower, upper in ranges]
+        combined_mask = np.zeros((h, w), dtype=np.uint8)
+        for mask in range_masks:
+            combined_mask = cv2.bitwise_or(combined_mask, mask)
+
+        self.mask_coverage = cv2.countNonZero(combined_mask) / (h * w)
+
+        # Lower portion used by the color analysis (below 40% of the height)
+        lower_start = int(h * 0.4)
+        self.has_lower_portion = h - lower_start > 0
+        self.lower_mask_coverage = 0.0
+        if self.has_lower_portion:
+            self.lower_mask_coverage = (cv2.countNonZero(combined_mask[lower_start:, :]) /
+                                        ((h - lower_start) * w))
+
+        # Lower half used by the mouth/nose analysis
+        half = h // 2
+        self.has_lower_face = h - half > 0
+        self.lower_face_mask_ratio = 0.0
+        self.lower_face_uniformity = 0.0
+        if self.has_lower_face:
+            mask_pixels = sum(cv2.countNonZero(mask[half:, :]) for mask in range_masks)
+            self.lower_face_mask_ratio = mask_pixels / ((h - half) * w)
+            hsv_std = np.std(self.hsv[half:, :].reshape(-1, 3), axis=0)
+            self.lower_face_uniformity = 1.0 - (np.mean(hsv_std) / 255.0)
+
+        self.texture_variance = np.var(self.texture)
+        self.edge_density = cv2.countNonZero(self.edges) / (h * w)
+
+    @classmethod
+    def from_values(cls, face_region, values, gray=None):
+        """Build features for one face from precomputed values (used by FaceFeatureBatch)"""
+        features = cls.__new__(cls)
+        features.face_region = face_region
+        features._gray = gray
+        features.has_lower_portion = True
+        features.has_lower_face = True
+        for name, value in zip(cls.FEATURE_NAMES, values):
+            setattr(features, name, float(value))
+        return features
+
+    @property
+    def gray(self):
+        """Full-resolution gray face, converted on first use"""
+        if self._gray is None:
+            self._gray = cv2.cvtColor(self.face_region, cv2.COLOR_BGR2GRAY)
+        return self._gray
+
+    @property
+    def vector(self):
+        """Compact feature vector in FEATURE_NAMES order"""
+        return np.array([getattr(self, name) for name in self.FEATURE_NAMES], dtype=np.float64)
+
+class FaceFeatureBatch:
+    """
+    Face-cover features for every face in a frame, sharing the pixelwise work
+    Only the pixelwise work (HSV and gray conversion, every mask color range) is
+    batched: one OpenCV call each over all faces' pixels laid end to end at their
+    native resolution. The texture filter, Canny edges and lower-face statistics
+    still run per face, so the cost grows with the number of faces. No crop is
+    resized, so every feature equals FaceRegionFeatures and the face-cover
+    thresholds apply unchanged
+    """
+
+    def __init__(self, face_regions, mask_ranges):
+        self.face_regions = list(face_regions)
+        self.grays = [None] * len(self.face_regions)
+        self.values = np.zeros((len(self.face_regions), len(FaceRegionFeatures.FEATURE_NAMES)),
+                               dtype=np.float64)
+
+        if self.face_regions:
+            self._compute(mask_ranges)
+
+    def _compute(self, mask_ranges):
+        shapes = [face_region.shape[:2] for face_region in self.face_regions]
+        offsets = np.cumsum([0] + [h * w for h, w in shapes])
+
+        # Every face's pixels as one 1-pixel-high strip for the pixelwise conversions
+        strip = np.concatenate([np.ascontiguousarray(face_region).reshape(-1, 3)
+                                for face_region in self.face_regions]).reshape(1, -1, 3)
+        hsv = cv2.cvtColor(strip, cv2.COLOR_BGR2HSV)
+        gray = cv2.cvtColor(strip, cv2.COLOR_BGR2GRAY)[0]
+
+        # Mask color coverage - each range evaluated once for all faces
+        range_masks = [cv2.inRange(hsv, lower, upper)[0] > 0
+                       for ranges in mask_ranges.values()
+                       for lower, upper in ranges]
+        combined_mask = np.logical_or.reduce(range_masks)
+        range_hits = np.sum(range_masks, axis=0)  # Matching ranges per pixel
+        hsv = hsv[0]
+
+        for i, ((h, w), start) in enumerate(zip(shapes, offsets)):
+            end = start + h * w
+            face_mask = combined_mask[start:end].reshape(h, w)
+            face_hsv = hsv[start:end].reshape(h, w, 3)
+            face_gray = gray[start:end].reshape(h, w)
+            values = self.values[i]
+
+            values[0] = face_mask.mean()
+            lower_start = int(h * 0.4)
+            if h - lower_start > 0:
+                values[1] = face_mask[lower_start:, :].mean()
+            half = h // 2
+            if h - half > 0:
+                values[2] = range_hits[start:end].reshape(h, w)[half:, :].sum() / ((h - half) * w)
+                hsv_std = np.std(face_hsv[half:, :].reshape(-1, 3), axis=0)
+                values[3] = 1.0 - (np.mean(hsv_std) / 255.0)
+
+            # Neighborhood filters on the face alone, so edges never link across faces
+            texture = cv2.filter2D(face_gray, -1, FaceRegionFeatures.TEXTURE_KERNEL)
+            edges = cv2.bitwise_or(cv2.Canny(face_gray, 30, 100), cv2.Canny(face_gray, 50, 150))
+            values[4] = np.var(texture)
+            values[5] = cv2.countNonZero(edges) / (h * w)
+            self.grays[i] = face_gray
+
+    def __len__(self):
+        return len(self.face_regions)
+
+    def __iter__(self):
+        for face_region, values, gray in zip(self.face_regions, self.values, self.grays):
+            yield FaceRegionFeatures.from_values(face_region, values, gray)
+
+def keypoint_lower_face(face_region, keypoints, mask_ranges):
+    """
+    Mouth/nose features from face keypoints: the region from just above the
+    nose tip to below the mouth, between the eyes, instead of a fixed lower half
+    Returns (mask_ratio, uniformity) or None when the region is empty
+    """
+    h, w = face_region.shape[:2]
+    nose_y = keypoints['nose_tip'][1]
+    mouth_y = keypoints['mouth_center'][1]
+    eye_xs = (keypoints['right_eye'][0], keypoints['left_eye'][0])
+
+    top = int(np.clip(nose_y - 0.25 * (mouth_y - nose_y), 0, 1) * h)
+    bottom = int(np.clip(mouth_y + 0.75 * (mouth_y - nose_y), 0, 1) * h)
+    left = int(np.clip(min(eye_xs), 0, 1) * w)
+    right = int(np.clip(max(eye_xs), 0, 1) * w)
+    if bottom - top < 2 or right - left < 2:
+        return None
+
+    hsv = cv2.cvtColor(face_region[top:bottom, left:right], cv2.COLOR_BGR2HSV)
+    pixels = hsv.shape[0] * hsv.shape[1]
+    mask_pixels = sum(cv2.countNonZero(cv2.inRange(hsv, lower, upper))
+                      for ranges in mask_ranges.values()
+                      for lower, upper in ranges)
+    uniformity = 1.0 - np.mean(np.std(hsv.reshape(-1, 3), axis=0)) / 255.0
+    return mask_pixels / pixels, uniformity
+
+def keypoint_visible_eyes(face_gray, keypoints, patch_fraction=0.08, min_contrast=20.0):
+    """
+    Count eyes that look uncovered: an open eye is a high-contrast patch
+    (pupil against sclera and lids), sunglasses or a scarf are flat
+    """
+    h, w = face_gray.shape[:2]
+    half = max(2, int(w * patch_fraction))
+    visible = 0
+    for name in ('right_eye', 'left_eye'):
+        x = int(keypoints[name][0] * w)
+        y = int(keypoints[name][1] * h)
+        patch = face_gray[max(0, y - half):y + half, max(0, x - half):x + half]
+        if patch.size > 0 and np.std(patch) >= min_contrast:
+            visible += 1
+    return visible
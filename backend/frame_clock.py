@@ -0,0 +1,57 @@
+import math
+import time
+
+# Fallback timestamps are epoch seconds, so they compare with client capture times
+# and snapshotted track times, but advance monotonically (no NTP jumps)
+_WALL_ANCHOR = time.time()
+_MONOTONIC_ANCHOR = time.monotonic()
+
+def monotonic_now():
+    """Epoch-scaled monotonic time, used as the ingest time of frames without a timestamp"""
+    return _WALL_ANCHOR + (time.monotonic() - _MONOTONIC_ANCHOR)
+
+def parse_frame_timestamp(value):
+    """Client frame timestamp in epoch seconds (milliseconds are converted), or None"""
+    if value is None or value == '':
+        return None
+    try:
+        timestamp = float(value)
+    except (TypeError, ValueError):
+        return None
+    if not math.isfinite(timestamp) or timestamp < 0:
+        return None
+    # Browsers send Date.now() milliseconds
+    return timestamp / 1000.0 if timestamp > 1e11 else timestamp
+
+def ingest_frame_timestamp(value, max_skew=5.0, now=None):
+    """
+    Detector timestamp for a client-supplied frame: the client's capture time when it
+    is within max_skew seconds of ingest time, the ingest time otherwise. Camera clocks
+    never run backwards, so one far-future client timestamp would freeze them.
+    """
+    now = monotonic_now() if now is None else now
+    timestamp = parse_frame_timestamp(value)
+    if timestamp is None or abs(timestamp - now) > max_skew:
+        return now
+    return timestamp
+
+class FrameClock:
+    """
+    Detector clock for one pipeline, driven by frame timestamps
+    Temporal rules (loitering, dwell, tracker gaps and expiry, cache TTLs) read
+    this instead of the wall clock, so replayed footage gives the same results at
+    any speed. Frames without a timestamp use monotonic_now(); out-of-order
+    timestamps are clamped so the clock never runs backwards.
+    """
+
+    def __init__(self):
+        self.last = None
+
+    def tick(self, timestamp=None):
+        """Detector time for the current frame"""
+        if timestamp is None:
+            timestamp = monotonic_now()
+        if self.last is not None and timestamp < self.last:
+            timestamp = self.last
+        self.last = timestamp
+        return timestamp
@@ -0,0 +1,80 @@
+import cv2
+import numpy as np
+
+# Content types accepted as a raw encoded frame body
+BINARY_FRAME_TYPES = ('image/jpeg', 'image/png', 'image/webp', 'application/octet-stream')
+
+def decode_image_bytes(data):
+    """
+    Decode an encoded frame (JPEG/PNG/WebP bytes) straight to BGR
+    The bytes are wrapped without copying, so the decoded image is the only
+    full-frame buffer. Returns None when the data cannot be decoded.
+    """
+    if not data:
+        return None
+    buffer = np.frombuffer(memoryview(data), dtype=np.uint8)
+    return cv2.imdecode(buffer, cv2.IMREAD_COLOR)
+
+# DCT-domain downscaling factors for JPEG decode, largest first
+JPEG_REDUCED_MODES = (
+    (8, cv2.IMREAD_REDUCED_COLOR_8),
+    (4, cv2.IMREAD_REDUCED_COLOR_4),
+    (2, cv2.IMREAD_REDUCED_COLOR_2)
+)
+
+# Start-of-frame markers carry the image size (DHT, JPG and DAC share the range)
+JPEG_SOF_MARKERS = set(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+def jpeg_dimensions(data):
+    """(width, height) from a JPEG header without decoding, or None if not a JPEG"""
+    data = memoryview(data)
+    if len(data) < 4 or data[0] != 0xFF or data[1] != 0xD8:
+        return None
+
+    i = 2
+    while i + 9 < len(data):
+        if data[i] != 0xFF:
+            return None
+        marker = data[i + 1]
+        if marker == 0xFF:  # Fill byte
+            i += 1
+            continue
+        if marker == 0x01 or 0xD0 <= marker <= 0xD9:  # Standalone markers
+            i += 2
+            continue
+        if marker in JPEG_SOF_MARKERS:
+            height = (data[i + 5] << 8) | data[i + 6]
+            width = (data[i + 7] << 8) | data[i + 8]
+            return width, height
+        i += 2 + ((data[i + 2] << 8) | data[i + 3])
+
+    return None
+
+def reduced_decode_factor(size, min_size):
+    """Largest JPEG reduction factor keeping size at or above min_size (orientation-agnostic)"""
+    short_side, long_side = sorted(size)
+    min_short, min_long = sorted(min_size)
+    for factor, _ in JPEG_REDUCED_MODES:
+        if short_side // factor >= min_short and long_side // factor >= min_long:
+            return factor
+    return 1
+
+def decode_frame(data, min_size=None):
+    """
+    Decode a frame no larger than needed: JPEGs bigger than min_size (width, height)
+    are decoded with DCT-domain downscaling (1/2, 1/4 or 1/8), which cuts decode
+    time and memory; everything else is decoded at full size
+    Returns (frame, reduction_factor)
+    """
+    if not data:
+        return None, 1
+
+    if min_size is not None:
+        size = jpeg_dimensions(data)
+        factor = reduced_decode_factor(size, min_size) if size else 1
+        if factor > 1:
+            flag = dict(JPEG_REDUCED_MODES)[factor]
+            buffer = np.frombuffer(memoryview(data), dtype=np.uint8)
+            return cv2.imdecode(buffer, flag), factor
+
+    return decode_image_bytes(data), 1
@@ -0,0 +1,152 @@
+import threading
+import time
+from collections import deque
+
+class CameraFrameQueue:
+    """
+    Bounded per-camera frame queue serviced by a dedicated worker thread
+    - Request threads only enqueue; detection runs on the worker
+    - When the queue is full the oldest waiting frame is dropped (keep latest)
+    - The freshest completed result is always available with queue counters
+    """
+
+    def __init__(self, camera_id, process, capacity=2):
+        self.camera_id = camera_id
+        self.process = process
+        self.capacity = capacity
+
+        self.frames = deque()
+        self.condition = threading.Condition()
+        # Held while a frame is processed; other pipeline mutations take it too
+        self.processing_lock = threading.Lock()
+        self.next_sequence = 0
+
+        self.latest_result = None
+        self.latest_sequence = -1
+        self.in_progress = None
+
+        self.stats = {'received': 0, 'processed': 0, 'dropped': 0, 'errors': 0}
+        self.processing_ms = 0.0
+
+        self.running = True
+        self.worker = threading.Thread(target=self._run, name=f"frames-{camera_id}", daemon=True)
+        self.worker.start()
+
+    def submit(self, frame, on_result=None, on_drop=None, timestamp=None):
+        """
+        Enqueue a frame (with its capture timestamp, if known) and return its sequence number
+        on_result(results) is called from the worker once the frame is processed
+        (results is None if processing failed); on_drop() if it is dropped unprocessed
+        """
+        dropped_callbacks = []
+        with self.condition:
+            sequence = self.next_sequence
+            self.next_sequence += 1
+            self.stats['received'] += 1
+
+            if not self.running:
+                # Stopped (e.g. camera evicted); nothing will process this frame
+                self.stats['dropped'] += 1
+                if on_drop is not None:
+                    dropped_callbacks.append(on_drop)
+                frame = None
+
+            while len(self.frames) >= self.capacity:
+                _, _, _, _, dropped_callback = self.frames.popleft()
+                self.stats['dropped'] += 1
+                if dropped_callback is not None:
+                    dropped_callbacks.append(dropped_callback)
+
+            if frame is not None:
+                self.frames.append((sequence, frame, timestamp, on_result, on_drop))
+                self.condition.notify_all()
+
+        for callback in dropped_callbacks:
+            self._notify(callback)
+        return sequence
+
+    def wait_for_result(self, sequence, timeout):
+        """Wait until `sequence` (or a newer frame) has completed or been dropped, up to timeout"""
+        deadline = time.monotonic() + timeout
+        with self.condition:
+            while self.latest_sequence < sequence and self._pending(sequence):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self.condition.wait(remaining)
+            return self.latest()
+
+    def latest(self):
+        """Freshest completed result with queue depth and drop counters"""
+        with self.condition:
+            return {
+                'results': self.latest_result,
+                'result_sequence': self.latest_sequence if self.latest_result is not None else None,
+                'queue': self.get_stats()
+            }
+
+    def get_stats(self):
+        with self.condition:
+            return dict(self.stats,
+                        camera_id=self.camera_id,
+                        depth=len(self.frames),
+                        capacity=self.capacity,
+                        last_processing_ms=round(self.processing_ms, 1))
+
+    def stop(self):
+        """Stop the worker; frames still waiting are dropped and their on_drop() called"""
+        dropped_callbacks = []
+        with self.condition:
+            self.running = False
+            while self.frames:
+                _, _, _, _, dropped_callback = self.frames.popleft()
+                self.stats['dropped'] += 1
+                if dropped_callback is not None:
+                    dropped_callbacks.append(dropped_callback)
+            self.condition.notify_all()
+
+        for callback in dropped_callbacks:
+            self._notify(callback)
+        self.worker.join(timeout=5)
+
+    def _pending(self, sequence):
+        """Whether a frame is still waiting in the queue or being processed"""
+        return any(item[0] == sequence for item in self.frames) or self.in_progress == sequence
+
+    def _run(self):
+        while True:
+            with self.condition:
+                while self.running and not self.frames:
+                    self.condition.wait()
+                if not self.running:
+                    return
+                sequence, frame, timestamp, on_result, _ = self.frames.popleft()
+                self.in_progress = sequence
+
+            start = time.monotonic()
+            try:
+                with self.processing_lock:
+                    results = self.process(frame, timestamp)
+            except Exception as e:
+                print(f"[ERROR] Frame worker error on camera {self.camera_id}: {e}")
+                results = None
+
+            with self.condition:
+                self.in_progress = None
+                self.processing_ms = (time.monotonic() - start) * 1000
+                if results is None:
+                    self.stats['errors'] += 1
+                else:
+                    self.stats['processed'] += 1
+                    self.latest_result = results
+                    self.latest_sequence = sequence
+                self.condition.notify_all()
+
+            if on_result is not None:
+                self._notify(on_result, results)
+
+    def _notify(self, callback, *args):
+        try:
+            callback(*args)
+        except Exception as e:
+            print(f"[ERROR] Frame callback error on camera {self.camera_id}: {e}")
@@ -0,0 +1,136 @@
+import cv2
+import numpy as np
+from loitering_tracks import TrackStore
+
+class IdentityResultCache:
+    """
+    Per-identity caching of helmet, face-cover and posture classifications
+    - People are tracked across frames by their box centers
+    - Each track carries cached results with a confidence-dependent TTL
+    - A track's cache is dropped when its box grows or its color histogram shifts
+    - Hit/miss counters are kept per detector
+    """
+
+    def __init__(self, detectors=('helmet', 'face_cover', 'posture'), min_confidence=0.6,
+                 base_ttl=2.0, max_ttl=10.0, max_growth=0.3, max_histogram_shift=0.35,
+                 max_distance=40, max_time_gap=2, max_age=30):
+        self.min_confidence = min_confidence
+        self.base_ttl = base_ttl
+        self.max_ttl = max_ttl
+        self.max_growth = max_growth
+        self.max_histogram_shift = max_histogram_shift
+        self.max_age = max_age
+
+        self.tracks = TrackStore(capacity=8, history_size=2,
+                                 max_distance=max_distance, max_time_gap=max_time_gap)
+        # slot -> appearance when its results were classified
+        self.appearance = {}
+        # (slot, detector) -> (track start time, expiry time, result)
+        self.entries = {}
+        self.stats = {detector: {'hits': 0, 'misses': 0} for detector in detectors}
+
+    def observe(self, frame, boxes, timestamp):
+        """Associate this frame's person boxes with identities and drop stale caches"""
+        self.tracks.expire(timestamp, max_age=self.max_age)
+        if len(boxes) == 0:
+            return []
+
+        centers = [(x + w / 2, y + h / 2) for (x, y, w, h) in boxes]
+        slots = [int(slot) for slot in self.tracks.update(centers, timestamp)]
+
+        for slot, box in zip(slots, boxes):
+            reference = self.appearance.get(slot)
+            if reference is None or reference['start_time'] != self.tracks.start_time[slot]:
+                continue
+            if self._appearance_changed(reference, frame, box):
+                self._invalidate(slot)
+
+        return slots
+
+    def lookup(self, detector, slots, timestamp):
+        """Cached result covering every identity in the frame, or None on a miss"""
+        results = []
+        for slot in slots:
+            entry = self.entries.get((slot, detector))
+            if (entry is None or entry[0] != self.tracks.start_time[slot] or
+                    timestamp >= entry[1]):
+                results = None
+                break
+            results.append(entry[2])
+
+        if not slots or results is None:
+            self.stats[detector]['misses'] += 1
+            return None
+
+        self.stats[detector]['hits'] += 1
+        positives = [result for result in results if result[0]]
+        if positives:
+            return True, max(confidence for _, confidence in positives)
+        return False, 0.0
+
+    def store(self, detector, slots, result, decision_confidence, frame, boxes, timestamp):
+        """Cache a frame-level result for every identity it was computed on"""
+        ttl = self.ttl(decision_confidence)
+        if ttl <= 0:
+            return
+
+        for slot, box in zip(slots, boxes):
+            start_time = self.tracks.start_time[slot]
+            self.entries[(slot, detector)] = (start_time, timestamp + ttl, result)
+
+            # Reclassification refreshes the reference appearance (once per frame)
+            reference = self.appearance.get(slot)
+            if (reference is None or reference['start_time'] != start_time or
+                    reference['classified_at'] != timestamp):
+                self.appearance[slot] = self._appearance(frame, box, start_time, timestamp)
+
+    def ttl(self, decision_confidence):
+        """Longer reuse for more confident decisions; nothing below min_confidence"""
+        if decision_confidence < self.min_confidence:
+            return 0.0
+        span = (decision_confidence - self.min_confidence) / (1.0 - self.min_confidence)
+        return self.base_ttl + (self.max_ttl - self.base_ttl) * min(1.0, span)
+
+    def get_stats(self):
+        """Hit rate per detector"""
+        stats = {}
+        for detector, counts in self.stats.items():
+            total = counts['hits'] + counts['misses']
+            stats[detector] = dict(counts, hit_rate=counts['hits'] / total if total else 0.0)
+        stats['identities'] = len(self.tracks)
+        return stats
+
+    def _invalidate(self, slot):
+        self.appearance.pop(slot, None)
+        for detector in self.stats:
+            self.entries.pop((slot, detector), None)
+
+    def _appearance(self, frame, box, start_time, timestamp):
+        x, y, w, h = box
+        return {
+            'start_time': start_time,
+            'classified_at': timestamp,
+            'area': float(w * h),
+            'histogram': self._histogram(frame, box)
+        }
+
+    def _appearance_changed(self, reference, frame, box):
+        """Box growth or a color histogram shift forces reclassification"""
+        x, y, w, h = box
+        if reference['area'] > 0 and (w * h) / reference['area'] - 1.0 > self.max_growth:
+            return True
+
+        histogram = self._histogram(frame, box)
+        if histogram is None or reference['histogram'] is None:
+            return True
+        shift = cv2.compareHist(reference['histogram'], histogram, cv2.HISTCMP_BHATTACHARYYA)
+        return shift > self.max_histogram_shift
+
+    def _histogram(self, frame, box):
+        x, y, w, h = [int(v) for v in box]
+        region = frame[max(0, y):y + h, max(0, x):x + w]
+        if region.size == 0:
+            return None
+        hsv = cv2.cvtColor(region, cv2.COLOR_BGR2HSV)
+        histogram = cv2.calcHist([hsv], [0, 1], None, [16, 8], [0, 180, 0, 256])
+        return cv2.normalize(histogram, histogram).astype(np.float32)
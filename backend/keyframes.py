@@ -0,0 +1,50 @@
+import cv2
+import numpy as np
+
+class SceneChangeSampler:
+    """
+    Scene-change keyframe selection for offline analysis
+    - Each candidate frame is reduced to a 32x24 grayscale thumbnail, whose cells
+      are the mean of a block of the frame
+    - A frame is a keyframe when enough blocks changed since the last keyframe
+      (comparing to the last keyframe, not the previous frame, catches slow drift)
+    - A sampling floor forces a keyframe every max_interval seconds so loitering
+      and dwell timings keep advancing through static scenes
+    """
+
+    THUMBNAIL_SIZE = (32, 24)
+
+    def __init__(self, change_ratio=0.02, max_interval=2.0, cell_threshold=12):
+        self.change_ratio = change_ratio      # Fraction of blocks that must change
+        self.max_interval = max_interval      # Sampling floor in seconds
+        self.cell_threshold = cell_threshold  # Per-block intensity change that counts
+        self.reference = None
+        self.last_keyframe_time = None
+        self.stats = {'candidates': 0, 'keyframes': 0, 'scene_changes': 0}
+
+    def score(self, frame):
+        """Fraction of thumbnail blocks that changed since the last keyframe, and the thumbnail"""
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+        thumbnail = cv2.resize(gray, self.THUMBNAIL_SIZE, interpolation=cv2.INTER_AREA).astype(np.int16)
+        if self.reference is None:
+            return 1.0, thumbnail
+        changed = np.abs(thumbnail - self.reference) > self.cell_threshold
+        return float(changed.mean()), thumbnail
+
+    def is_keyframe(self, frame, timestamp):
+        """Whether full detection should run on this frame"""
+        self.stats['candidates'] += 1
+        change, thumbnail = self.score(frame)
+
+        scene_change = change >= self.change_ratio
+        floor_due = (self.last_keyframe_time is None
+                     or timestamp - self.last_keyframe_time >= self.max_interval)
+        if not scene_change and not floor_due:
+            return False
+
+        self.reference = thumbnail
+        self.last_keyframe_time = timestamp
+        self.stats['keyframes'] += 1
+        if scene_change:
+            self.stats['scene_changes'] += 1
+        return True
@@ -0,0 +1,188 @@
+import numpy as np
+from collections import OrderedDict
+
+try:
+    from scipy.optimize import linear_sum_assignment
+except ImportError:
+    linear_sum_assignment = None
+
+class TrackStore:
+    """
+    Array-backed track store for loitering detection
+    - Parallel numpy arrays for last position, last timestamp and start time
+    - Fixed-size ring buffers for each track's position history
+    - Vectorized distance matrix with optimal assignment for association
+    - Expiry in O(expired) using tracks ordered by last update
+    """
+
+    UNASSIGNED_COST = 1e9
+
+    def __init__(self, capacity=32, history_size=50, max_distance=80, max_time_gap=5):
+        self.history_size = history_size
+        self.max_distance = max_distance
+        self.max_time_gap = max_time_gap
+
+        self.capacity = 0
+        self.last_position = np.zeros((0, 2), dtype=np.float64)
+        self.last_timestamp = np.zeros(0, dtype=np.float64)
+        self.start_time = np.zeros(0, dtype=np.float64)
+        self.history = np.zeros((0, history_size, 2), dtype=np.float64)
+        self.history_count = np.zeros(0, dtype=np.int64)
+        self.history_head = np.zeros(0, dtype=np.int64)  # Next write index per ring buffer
+
+        self.free_slots = []
+        # Active slots, least recently updated first
+        self.update_order = OrderedDict()
+
+        self._grow(capacity)
+
+    def __len__(self):
+        return len(self.update_order)
+
+    def active_slots(self):
+        """Slots of all live tracks"""
+        return np.fromiter(self.update_order.keys(), dtype=np.int64, count=len(self.update_order))
+
+    def update(self, points, timestamp):
+        """
+        Associate detected centroids with live tracks and append them
+        Returns the track slot for each point, creating tracks for unmatched points
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        slots = np.full(len(points), -1, dtype=np.int64)
+        if len(points) == 0:
+            return slots
+
+        candidates = self.active_slots()
+        if len(candidates) > 0:
+            # (points x tracks) distance matrix, gated by distance and time gap
+            deltas = points[:, None, :] - self.last_position[candidates][None, :, :]
+            distances = np.sqrt(np.sum(deltas * deltas, axis=2))
+            recent = (timestamp - self.last_timestamp[candidates]) < self.max_time_gap
+            valid = (distances < self.max_distance) & recent[None, :]
+
+            if valid.any():
+                cost = np.where(valid, distances, self.UNASSIGNED_COST)
+                rows, cols = self._assign(cost)
+                matched = valid[rows, cols]
+                slots[rows[matched]] = candidates[cols[matched]]
+
+        for i in np.flatnonzero(slots < 0):
+            slots[i] = self._create(timestamp)
+
+        self._append(slots, points, timestamp)
+        return slots
+
+    def movement_variance(self, slots, window=15):
+        """Total positional variance over each track's last `window` samples (NaN if shorter)"""
+        slots = np.asarray(slots, dtype=np.int64)
+        variance = np.full(len(slots), np.nan)
+        ready = self.history_count[slots] >= window
+        if not ready.any():
+            return variance
+
+        ready_slots = slots[ready]
+        offsets = np.arange(window) - window
+        indices = (self.history_head[ready_slots][:, None] + offsets[None, :]) % self.history_size
+        positions = self.history[ready_slots[:, None], indices]
+        variance[ready] = np.sum(np.var(positions, axis=1), axis=1)
+        return variance
+
+    def recent_positions(self, slot, count=None):
+        """Chronological position history of one track"""
+        length = int(self.history_count[slot])
+        if count is not None:
+            length = min(length, count)
+        indices = (self.history_head[slot] + np.arange(length) - length) % self.history_size
+        return self.history[slot, indices]
+
+    def expire(self, current_time, max_age=180):
+        """Remove tracks not updated within max_age seconds; only touches expired tracks"""
+        removed = 0
+        while self.update_order:
+            slot = next(iter(self.update_order))
+            if current_time - self.last_timestamp[slot] <= max_age:
+                break
+            del self.update_order[slot]
+            self.free_slots.append(slot)
+            removed += 1
+        return removed
+
+    def export_state(self):
+        """Track arrays for snapshots (live slots listed in update order)"""
+        return {
+            'last_position': self.last_position.copy(),
+            'last_timestamp': self.last_timestamp.copy(),
+            'start_time': self.start_time.copy(),
+            'history': self.history.copy(),
+            'history_count': self.history_count.copy(),
+            'history_head': self.history_head.copy(),
+            'update_order': self.active_slots()
+        }
+
+    def import_state(self, state):
+        """Restore track arrays exported by export_state"""
+        self.capacity = len(state['last_timestamp'])
+        self.last_position = np.array(state['last_position'], dtype=np.float64)
+        self.last_timestamp = np.array(state['last_timestamp'], dtype=np.float64)
+        self.start_time = np.array(state['start_time'], dtype=np.float64)
+        self.history = np.array(state['history'], dtype=np.float64)
+        self.history_count = np.array(state['history_count'], dtype=np.int64)
+        self.history_head = np.array(state['history_head'], dtype=np.int64)
+
+        self.update_order = OrderedDict((int(slot), None) for slot in state['update_order'])
+        self.free_slots = [slot for slot in range(self.capacity - 1, -1, -1)
+                           if slot not in self.update_order]
+
+    def _assign(self, cost):
+        """Optimal assignment (Hungarian) with a greedy fallback when scipy is missing"""
+        if linear_sum_assignment is not None:
+            return linear_sum_assignment(cost)
+
+        rows, cols = [], []
+        used_rows, used_cols = set(), set()
+        for flat_index in np.argsort(cost, axis=None):
+            row, col = np.unravel_index(flat_index, cost.shape)
+            if cost[row, col] >= self.UNASSIGNED_COST:
+                break
+            if row in used_rows or col in used_cols:
+                continue
+            rows.append(row)
+            cols.append(col)
+            used_rows.add(row)
+            used_cols.add(col)
+        return np.array(rows, dtype=np.int64), np.array(cols, dtype=np.int64)
+
+    def _create(self, timestamp):
+        if not self.free_slots:
+            self._grow(max(1, self.capacity))
+        slot = self.free_slots.pop()
+        self.start_time[slot] = timestamp
+        self.last_timestamp[slot] = timestamp
+        self.history_count[slot] = 0
+        self.history_head[slot] = 0
+        self.update_order[slot] = None
+        return slot
+
+    def _append(self, slots, points, timestamp):
+        heads = self.history_head[slots]
+        self.history[slots, heads] = points
+        self.history_head[slots] = (heads + 1) % self.history_size
+        self.history_count[slots] = np.minimum(self.history_count[slots] + 1, self.history_size)
+        self.last_position[slots] = points
+        self.last_timestamp[slots] = timestamp
+        for slot in slots:
+            self.update_order.move_to_end(int(slot))
+
+    def _grow(self, extra):
+        """Extend every parallel array by `extra` slots"""
+        old = self.capacity
+        self.capacity = old + extra
+        self.last_position = np.concatenate([self.last_position, np.zeros((extra, 2))])
+        self.last_timestamp = np.concatenate([self.last_timestamp, np.zeros(extra)])
+        self.start_time = np.concatenate([self.start_time, np.zeros(extra)])
+        self.history = np.concatenate([self.history, np.zeros((extra, self.history_size, 2))])
+        self.history_count = np.concatenate([self.history_count, np.zeros(extra, dtype=np.int64)])
+        self.history_head = np.concatenate([self.history_head, np.zeros(extra, dtype=np.int64)])
+        # Pop from the end so low slots are reused first
+        self.free_slots.extend(range(self.capacity - 1, old - 1, -1))
@@ -1,9 +1,17 @@
 import cv2
 import numpy as np
-import time
-from collections import deque, defaultdict
+import threading
+from collections import deque
 import math
 from enhanced_people_detection import EnhancedPeopleDetection
+from face_cover_features import FaceFeatureBatch, keypoint_lower_face, keypoint_visible_eyes
+from loitering_tracks import TrackStore
+from zones import ZoneDwellEngine
+from posture_features import silhouette_descriptors, posture_score
+from identity_cache import IdentityResultCache
+from pose_backend import MediaPipePoseBackend
+from face_backends import create_face_backend
+from frame_clock import FrameClock
 
 class EnhancedPeopleDetectionPipeline:
     """
@@ -11,7 +19,13 @@ class EnhancedPeopleDetectionPipeline:
     Uses the new EnhancedPeopleDetection class for better accuracy
     """
     
-    def __init__(self):
+    # Helmet templates and color ranges never change, so every camera shares them.
+    # Cascades stay per pipeline because detectMultiScale is not thread-safe.
+    _shared_models = None
+    _shared_models_lock = threading.Lock()
+    
+    def __init__(self, zones=None, posture_backend='silhouette', face_backend='haar'):
+        self.face_backend_name = face_backend
         self.initialize_enhanced_models()
         
         # Initialize enhanced people detection
@@ -20,31 +34,87 @@ class EnhancedPeopleDetectionPipeline:
         # Temporal tracking for other detections
         self.helmet_history = deque(maxlen=20)
         self.face_cover_history = deque(maxlen=20)
-        self.loitering_tracker = defaultdict(lambda: {
-            'positions': deque(maxlen=50),
-            'start_time': time.time(),
-            'timestamps': deque(maxlen=50)
-        })
+        self.loitering_tracks = TrackStore(history_size=50, max_distance=80, max_time_gap=5)
+        
+        # Zone-based dwell tracking replaces the global loitering rule when zones are configured
+        self.zone_engine = ZoneDwellEngine(zones) if zones else None
+        
+        # Last processed result, kept for snapshots
+        self.last_result = None
+        
+        # Detector time comes from frame timestamps, not the wall clock
+        self.clock = FrameClock()
+        
+        # Recent frames at detector resolution, used to capture reference backgrounds
+        self.recent_frames = deque(maxlen=10)
+        
+        # Per-identity reuse of helmet, face-cover and posture results
+        self.identity_cache = IdentityResultCache()
         self.posture_history = deque(maxlen=30)
         
+        # Classifier history entries added by the last processed frame, repeated for held frames
+        self.frame_history_updates = []
+        
+        # Minimum input resolution (width, height) each detector is tuned for; frames can be
+        # decoded at reduced size as long as they stay at or above the largest of these
+        self.detector_min_resolution = {
+            'people': (320, 240),
+            'helmet': (320, 240),
+            'face_cover': (640, 480),  # Full-frame face search width; 50px minimum faces
+            'loitering': (320, 240) if self.zone_engine is not None else (640, 480),
+            'posture': (640, 480) if posture_backend == 'mediapipe' else (320, 240)
+        }
+        
+        # Optional MediaPipe Pose scoring on person crops; silhouettes remain the fallback
+        self.pose_backend = None
+        if posture_backend == 'mediapipe':
+            self.pose_backend = MediaPipePoseBackend()
+            if not self.pose_backend.available:
+                print("[WARNING] MediaPipe Pose unavailable, using silhouette posture detection")
+                self.pose_backend = None
+        
+        # Face search state - faces found on the previous frame are re-verified first
+        self.previous_faces = []
+        self.face_roi_upper_fraction = 0.45  # Faces are searched in the top of each person box
+        self.face_roi_target_width = 160     # Person ROIs are downscaled to about this width
+        self.face_full_search_width = 640    # Full-frame fallback search width
+        self.face_reverify_margin = 0.5      # Neighborhood around a previous face, relative to its size
+        
+        # Lazy eye-cascade evaluation - the eye score only matters inside an ambiguous band
+        self.face_cover_threshold = 0.70
+        self.face_cover_eye_weight = 0.10
+        self.face_cover_eye_scores = {
+            'no_eyes': 0.9,
+            'one_eye': 0.6,
+            'both_eyes': 0.2,
+            'no_upper_face': 0.5,
+            'error': 0.0
+        }
+        # Lowest/highest score the eye check can return
+        self.face_cover_eye_bounds = (min(self.face_cover_eye_scores.values()),
+                                      max(self.face_cover_eye_scores.values()))
+        self.face_cover_eval_stats = {
+            'eye_evaluated': 0,
+            'eye_skipped_covered': 0,
+            'eye_skipped_uncovered': 0
+        }
+        
     def initialize_enhanced_models(self):
         """Initialize other detection models (helmet, face cover, etc.)"""
         try:
-            # Face detection cascades
-            self.face_cascade_default = cv2.CascadeClassifier(
-                cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
-            self.face_cascade_alt = cv2.CascadeClassifier(
-                cv2.data.haarcascades + 'haarcascade_frontalface_alt.xml')
-            self.face_cascade_alt2 = cv2.CascadeClassifier(
-                cv2.data.haarcascades + 'haarcascade_frontalface_alt2.xml')
-            self.profile_cascade = cv2.CascadeClassifier(
-                cv2.data.haarcascades + 'haarcascade_profileface.xml')
+            # Face detection backend (Haar cascades or MediaPipe)
+            self.face_backend = create_face_backend(self.face_backend_name)
+            
+            # Eye cascade for faces without keypoints
             self.eye_cascade = cv2.CascadeClassifier(
                 cv2.data.haarcascades + 'haarcascade_eye.xml')
             
-            # Initialize template libraries
-            self.helmet_templates = self._create_helmet_templates()
-            self.color_ranges = self._initialize_color_ranges()
+            # Template libraries, built once per process
+            with self._shared_models_lock:
+                if EnhancedPeopleDetectionPipeline._shared_models is None:
+                    EnhancedPeopleDetectionPipeline._shared_models = (
+                        self._create_helmet_templates(), self._initialize_color_ranges())
+            self.helmet_templates, self.color_ranges = self._shared_models
             
             print("[SUCCESS] Enhanced detection models initialized")
             
@@ -132,11 +202,12 @@ class EnhancedPeopleDetectionPipeline:
             print(f"Enhanced people detection error: {e}")
             return 0, 0.1
     
-    def detect_helmet(self, frame):
+    def detect_helmet(self, frame, people_count=None):
         """Enhanced helmet detection with improved accuracy"""
         try:
             # First check if there are people in the frame
-            people_count, _ = self.detect_people(frame)
+            if people_count is None:
+                people_count, _ = self.detect_people(frame)
             if people_count == 0:
                 print("[HELMET DEBUG] No people detected, skipping helmet detection")
                 return False, 0.0
@@ -182,7 +253,7 @@ class EnhancedPeopleDetectionPipeline:
             print(f"[HELMET DEBUG] Helmet detected: {helmet_detected}")
             
             # Faster temporal consistency - reduced history requirement
-            self.helmet_history.append(helmet_detected)
+            self._append_history(self.helmet_history, helmet_detected)
             if len(self.helmet_history) >= 5:  # Reduced from 10 to 5
                 recent = list(self.helmet_history)[-5:]
                 recent_positive = sum(recent)
@@ -209,15 +280,9 @@ class EnhancedPeopleDetectionPipeline:
         try:
             gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
             
-            # Multi-cascade face detection
-            faces = []
-            for cascade in [self.face_cascade_default, self.face_cascade_alt, 
-                           self.face_cascade_alt2, self.profile_cascade]:
-                detected = cascade.detectMultiScale(gray, 1.1, 5, minSize=(50, 50))
-                faces.extend(detected)
-            
-            # Remove duplicate face detections
-            faces = self._merge_overlapping_faces(faces)
+            # Person-ROI face search with previous-frame re-verification
+            faces, face_keypoints = self._find_faces(frame, gray)
+            self.previous_faces = faces
             
             if len(faces) == 0:
                 return False, 0.0
@@ -225,40 +290,50 @@ class EnhancedPeopleDetectionPipeline:
             max_confidence = 0.0
             face_cover_detected = False
             
-            for (x, y, w, h) in faces:
-                face_region = frame[y:y+h, x:x+w]
+            # Single-pass features for every face in the frame (pixelwise conversions shared)
+            face_regions = [frame[y:y+h, x:x+w] for (x, y, w, h) in faces]
+            face_keypoints = [keypoints for region, keypoints in zip(face_regions, face_keypoints)
+                              if region.size > 0]
+            face_regions = [region for region in face_regions if region.size > 0]
+            batch = FaceFeatureBatch(face_regions, self.color_ranges['mask'])
+            
+            for features, keypoints in zip(batch, face_keypoints):
+                features.keypoints = keypoints
                 
-                if face_region.size > 0:
-                    # Method 1: Advanced color analysis
-                    color_score = self._analyze_face_cover_color_advanced(face_region)
-                    
-                    # Method 2: Texture analysis
-                    texture_score = self._analyze_face_cover_texture(face_region)
-                    
-                    # Method 3: Edge density analysis
-                    edge_score = self._analyze_face_cover_edges(face_region)
-                    
-                    # Method 4: Eye visibility check
-                    eye_score = self._analyze_eye_visibility(face_region, gray[y:y+h, x:x+w])
-                    
-                    # Method 5: Lower face analysis
-                    lower_face_score = self._analyze_lower_face_coverage(face_region)
-                    
-                    # Weighted ensemble
-                    combined_score = (
-                        color_score * 0.30 +
-                        texture_score * 0.25 +
-                        edge_score * 0.20 +
-                        eye_score * 0.10 +
-                        lower_face_score * 0.15
-                    )
-                    
-                    if combined_score > 0.70:
-                        face_cover_detected = True
-                        max_confidence = max(max_confidence, combined_score)
+                # Method 1: Advanced color analysis
+                color_score = self._analyze_face_cover_color_advanced(features)
+                
+                # Method 2: Texture analysis
+                texture_score = self._analyze_face_cover_texture(features)
+                
+                # Method 3: Edge density analysis
+                edge_score = self._analyze_face_cover_edges(features)
+                
+                # Method 5: Lower face analysis
+                lower_face_score = self._analyze_lower_face_coverage(features)
+                
+                # Weighted ensemble of the cheap scores
+                partial_score = (
+                    color_score * 0.30 +
+                    texture_score * 0.25 +
+                    edge_score * 0.20 +
+                    lower_face_score * 0.15
+                )
+                
+                # Method 4: Eye visibility check - only when it can still change the decision or confidence
+                eye_score, eye_path = self._lazy_eye_score(features, partial_score, max_confidence)
+                self.face_cover_eval_stats[eye_path] += 1
+                if eye_score is None:
+                    face_cover_detected = face_cover_detected or eye_path == 'eye_skipped_covered'
+                    continue
+                combined_score = partial_score + eye_score * self.face_cover_eye_weight
+                
+                if combined_score > self.face_cover_threshold:
+                    face_cover_detected = True
+                    max_confidence = max(max_confidence, combined_score)
             
             # Temporal consistency
-            self.face_cover_history.append(face_cover_detected)
+            self._append_history(self.face_cover_history, face_cover_detected)
             if len(self.face_cover_history) >= 10:
                 recent = list(self.face_cover_history)[-10:]
                 if sum(recent) >= 7:
@@ -272,13 +347,19 @@ class EnhancedPeopleDetectionPipeline:
             print(f"Enhanced face cover detection error: {e}")
             return False, 0.0
     
-    def detect_loitering(self, frame):
+    def detect_loitering(self, frame, timestamp=None, people_count=None):
         """Enhanced loitering detection with improved accuracy"""
         try:
             gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            current_time = self.clock.tick(timestamp)
             
             # Use enhanced people detection first
-            people_count, _ = self.detect_people(frame)
+            if people_count is None:
+                people_count, _ = self.detect_people(frame)
+            
+            if self.zone_engine is not None:
+                return self._detect_loitering_zones(people_count, current_time)
+            
             if people_count == 0:
                 return False, 0.0
             
@@ -288,10 +369,10 @@ class EnhancedPeopleDetectionPipeline:
             # Find motion contours
             contours, _ = cv2.findContours(fg_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
             
-            current_time = time.time()
             loitering_detected = False
             max_confidence = 0.0
             
+            centroids = []
             for contour in contours:
                 area = cv2.contourArea(contour)
                 if area > 3000:
@@ -299,30 +380,23 @@ class EnhancedPeopleDetectionPipeline:
                     if M["m00"] != 0:
                         cx = int(M["m10"] / M["m00"])
                         cy = int(M["m01"] / M["m00"])
-                        
-                        # Find matching tracker or create new one
-                        tracker_id = self._find_or_create_tracker(cx, cy, current_time)
-                        
-                        if tracker_id is not None:
-                            tracker = self.loitering_tracker[tracker_id]
-                            tracker['positions'].append((cx, cy))
-                            tracker['timestamps'].append(current_time)
-                            
-                            # Analyze if person has been stationary
-                            if len(tracker['positions']) >= 15:
-                                positions = np.array(list(tracker['positions'])[-15:])
-                                movement_variance = np.var(positions, axis=0)
-                                total_variance = np.sum(movement_variance)
-                                
-                                elapsed_time = current_time - tracker['start_time']
-                                
-                                if total_variance < 200 and elapsed_time > 25:
-                                    loitering_detected = True
-                                    confidence = min(0.98, 0.7 + (elapsed_time / 100))
-                                    max_confidence = max(max_confidence, confidence)
+                        centroids.append((cx, cy))
+            
+            if centroids:
+                # Associate all centroids with tracks in one vectorized step
+                slots = self.loitering_tracks.update(centroids, current_time)
+                
+                # Analyze if people have been stationary over their last 15 positions
+                total_variance = self.loitering_tracks.movement_variance(slots, window=15)
+                elapsed_time = current_time - self.loitering_tracks.start_time[slots]
+                
+                loitering = (total_variance < 200) & (elapsed_time > 25)
+                if loitering.any():
+                    loitering_detected = True
+                    max_confidence = min(0.98, 0.7 + (float(elapsed_time[loitering].max()) / 100))
             
             # Clean up old trackers
-            self._cleanup_old_trackers(current_time, max_age=180)
+            self.loitering_tracks.expire(current_time, max_age=180)
             
             return loitering_detected, max_confidence
             
@@ -330,54 +404,60 @@ class EnhancedPeopleDetectionPipeline:
             print(f"Enhanced loitering detection error: {e}")
             return False, 0.0
     
-    def detect_posture(self, frame):
+    def _detect_loitering_zones(self, people_count, current_time):
+        """Loitering as a per-zone dwell query on the shared foreground mask"""
+        fg_mask = self.enhanced_people_detector.last_fg_mask
+        if fg_mask is None:
+            return False, 0.0
+        
+        # Feet of each detected person (resized frame coordinates)
+        points = [(x + w // 2, y + h) for (x, y, w, h) in self.enhanced_people_detector.person_boxes]
+        self.zone_engine.update(fg_mask, current_time, points)
+        
+        if people_count == 0:
+            return False, 0.0
+        
+        loitering = self.zone_engine.loitering_zones()
+        if not loitering:
+            return False, 0.0
+        
+        longest_dwell = max(dwell for _, dwell in loitering)
+        return True, min(0.98, 0.7 + (longest_dwell / 100))
+    
+    def get_zone_heatmap(self):
+        """Occupancy heatmap and per-zone dwell state, or None without zones"""
+        if self.zone_engine is None:
+            return None
+        
+        return {
+            'heatmap': self.zone_engine.heatmap_image(),
+            'zones': self.zone_engine.get_zone_stats()
+        }
+    
+    def detect_posture(self, frame, timestamp=None, people_count=None):
         """Enhanced posture detection with improved accuracy"""
         try:
             # First check if there are people in the frame
-            people_count, _ = self.detect_people(frame)
+            if people_count is None:
+                people_count, _ = self.detect_people(frame)
             if people_count == 0:
                 return False, 0.0
             
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            
-            # Multi-scale edge detection
-            edges1 = cv2.Canny(gray, 20, 80)
-            edges2 = cv2.Canny(gray, 40, 120)
-            edges3 = cv2.Canny(gray, 60, 180)
-            edges = cv2.bitwise_or(edges1, cv2.bitwise_or(edges2, edges3))
-            
-            # Morphological operations
-            kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (3, 3))
-            edges = cv2.morphologyEx(edges, cv2.MORPH_CLOSE, kernel)
-            
-            # Find contours
-            contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-            
+            detector = self.enhanced_people_detector
+            silhouette_boxes = detector.person_boxes
             posture_scores = []
             
-            for contour in contours:
-                area = cv2.contourArea(contour)
-                if area > 3500:
-                    x, y, w, h = cv2.boundingRect(contour)
-                    aspect_ratio = h / w if w > 0 else 0
-                    
-                    if aspect_ratio > 1.5 and h > 120:
-                        # Advanced posture analysis
-                        hull = cv2.convexHull(contour)
-                        hull_area = cv2.contourArea(hull)
-                        
-                        if hull_area > 0:
-                            solidity = area / hull_area
-                            
-                            # Analyze posture based on contour shape
-                            if solidity > 0.8:
-                                posture_scores.append(0.9)
-                            elif solidity > 0.7:
-                                posture_scores.append(0.7)
-                            elif solidity > 0.5:
-                                posture_scores.append(0.5)
-                            else:
-                                posture_scores.append(0.2)
+            # Pose landmarks on full-resolution person crops where a pose is found
+            if self.pose_backend is not None:
+                pose_scores = self.pose_backend.score_people(frame, detector.get_person_boxes(frame.shape),
+                                                             self.clock.tick(timestamp))
+                posture_scores = [score for score in pose_scores if score is not None]
+                silhouette_boxes = [box for box, score in zip(detector.person_boxes, pose_scores)
+                                    if score is None]
+            
+            # Silhouette descriptors per remaining person box (detector resolution)
+            descriptors = silhouette_descriptors(detector.last_fg_mask, silhouette_boxes)
+            posture_scores += [posture_score(descriptor) for descriptor in descriptors]
             
             # Calculate final posture assessment
             if posture_scores:
@@ -386,7 +466,7 @@ class EnhancedPeopleDetectionPipeline:
                 avg_posture = 0.5
             
             # Temporal smoothing
-            self.posture_history.append(avg_posture)
+            self._append_history(self.posture_history, avg_posture)
             
             if len(self.posture_history) >= 15:
                 recent_avg = sum(list(self.posture_history)[-15:]) / 15
@@ -400,8 +480,12 @@ class EnhancedPeopleDetectionPipeline:
             print(f"Enhanced posture detection error: {e}")
             return False, 0.0
     
-    def process_frame(self, frame):
-        """Process frame through all enhanced detection models"""
+    def process_frame(self, frame, timestamp=None):
+        """
+        Process frame through all enhanced detection models
+        timestamp is the frame's capture/presentation time in seconds (client
+        capture time, video PTS or ingest time); the monotonic clock is used without one
+        """
         try:
             results = {
                 'people_count': 0,
@@ -412,7 +496,13 @@ class EnhancedPeopleDetectionPipeline:
                 'alerts': []
             }
             
-            # Enhanced people detection
+            small_frame = cv2.resize(frame, (320, 240))
+            self.recent_frames.append(small_frame)
+            current_time = self.clock.tick(timestamp)
+            self.frame_history_updates = []
+            
+            # Enhanced people detection - exactly once per frame, so the background model,
+            # people history and optical flow never depend on the result cache hit rate
             people_count, conf = self.detect_people(frame)
             results['people_count'] = people_count
             if people_count > 2:
@@ -422,8 +512,14 @@ class EnhancedPeopleDetectionPipeline:
                     'confidence': conf
                 })
             
+            # Identities for cached classifications (detector-resolution boxes)
+            person_boxes = self.enhanced_people_detector.person_boxes
+            identities = self.identity_cache.observe(small_frame, person_boxes, current_time)
+            cache_context = (identities, small_frame, person_boxes, current_time)
+            
             # Helmet detection
-            has_helmet, conf = self.detect_helmet(frame)
+            has_helmet, conf = self._cached_detection(
+                'helmet', lambda frame: self.detect_helmet(frame, people_count), frame, cache_context)
             if has_helmet:
                 results['helmet_violation'] = True
                 results['alerts'].append({
@@ -433,7 +529,7 @@ class EnhancedPeopleDetectionPipeline:
                 })
             
             # Face cover detection
-            has_face_cover, conf = self.detect_face_cover(frame)
+            has_face_cover, conf = self._cached_detection('face_cover', self.detect_face_cover, frame, cache_context)
             if has_face_cover:
                 results['face_cover_violation'] = True
                 results['alerts'].append({
@@ -443,7 +539,9 @@ class EnhancedPeopleDetectionPipeline:
                 })
             
             # Loitering detection
-            is_loitering, conf = self.detect_loitering(frame)
+            is_loitering, conf = self.detect_loitering(frame, current_time, people_count)
+            if self.zone_engine is not None:
+                results['loitering_zones'] = [name for name, _ in self.zone_engine.loitering_zones()]
             if is_loitering:
                 results['loitering'] = True
                 results['alerts'].append({
@@ -453,7 +551,8 @@ class EnhancedPeopleDetectionPipeline:
                 })
             
             # Posture detection
-            bad_posture, conf = self.detect_posture(frame)
+            bad_posture, conf = self._cached_detection(
+                'posture', lambda frame: self.detect_posture(frame, current_time, people_count), frame, cache_context)
             if bad_posture:
                 results['posture_violation'] = True
                 results['alerts'].append({
@@ -462,6 +561,7 @@ class EnhancedPeopleDetectionPipeline:
                     'confidence': conf
                 })
             
+            self.last_result = results
             return results
             
         except Exception as e:
@@ -475,6 +575,59 @@ class EnhancedPeopleDetectionPipeline:
                 'alerts': []
             }
     
+    def hold_frame(self, timestamp=None):
+        """
+        Account for a frame skipped as unchanged by keyframe sampling
+        The people and classifier histories are counted in frames, so a held frame
+        repeats what the last processed frame added to them; their windows then span
+        the same video time as with every frame analyzed. Time-based rules only need
+        the clock to advance.
+        """
+        try:
+            self.clock.tick(timestamp)
+            self.enhanced_people_detector.hold_frame()
+            for history, value in self.frame_history_updates:
+                history.append(value)
+        except Exception as e:
+            print(f"Frame hold error: {e}")
+    
+    def _append_history(self, history, value):
+        history.append(value)
+        self.frame_history_updates.append((history, value))
+    
+    def _cached_detection(self, detector, detect, frame, cache_context):
+        """Reuse a per-identity cached result, or run the detector and cache its decision"""
+        identities, small_frame, person_boxes, current_time = cache_context
+        
+        cached = self.identity_cache.lookup(detector, identities, current_time)
+        if cached is not None:
+            return cached
+        
+        result = detect(frame)
+        self.identity_cache.store(detector, identities, result, self._decision_confidence(detector, result),
+                                  small_frame, person_boxes, current_time)
+        return result
+    
+    def _decision_confidence(self, detector, result):
+        """
+        How settled a decision is: the detector confidence for positives, and the
+        agreement of the temporal history for negatives (which report 0.0)
+        """
+        detected, confidence = result
+        if detected:
+            return confidence
+        
+        window, history, agrees = {
+            'helmet': (5, self.helmet_history, lambda x: not x),
+            'face_cover': (10, self.face_cover_history, lambda x: not x),
+            'posture': (15, self.posture_history, lambda x: x >= 0.45)
+        }[detector]
+        
+        if len(history) < window:
+            return 0.0
+        recent = list(history)[-window:]
+        return sum(1 for x in recent if agrees(x)) / window
+    
     # Helper methods for helmet detection
     def _detect_helmet_color_multi_space(self, frame):
         """Detect helmet using multiple color spaces - OPTIMIZED FOR SPEED"""
@@ -698,6 +851,62 @@ class EnhancedPeopleDetectionPipeline:
             return False, 0.0
     
     # Helper methods for face cover detection
+    def _find_faces(self, frame, gray):
+        """
+        Locate faces cheaply: re-verify last frame's faces in a small neighborhood,
+        then search the upper part of each person box not already covered, and
+        only fall back to a downscaled full-frame search when neither applies
+        Returns the face boxes and their keypoints (None for backends without keypoints)
+        """
+        frame_h, frame_w = gray.shape[:2]
+        faces = []
+        keypoints = {}
+        
+        # Step 1: Re-verify faces found on the previous frame
+        for (x, y, w, h) in self.previous_faces:
+            margin_x = int(w * self.face_reverify_margin)
+            margin_y = int(h * self.face_reverify_margin)
+            region = (max(0, x - margin_x), max(0, y - margin_y),
+                      min(frame_w, x + w + margin_x), min(frame_h, y + h + margin_y))
+            scale = min(1.0, 48.0 / max(w, 1))
+            faces.extend(self._detect_faces_in_region(frame, gray, region, scale, int(w * 0.7), keypoints))
+        
+        # Step 2: Search the upper part of each person box without a verified face
+        person_boxes = self.enhanced_people_detector.get_person_boxes(gray.shape)
+        for (px, py, pw, ph) in person_boxes:
+            if any(self._face_inside_box(face, (px, py, pw, ph)) for face in faces):
+                continue
+            region = (max(0, px), max(0, py),
+                      min(frame_w, px + pw), min(frame_h, py + int(ph * self.face_roi_upper_fraction)))
+            scale = min(1.0, self.face_roi_target_width / max(pw, 1))
+            faces.extend(self._detect_faces_in_region(frame, gray, region, scale, 50, keypoints))
+        
+        # Step 3: Full-frame fallback when there is nothing to anchor the search
+        if not faces and not person_boxes:
+            scale = min(1.0, self.face_full_search_width / frame_w)
+            faces.extend(self._detect_faces_in_region(frame, gray, (0, 0, frame_w, frame_h), scale, 50, keypoints))
+        
+        # Remove duplicate face detections
+        faces = [tuple(int(v) for v in face) for face in self._merge_overlapping_faces(faces)]
+        return faces, [keypoints.get(face) for face in faces]
+    
+    def _detect_faces_in_region(self, frame, gray, region, scale, min_face_size, keypoints):
+        """Run the face backend on a downscaled region, collecting keypoints by face box"""
+        faces = []
+        for box, face_keypoints in self.face_backend.detect(frame, gray, region, scale, min_face_size):
+            faces.append(box)
+            if face_keypoints is not None:
+                keypoints[tuple(int(v) for v in box)] = face_keypoints
+        return faces
+    
+    def _face_inside_box(self, face, box):
+        """Check whether a face center lies inside a person box"""
+        fx, fy, fw, fh = face
+        bx, by, bw, bh = box
+        cx = fx + fw / 2
+        cy = fy + fh / 2
+        return bx <= cx <= bx + bw and by <= cy <= by + bh
+    
     def _merge_overlapping_faces(self, faces):
         """Merge overlapping face detections using Non-Maximum Suppression"""
         if len(faces) == 0:
@@ -731,31 +940,11 @@ class EnhancedPeopleDetectionPipeline:
         
         return keep
     
-    def _analyze_face_cover_color_advanced(self, face_region):
+    def _analyze_face_cover_color_advanced(self, features):
         """Advanced multi-color space analysis for mask detection"""
         try:
-            hsv = cv2.cvtColor(face_region, cv2.COLOR_BGR2HSV)
-            combined_mask = np.zeros(face_region.shape[:2], dtype=np.uint8)
-            
-            for mask_type, ranges in self.color_ranges['mask'].items():
-                for lower, upper in ranges:
-                    mask = cv2.inRange(hsv, lower, upper)
-                    combined_mask = cv2.bitwise_or(combined_mask, mask)
-            
-            lower_portion = face_region[int(face_region.shape[0]*0.4):, :]
-            if lower_portion.size > 0:
-                lower_hsv = cv2.cvtColor(lower_portion, cv2.COLOR_BGR2HSV)
-                lower_mask = np.zeros(lower_hsv.shape[:2], dtype=np.uint8)
-                
-                for mask_type, ranges in self.color_ranges['mask'].items():
-                    for lower, upper in ranges:
-                        mask = cv2.inRange(lower_hsv, lower, upper)
-                        lower_mask = cv2.bitwise_or(lower_mask, mask)
-                
-                lower_coverage = cv2.countNonZero(lower_mask) / (lower_hsv.shape[0] * lower_hsv.shape[1])
-                total_coverage = cv2.countNonZero(combined_mask) / (face_region.shape[0] * face_region.shape[1])
-                
-                final_score = total_coverage * 0.3 + lower_coverage * 0.7
+            if features.has_lower_portion:
+                final_score = features.mask_coverage * 0.3 + features.lower_mask_coverage * 0.7
                 
                 if final_score > 0.35:
                     return min(0.98, final_score * 1.5)
@@ -765,15 +954,10 @@ class EnhancedPeopleDetectionPipeline:
         except Exception as e:
             return 0.0
     
-    def _analyze_face_cover_texture(self, face_region):
+    def _analyze_face_cover_texture(self, features):
         """Analyze texture patterns to detect masks"""
         try:
-            gray = cv2.cvtColor(face_region, cv2.COLOR_BGR2GRAY)
-            
-            kernel = np.array([[-1, -1, -1], [-1, 8, -1], [-1, -1, -1]])
-            texture = cv2.filter2D(gray, -1, kernel)
-            
-            texture_var = np.var(texture)
+            texture_var = features.texture_variance
             
             if texture_var < 150:
                 return 0.9
@@ -787,18 +971,10 @@ class EnhancedPeopleDetectionPipeline:
         except Exception as e:
             return 0.0
     
-    def _analyze_face_cover_edges(self, face_region):
+    def _analyze_face_cover_edges(self, features):
         """Analyze edge density for mask detection"""
         try:
-            gray = cv2.cvtColor(face_region, cv2.COLOR_BGR2GRAY)
-            
-            edges1 = cv2.Canny(gray, 30, 100)
-            edges2 = cv2.Canny(gray, 50, 150)
-            edges = cv2.bitwise_or(edges1, edges2)
-            
-            edge_pixels = cv2.countNonZero(edges)
-            total_pixels = face_region.shape[0] * face_region.shape[1]
-            edge_density = edge_pixels / total_pixels
+            edge_density = features.edge_density
             
             if edge_density < 0.08:
                 return 0.95
@@ -812,51 +988,65 @@ class EnhancedPeopleDetectionPipeline:
         except Exception as e:
             return 0.0
     
-    def _analyze_eye_visibility(self, face_region, face_gray):
+    def _lazy_eye_score(self, features, partial_score, max_confidence):
+        """
+        Decide whether the eye cascade can still change the face-cover decision or
+        the reported confidence (the highest combined score of any covered face)
+        Returns the eye score (None when skipped) and the evaluation path taken
+        """
+        low, high = self.face_cover_eye_bounds
+        weight = self.face_cover_eye_weight
+        
+        if partial_score + high * weight <= self.face_cover_threshold:
+            # Uncovered whatever the eyes show
+            return None, 'eye_skipped_uncovered'
+        if partial_score + low * weight > self.face_cover_threshold and partial_score + high * weight <= max_confidence:
+            # Covered whatever the eyes show, and cannot raise the confidence
+            return None, 'eye_skipped_covered'
+        
+        return self._analyze_eye_visibility(features), 'eye_evaluated'
+    
+    def _analyze_eye_visibility(self, features):
         """Check eye visibility - covered faces have fewer/no eyes visible"""
         try:
+            face_gray = features.gray
             upper_half = face_gray[:face_gray.shape[0]//2, :]
             
             if upper_half.size > 0:
-                eyes = self.eye_cascade.detectMultiScale(upper_half, 1.1, 3, minSize=(20, 20))
+                if features.keypoints is not None:
+                    # Eye keypoints locate the eyes; only their contrast needs checking
+                    eye_count = keypoint_visible_eyes(face_gray, features.keypoints)
+                else:
+                    eye_count = len(self.eye_cascade.detectMultiScale(upper_half, 1.1, 3, minSize=(20, 20)))
                 
-                if len(eyes) == 0:
-                    return 0.9
-                elif len(eyes) == 1:
-                    return 0.6
+                if eye_count == 0:
+                    return self.face_cover_eye_scores['no_eyes']
+                elif eye_count == 1:
+                    return self.face_cover_eye_scores['one_eye']
                 else:
-                    return 0.2
+                    return self.face_cover_eye_scores['both_eyes']
             
-            return 0.5
+            return self.face_cover_eye_scores['no_upper_face']
             
         except Exception as e:
-            return 0.0
+            return self.face_cover_eye_scores['error']
     
-    def _analyze_lower_face_coverage(self, face_region):
+    def _analyze_lower_face_coverage(self, features):
         """Specifically analyze lower face (mouth/nose area) for coverage"""
         try:
-            h = face_region.shape[0]
-            lower_face = face_region[h//2:, :]
-            
-            if lower_face.size == 0:
+            if not features.has_lower_face:
                 return 0.0
             
-            hsv = cv2.cvtColor(lower_face, cv2.COLOR_BGR2HSV)
-            
-            mask_pixels = 0
-            for mask_type, ranges in self.color_ranges['mask'].items():
-                for lower, upper in ranges:
-                    mask = cv2.inRange(hsv, lower, upper)
-                    mask_pixels += cv2.countNonZero(mask)
+            mask_ratio = features.lower_face_mask_ratio
+            uniformity = features.lower_face_uniformity
+            if features.keypoints is not None:
+                # Nose and mouth keypoints pin down the region a mask would cover
+                keypoint_features = keypoint_lower_face(features.face_region, features.keypoints,
+                                                        self.color_ranges['mask'])
+                if keypoint_features is not None:
+                    mask_ratio, uniformity = keypoint_features
             
-            total_pixels = lower_face.shape[0] * lower_face.shape[1]
-            coverage_ratio = mask_pixels / total_pixels
-            
-            hsv_mean = cv2.mean(hsv)[:3]
-            hsv_std = np.std(hsv.reshape(-1, 3), axis=0)
-            uniformity = 1.0 - (np.mean(hsv_std) / 255.0)
-            
-            score = coverage_ratio * 0.6 + uniformity * 0.4
+            score = mask_ratio * 0.6 + uniformity * 0.4
             
             if score > 0.5:
                 return min(0.95, score * 1.3)
@@ -866,45 +1056,57 @@ class EnhancedPeopleDetectionPipeline:
         except Exception as e:
             return 0.0
     
-    # Helper methods for loitering detection
-    def _find_or_create_tracker(self, cx, cy, current_time, max_distance=80):
-        """Find existing tracker or create new one"""
-        min_dist = float('inf')
-        closest_tracker = None
-        
-        for tracker_id, tracker in self.loitering_tracker.items():
-            if len(tracker['positions']) > 0:
-                last_pos = tracker['positions'][-1]
-                dist = np.sqrt((cx - last_pos[0])**2 + (cy - last_pos[1])**2)
-                
-                time_gap = current_time - tracker['timestamps'][-1]
-                
-                if dist < min_dist and dist < max_distance and time_gap < 5:
-                    min_dist = dist
-                    closest_tracker = tracker_id
-        
-        if closest_tracker is not None:
-            return closest_tracker
-        else:
-            new_id = f"tracker_{int(current_time * 1000)}_{cx}_{cy}"
-            self.loitering_tracker[new_id] = {
-                'positions': deque(maxlen=50),
-                'start_time': current_time,
-                'timestamps': deque(maxlen=50)
-            }
-            return new_id
+    def min_input_resolution(self):
+        """Smallest (width, height) that still meets every detector's minimum resolution"""
+        widths, heights = zip(*self.detector_min_resolution.values())
+        return max(widths), max(heights)
     
-    def _cleanup_old_trackers(self, current_time, max_age=180):
-        """Remove trackers that haven't been updated recently"""
-        to_remove = []
-        for tracker_id, tracker in self.loitering_tracker.items():
-            if len(tracker['timestamps']) > 0:
-                time_since_update = current_time - tracker['timestamps'][-1]
-                if time_since_update > max_age:
-                    to_remove.append(tracker_id)
+    def bootstrap_background(self, frames):
+        """Seed the background models from a reference clip of the empty booth"""
+        return self.enhanced_people_detector.bootstrap_background(frames)
+    
+    def state_signature(self):
+        """Layout of the exported state; snapshots with another signature are rejected"""
+        return {
+            'pipeline': type(self).__name__,
+            'track_history': self.loitering_tracks.history_size,
+            'zones': self.zone_engine.zone_names if self.zone_engine is not None else None,
+            'zone_frame_size': list(self.zone_engine.frame_size) if self.zone_engine is not None else None
+        }
+    
+    def export_state(self):
+        """Snapshot-ready detector state (numpy arrays and JSON values)"""
+        return {
+            'people': self.enhanced_people_detector.export_state(),
+            'tracks': self.loitering_tracks.export_state(),
+            'zones': self.zone_engine.export_state() if self.zone_engine is not None else None,
+            'histories': {
+                'helmet': [bool(x) for x in self.helmet_history],
+                'face_cover': [bool(x) for x in self.face_cover_history],
+                'posture': [float(x) for x in self.posture_history]
+            },
+            'previous_faces': [list(face) for face in self.previous_faces],
+            'face_cover_evaluation': dict(self.face_cover_eval_stats),
+            'last_result': self.last_result
+        }
+    
+    def import_state(self, state):
+        """Warm-restore detector state exported by export_state"""
+        self.enhanced_people_detector.import_state(state['people'])
+        self.loitering_tracks.import_state(state['tracks'])
+        if self.zone_engine is not None and state.get('zones'):
+            self.zone_engine.import_state(state['zones'])
+        
+        histories = state.get('histories', {})
+        for history, key in [(self.helmet_history, 'helmet'),
+                             (self.face_cover_history, 'face_cover'),
+                             (self.posture_history, 'posture')]:
+            history.clear()
+            history.extend(histories.get(key, []))
         
-        for tracker_id in to_remove:
-            del self.loitering_tracker[tracker_id]
+        self.previous_faces = [tuple(face) for face in state.get('previous_faces', [])]
+        self.face_cover_eval_stats.update(state.get('face_cover_evaluation', {}))
+        self.last_result = state.get('last_result')
     
     def get_detection_stats(self):
         """Get comprehensive detection statistics"""
@@ -915,7 +1117,11 @@ class EnhancedPeopleDetectionPipeline:
                 'people_detection': people_stats,
                 'helmet_detections': len([x for x in self.helmet_history if x]),
                 'face_cover_detections': len([x for x in self.face_cover_history if x]),
-                'active_trackers': len(self.loitering_tracker),
+                'active_trackers': len(self.loitering_tracks),
+                'face_cover_evaluation': dict(self.face_cover_eval_stats),
+                'result_cache': self.identity_cache.get_stats(),
+                'face_backend': self.face_backend.name,
+                'posture_backend': self.pose_backend.get_stats() if self.pose_backend else 'silhouette',
                 'posture_violations': len([x for x in self.posture_history if x < 0.5])
             }
             
@@ -3,6 +3,7 @@ import numpy as np
 import time
 from collections import deque, defaultdict
 import math
+from posture_features import silhouette_descriptors, posture_score
 
 class UltraHighAccuracyDetectionPipeline:
     """
@@ -24,6 +25,10 @@ class UltraHighAccuracyDetectionPipeline:
         })
         self.posture_history = deque(maxlen=30)
         
+        # Person boxes and foreground mask from the last detect_people call
+        self.last_person_boxes = []
+        self.last_fg_mask = None
+        
         # Optical flow tracking
         self.prev_gray = None
         self.feature_params = dict(maxCorners=100, qualityLevel=0.3, minDistance=7, blockSize=7)
@@ -141,6 +146,13 @@ class UltraHighAccuracyDetectionPipeline:
             # Filter by confidence (weights)
             people_hog_default = sum(1 for w in weights_default if w > 0.5) if len(weights_default) > 0 else 0
             
+            # Keep confident boxes in original frame coordinates for posture analysis
+            scale_x = frame.shape[1] / 640.0
+            scale_y = frame.shape[0] / 480.0
+            self.last_person_boxes = [
+                (int(x * scale_x), int(y * scale_y), int(w * scale_x), int(h * scale_y))
+                for (x, y, w, h), weight in zip(boxes_default, np.ravel(weights_default)) if weight > 0.5]
+            
             # Method 2: Daimler HOG detector (more conservative)
             boxes_daimler, weights_daimler = self.hog_daimler.detectMultiScale(
                 frame_resized, 
@@ -154,6 +166,7 @@ class UltraHighAccuracyDetectionPipeline:
             
             # Method 3: MOG2 background subtraction
             fg_mask_mog2 = self.bg_subtractor_mog2.apply(gray)
+            self.last_fg_mask = fg_mask_mog2
             people_mog2 = self._count_people_from_mask(fg_mask_mog2, frame.shape)
             
             # Method 4: KNN background subtraction
@@ -978,10 +991,9 @@ class UltraHighAccuracyDetectionPipeline:
     def detect_posture(self, frame):
         """
         Ultra-accurate posture detection using:
-        - Multi-scale contour analysis
-        - Skeleton approximation
-        - Joint angle estimation
-        - Biomechanical constraints
+        - Per-person foreground silhouettes
+        - Moment-based orientation and aspect ratio
+        - Solidity and top/bottom mass balance
         - Temporal smoothing
         """
         try:
@@ -990,91 +1002,10 @@ class UltraHighAccuracyDetectionPipeline:
             if people_count == 0:
                 return False, 0.0
             
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            
-            # Multi-scale edge detection
-            edges1 = cv2.Canny(gray, 20, 80)
-            edges2 = cv2.Canny(gray, 40, 120)
-            edges3 = cv2.Canny(gray, 60, 180)
-            edges = cv2.bitwise_or(edges1, cv2.bitwise_or(edges2, edges3))
-            
-            # Morphological operations to connect edges
-            kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (3, 3))
-            edges = cv2.morphologyEx(edges, cv2.MORPH_CLOSE, kernel)
-            
-            # Find contours
-            contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-            
-            posture_scores = []
-            
-            for contour in contours:
-                area = cv2.contourArea(contour)
-                if area > 3500:  # Significant person-sized contour
-                    x, y, w, h = cv2.boundingRect(contour)
-                    aspect_ratio = h / w if w > 0 else 0
-                    
-                    # Person-like aspect ratio
-                    if aspect_ratio > 1.5 and h > 120:
-                        # Method 1: Solidity analysis
-                        hull = cv2.convexHull(contour)
-                        hull_area = cv2.contourArea(hull)
-                        solidity = area / hull_area if hull_area > 0 else 0
-                        
-                        # Method 2: Verticality check
-                        moments = cv2.moments(contour)
-                        if moments['mu20'] != 0:
-                            # Calculate orientation
-                            orientation = 0.5 * np.arctan2(2 * moments['mu11'], 
-                                                          moments['mu20'] - moments['mu02'])
-                            verticality = 1.0 - abs(orientation) / (np.pi / 2)
-                        else:
-                            verticality = 0.5
-                        
-                        # Method 3: Aspect ratio score
-                        # Good posture: tall and narrow (aspect ratio 2-4)
-                        if 2.0 <= aspect_ratio <= 4.0:
-                            aspect_score = 0.9
-                        elif 1.5 <= aspect_ratio < 2.0 or 4.0 < aspect_ratio <= 5.0:
-                            aspect_score = 0.7
-                        else:
-                            aspect_score = 0.4
-                        
-                        # Method 4: Upper/Lower body analysis
-                        upper_half = contour[contour[:, :, 1] < (y + h/2)]
-                        lower_half = contour[contour[:, :, 1] >= (y + h/2)]
-                        
-                        balance_score = 0.5
-                        if len(upper_half) > 0 and len(lower_half) > 0:
-                            upper_area = cv2.contourArea(upper_half) if len(upper_half) >= 3 else 0
-                            lower_area = cv2.contourArea(lower_half) if len(lower_half) >= 3 else 0
-                            
-                            if upper_area > 0 and lower_area > 0:
-                                balance = min(upper_area/lower_area, lower_area/upper_area)
-                                balance_score = balance
-                        
-                        # Method 5: Symmetry check
-                        left_half = contour[contour[:, :, 0] < (x + w/2)]
-                        right_half = contour[contour[:, :, 0] >= (x + w/2)]
-                        
-                        symmetry_score = 0.5
-                        if len(left_half) > 0 and len(right_half) > 0:
-                            left_area = cv2.contourArea(left_half) if len(left_half) >= 3 else 0
-                            right_area = cv2.contourArea(right_half) if len(right_half) >= 3 else 0
-                            
-                            if left_area > 0 and right_area > 0:
-                                symmetry = min(left_area/right_area, right_area/left_area)
-                                symmetry_score = symmetry
-                        
-                        # Composite posture score
-                        composite_score = (
-                            solidity * 0.30 +
-                            verticality * 0.25 +
-                            aspect_score * 0.20 +
-                            balance_score * 0.15 +
-                            symmetry_score * 0.10
-                        )
-                        
-                        posture_scores.append(composite_score)
+            # Silhouette descriptors per person box: orientation, aspect ratio,
+            # solidity and top/bottom mass ratio from the foreground mask
+            descriptors = silhouette_descriptors(self.last_fg_mask, self.last_person_boxes)
+            posture_scores = [posture_score(descriptor) for descriptor in descriptors]
             
             # Calculate final posture assessment
             if posture_scores:
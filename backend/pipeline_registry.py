@@ -0,0 +1,160 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+from frame_queue import CameraFrameQueue
+
+CAMERA_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+
+def normalize_camera_id(camera_id, default='default'):
+    """Validated camera id (used in snapshot and reference paths), or None if invalid"""
+    if camera_id is None or camera_id == '':
+        return default
+    camera_id = str(camera_id)
+    return camera_id if CAMERA_ID_PATTERN.match(camera_id) else None
+
+class CameraPipeline:
+    """One camera's detection pipeline, its frame queue and its last activity time"""
+
+    def __init__(self, camera_id, pipeline, frame_queue):
+        self.camera_id = camera_id
+        self.pipeline = pipeline
+        self.frame_queue = frame_queue
+        self.created_at = time.time()
+        self.last_used = time.time()
+
+class PipelineRegistry:
+    """
+    Per-camera pipelines with idle LRU eviction
+    - Each camera gets its own pipeline state and frame-queue worker on first use
+    - Cameras are kept in least-recently-used order
+    - Cameras idle for longer than idle_timeout, or beyond max_cameras, are evicted
+      (their worker is stopped and on_evict can snapshot the state)
+    """
+
+    def __init__(self, create_pipeline, process_frame, idle_timeout=600, max_cameras=32,
+                 queue_capacity=2, on_evict=None):
+        self.create_pipeline = create_pipeline  # camera_id -> pipeline
+        self.process_frame = process_frame      # (camera_id, pipeline, frame, timestamp) -> results
+        self.idle_timeout = idle_timeout
+        self.max_cameras = max_cameras
+        self.queue_capacity = queue_capacity
+        self.on_evict = on_evict                # (camera_id, pipeline) -> None
+
+        self.cameras = OrderedDict()  # Least recently used first
+        self.lock = threading.Lock()
+        self.stats = {'created': 0, 'evicted_idle': 0, 'evicted_capacity': 0}
+        self.janitor = None
+
+    def get(self, camera_id):
+        """Camera pipeline for camera_id, creating it on first use"""
+        with self.lock:
+            camera = self.cameras.get(camera_id)
+            if camera is not None:
+                self.cameras.move_to_end(camera_id)
+                camera.last_used = time.time()
+                return camera
+
+        # Build outside the lock so a slow restore does not stall other cameras
+        created = self._create(camera_id)
+
+        evicted = []
+        with self.lock:
+            camera = self.cameras.get(camera_id)
+            if camera is None:
+                camera = created
+                self.cameras[camera_id] = camera
+                self.stats['created'] += 1
+                while len(self.cameras) > self.max_cameras:
+                    evicted.append(self.cameras.popitem(last=False)[1])
+                    self.stats['evicted_capacity'] += 1
+            else:
+                # Another request created it first
+                self.cameras.move_to_end(camera_id)
+            camera.last_used = time.time()
+
+        if camera is not created:
+            created.frame_queue.stop()
+        for old in evicted:
+            self._shutdown(old)
+        return camera
+
+    def peek(self, camera_id):
+        """Camera pipeline if it exists, without creating it or refreshing its LRU position"""
+        with self.lock:
+            return self.cameras.get(camera_id)
+
+    def evict_idle(self, now=None):
+        """Evict cameras idle for longer than idle_timeout; returns the evicted ids"""
+        now = time.time() if now is None else now
+        evicted = []
+        with self.lock:
+            while self.cameras:
+                camera_id, camera = next(iter(self.cameras.items()))
+                if now - camera.last_used <= self.idle_timeout:
+                    break
+                del self.cameras[camera_id]
+                evicted.append(camera)
+                self.stats['evicted_idle'] += 1
+
+        for camera in evicted:
+            self._shutdown(camera)
+        return [camera.camera_id for camera in evicted]
+
+    def start_janitor(self, interval=None):
+        """Background thread that evicts idle cameras periodically"""
+        interval = interval or max(1.0, self.idle_timeout / 4)
+
+        def run():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.evict_idle()
+                except Exception as e:
+                    print(f"[ERROR] Error evicting idle cameras: {e}")
+
+        self.janitor = threading.Thread(target=run, name="pipeline-janitor", daemon=True)
+        self.janitor.start()
+
+    def shutdown(self):
+        """Evict every camera (e.g. on process exit)"""
+        with self.lock:
+            cameras = list(self.cameras.values())
+            self.cameras.clear()
+        for camera in cameras:
+            self._shutdown(camera)
+
+    def list_cameras(self):
+        """Per-camera activity and queue counters, most recently used last"""
+        now = time.time()
+        with self.lock:
+            cameras = list(self.cameras.values())
+        return [{
+            'camera_id': camera.camera_id,
+            'idle_seconds': round(now - camera.last_used, 1),
+            'uptime_seconds': round(now - camera.created_at, 1),
+            'queue': camera.frame_queue.get_stats()
+        } for camera in cameras]
+
+    def get_stats(self):
+        with self.lock:
+            return dict(self.stats, active=len(self.cameras), max_cameras=self.max_cameras,
+                        idle_timeout=self.idle_timeout)
+
+    def _create(self, camera_id):
+        pipeline = self.create_pipeline(camera_id)
+        frame_queue = CameraFrameQueue(
+            camera_id,
+            lambda frame, timestamp: self.process_frame(camera_id, pipeline, frame, timestamp),
+            capacity=self.queue_capacity)
+        return CameraPipeline(camera_id, pipeline, frame_queue)
+
+    def _shutdown(self, camera):
+        # Stopping the worker first leaves the pipeline state consistent for the snapshot
+        camera.frame_queue.stop()
+        if self.on_evict is not None:
+            try:
+                self.on_evict(camera.camera_id, camera.pipeline)
+            except Exception as e:
+                print(f"[ERROR] Error evicting camera {camera.camera_id}: {e}")
+        print(f"[INFO] Evicted camera pipeline {camera.camera_id}")
@@ -0,0 +1,172 @@
+import cv2
+import numpy as np
+from frame_clock import monotonic_now
+from loitering_tracks import TrackStore
+
+try:
+    import mediapipe as mp
+except ImportError:
+    mp = None
+
+# MediaPipe Pose landmark indices (left, right)
+SHOULDERS = (11, 12)
+HIPS = (23, 24)
+KNEES = (25, 26)
+ANKLES = (27, 28)
+
+def joint_angle(a, b, c):
+    """Angle at b (radians) between the segments b->a and b->c"""
+    ba = np.asarray(a, dtype=np.float64) - b
+    bc = np.asarray(c, dtype=np.float64) - b
+    norm = np.linalg.norm(ba) * np.linalg.norm(bc)
+    if norm == 0:
+        return np.pi
+    return float(np.arccos(np.clip(np.dot(ba, bc) / norm, -1.0, 1.0)))
+
+def pose_posture_score(landmarks, min_visibility=0.5):
+    """
+    Upright-posture score in [0, 1] from pose landmarks (x, y, visibility rows)
+    Bending shows up as a tilted torso and a closed shoulder-hip-knee angle;
+    knee flexion (crouching) counts when the knees and ankles are visible.
+    Returns None when the shoulders or hips are not visible.
+    """
+    points = landmarks[:, :2]
+    visible = landmarks[:, 2] >= min_visibility
+    if not (visible[list(SHOULDERS)].all() and visible[list(HIPS)].all()):
+        return None
+
+    shoulder = points[list(SHOULDERS)].mean(axis=0)
+    hip = points[list(HIPS)].mean(axis=0)
+
+    # Torso tilt from the vertical (image y grows downwards)
+    torso = shoulder - hip
+    tilt = np.arctan2(abs(torso[0]), max(-torso[1], 1e-6))
+    verticality = 1.0 - min(1.0, tilt / (np.pi / 2))
+
+    # Hip angle: ~180 degrees standing, closes when bending over
+    hip_angles = [joint_angle(points[s], points[h], points[k])
+                  for s, h, k in zip(SHOULDERS, HIPS, KNEES) if visible[k]]
+    if hip_angles:
+        hip_straightness = np.clip((np.mean(hip_angles) - np.pi / 3) / (2 * np.pi / 3), 0.0, 1.0)
+    else:
+        hip_straightness = verticality
+
+    # Knee angle: ~180 degrees standing, closes when crouching
+    knee_angles = [joint_angle(points[h], points[k], points[a])
+                   for h, k, a in zip(HIPS, KNEES, ANKLES) if visible[k] and visible[a]]
+    if knee_angles:
+        knee_straightness = np.clip((np.mean(knee_angles) - np.pi / 3) / (2 * np.pi / 3), 0.0, 1.0)
+    else:
+        knee_straightness = 1.0
+
+    return float(verticality * 0.45 + hip_straightness * 0.40 + knee_straightness * 0.15)
+
+class MediaPipePoseBackend:
+    """
+    MediaPipe Pose posture scoring on person crops
+    - Runs the bundled CPU pose model only inside person boxes
+    - Each tracked person is re-estimated at most every `cadence` frames
+    - Results are reused while the person's box stays stable
+    """
+
+    def __init__(self, cadence=5, min_crop_height=96, padding=0.1, max_box_change=0.2,
+                 model_complexity=0, max_age=10):
+        self.cadence = cadence
+        self.min_crop_height = min_crop_height
+        self.padding = padding
+        self.max_box_change = max_box_change
+        self.max_age = max_age
+
+        self.pose = None
+        if mp is not None:
+            try:
+                # Crops of different people arrive in turn, so each one is a static image
+                self.pose = mp.solutions.pose.Pose(static_image_mode=True,
+                                                   model_complexity=model_complexity,
+                                                   min_detection_confidence=0.5)
+            except Exception as e:
+                print(f"[ERROR] Error initializing MediaPipe Pose: {e}")
+
+        # Tracks on normalized box centers, so association is resolution independent
+        self.tracks = TrackStore(capacity=8, history_size=2, max_distance=0.1, max_time_gap=2)
+        # slot -> (track start time, frame index, box, score)
+        self.results = {}
+        self.frame_index = 0
+        self.stats = {'estimated': 0, 'reused': 0, 'failed': 0}
+
+    @property
+    def available(self):
+        return self.pose is not None
+
+    def score_people(self, frame, boxes, timestamp=None):
+        """
+        Posture score per box (frame coordinates); None where no pose was found
+        so the caller can fall back to another estimate for that person
+        """
+        self.frame_index += 1
+        if not self.available or len(boxes) == 0:
+            return [None] * len(boxes)
+
+        timestamp = monotonic_now() if timestamp is None else timestamp
+        frame_h, frame_w = frame.shape[:2]
+        self.tracks.expire(timestamp, max_age=self.max_age)
+        centers = [((x + w / 2) / frame_w, (y + h / 2) / frame_h) for (x, y, w, h) in boxes]
+        slots = [int(slot) for slot in self.tracks.update(centers, timestamp)]
+
+        scores = []
+        for slot, box in zip(slots, boxes):
+            cached = self.results.get(slot)
+            if cached is not None and self._reusable(cached, slot, box):
+                self.stats['reused'] += 1
+                scores.append(cached[3])
+                continue
+
+            score = self._estimate(frame, box)
+            if score is None:
+                self.stats['failed'] += 1
+                self.results.pop(slot, None)
+            else:
+                self.stats['estimated'] += 1
+                self.results[slot] = (self.tracks.start_time[slot], self.frame_index, box, score)
+            scores.append(score)
+
+        return scores
+
+    def get_stats(self):
+        return dict(self.stats, available=self.available, cadence=self.cadence)
+
+    def _reusable(self, cached, slot, box):
+        start_time, frame_index, cached_box, _ = cached
+        if start_time != self.tracks.start_time[slot]:
+            return False
+        if self.frame_index - frame_index >= self.cadence:
+            return False
+        # A box that changes size noticeably means the person moved; re-estimate
+        _, _, w0, h0 = cached_box
+        _, _, w, h = box
+        return abs(w - w0) <= self.max_box_change * w0 and abs(h - h0) <= self.max_box_change * h0
+
+    def _estimate(self, frame, box):
+        """Run the pose model on one padded person crop"""
+        try:
+            frame_h, frame_w = frame.shape[:2]
+            x, y, w, h = box
+            pad_x, pad_y = int(w * self.padding), int(h * self.padding)
+            x0, y0 = max(0, int(x) - pad_x), max(0, int(y) - pad_y)
+            x1, y1 = min(frame_w, int(x + w) + pad_x), min(frame_h, int(y + h) + pad_y)
+            if y1 - y0 < self.min_crop_height or x1 <= x0:
+                return None
+
+            crop = cv2.cvtColor(frame[y0:y1, x0:x1], cv2.COLOR_BGR2RGB)
+            result = self.pose.process(crop)
+            if result.pose_landmarks is None:
+                return None
+
+            # Normalized crop coordinates to crop pixels so angles are not distorted
+            landmarks = np.array([(lm.x * (x1 - x0), lm.y * (y1 - y0), lm.visibility)
+                                  for lm in result.pose_landmarks.landmark], dtype=np.float64)
+            return pose_posture_score(landmarks)
+
+        except Exception as e:
+            print(f"[ERROR] MediaPipe pose estimation error: {e}")
+            return None
@@ -0,0 +1,83 @@
+import cv2
+import numpy as np
+
+def silhouette_descriptors(fg_mask, boxes, min_fill=0.15):
+    """
+    Moment-based posture descriptors for each person box
+    Uses the foreground silhouette inside the box rather than image edges, so the
+    cost scales with the number of people. Boxes whose silhouette covers less than
+    `min_fill` of the box are skipped.
+    """
+    descriptors = []
+    if fg_mask is None:
+        return descriptors
+
+    frame_h, frame_w = fg_mask.shape[:2]
+    for (x, y, w, h) in boxes:
+        x0, y0 = max(0, int(x)), max(0, int(y))
+        x1, y1 = min(frame_w, int(x + w)), min(frame_h, int(y + h))
+        if x1 - x0 < 4 or y1 - y0 < 4:
+            continue
+
+        # Shadows are 127 in MOG2/KNN masks; keep confident foreground only
+        silhouette = (fg_mask[y0:y1, x0:x1] > 127).astype(np.uint8)
+
+        moments = cv2.moments(silhouette, binaryImage=True)
+        area = moments['m00']
+        if area < min_fill * silhouette.size:
+            continue
+
+        # Principal-axis angle measured from the vertical (0 = upright, pi/2 = horizontal)
+        axis_angle = 0.5 * np.arctan2(2 * moments['mu11'], moments['mu20'] - moments['mu02'])
+        tilt = np.pi / 2 - abs(axis_angle)
+
+        # Silhouette extent from row/column projections
+        row_mass = silhouette.sum(axis=1)
+        rows = np.flatnonzero(row_mass)
+        cols = np.flatnonzero(silhouette.any(axis=0))
+        height = rows[-1] - rows[0] + 1
+        width = cols[-1] - cols[0] + 1
+
+        # Solidity against the convex hull of the foreground pixels
+        hull_area = cv2.contourArea(cv2.convexHull(cv2.findNonZero(silhouette)))
+        solidity = min(1.0, area / hull_area) if hull_area > 0 else 0.0
+
+        # Top/bottom mass split at the silhouette's vertical midpoint
+        middle = rows[0] + height // 2
+        top_mass = float(row_mass[rows[0]:middle].sum())
+        bottom_mass = float(row_mass[middle:rows[-1] + 1].sum())
+
+        descriptors.append({
+            'box': (x0, y0, x1 - x0, y1 - y0),
+            'tilt': float(tilt),
+            'aspect_ratio': height / width,
+            'solidity': float(solidity),
+            'mass_ratio': top_mass / bottom_mass if bottom_mass > 0 else 0.0
+        })
+
+    return descriptors
+
+def posture_score(descriptor):
+    """Upright-posture score in [0, 1]; bending lowers it"""
+    verticality = 1.0 - min(1.0, descriptor['tilt'] / (np.pi / 2))
+
+    aspect_ratio = descriptor['aspect_ratio']
+    if aspect_ratio >= 2.0:
+        aspect_score = 0.9
+    elif aspect_ratio >= 1.5:
+        aspect_score = 0.7
+    elif aspect_ratio >= 1.0:
+        aspect_score = 0.4
+    else:
+        aspect_score = 0.2
+
+    # Upright bodies carry their mass evenly; bending piles it into one half
+    mass_ratio = descriptor['mass_ratio']
+    balance = min(mass_ratio, 1.0 / mass_ratio) if mass_ratio > 0 else 0.0
+
+    return (
+        verticality * 0.35 +
+        aspect_score * 0.30 +
+        descriptor['solidity'] * 0.20 +
+        balance * 0.15
+    )
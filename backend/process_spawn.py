@@ -0,0 +1,30 @@
+import multiprocessing
+import sys
+import threading
+from contextlib import contextmanager
+
+_main_lock = threading.Lock()
+
+def spawn_context():
+    # spawn: the server process already runs threads, which must not be forked
+    return multiprocessing.get_context('spawn')
+
+@contextmanager
+def hidden_main_module():
+    """
+    Start spawn-context processes inside this block to keep them from re-running
+    the parent's __main__ script (app.py: TTS engine, Flask app, DB engine, worker
+    pool). A spawned child imports the main module when the parent's __main__ has a
+    __file__ or __spec__; with both hidden it only imports the modules its target
+    function and arguments live in
+    """
+    with _main_lock:
+        main = sys.modules['__main__']
+        saved = {name: main.__dict__[name] for name in ('__file__', '__spec__') if name in main.__dict__}
+        main.__dict__.pop('__file__', None)
+        main.__spec__ = None
+        try:
+            yield
+        finally:
+            main.__dict__.pop('__spec__', None)
+            main.__dict__.update(saved)
@@ -0,0 +1,76 @@
+import cv2
+import os
+import shutil
+
+class ReferenceBackgroundStore:
+    """
+    Per-camera "empty booth" reference frames on local disk
+    Each camera keeps a short clip of PNG frames used to seed the background
+    models on startup or after a lighting change
+    """
+
+    def __init__(self, root_dir, max_frames=10):
+        self.root_dir = root_dir
+        self.max_frames = max_frames
+
+    def frame_count(self, value=None):
+        """Requested clip length clamped to 1..max_frames (all when None); raises ValueError if not an integer"""
+        if value is None:
+            return self.max_frames
+        if isinstance(value, bool) or isinstance(value, float) and not value.is_integer():
+            raise ValueError(f'frames must be an integer, got {value!r}')
+        try:
+            count = int(value)
+        except (TypeError, ValueError):
+            raise ValueError(f'frames must be an integer, got {value!r}')
+        return max(1, min(count, self.max_frames))
+
+    def camera_dir(self, camera_id):
+        return os.path.join(self.root_dir, camera_id)
+
+    def exists(self, camera_id):
+        return len(self._frame_files(camera_id)) > 0
+
+    def save(self, camera_id, frames):
+        """Replace a camera's reference clip; returns the number of frames stored"""
+        frames = list(frames)[-self.max_frames:]
+        if not frames:
+            return 0
+
+        try:
+            target = self.camera_dir(camera_id)
+            staging = f"{target}.tmp"
+            shutil.rmtree(staging, ignore_errors=True)
+            os.makedirs(staging)
+
+            for i, frame in enumerate(frames):
+                cv2.imwrite(os.path.join(staging, f"frame_{i:03d}.png"), frame)
+
+            # Swap the whole clip in at once so readers never see a partial set
+            previous = f"{target}.old"
+            shutil.rmtree(previous, ignore_errors=True)
+            if os.path.exists(target):
+                os.replace(target, previous)
+            os.replace(staging, target)
+            shutil.rmtree(previous, ignore_errors=True)
+            return len(frames)
+
+        except Exception as e:
+            print(f"[ERROR] Error saving reference background for {camera_id}: {e}")
+            return 0
+
+    def load(self, camera_id):
+        """Load a camera's reference clip in capture order"""
+        frames = []
+        for path in self._frame_files(camera_id):
+            frame = cv2.imread(path)
+            if frame is not None:
+                frames.append(frame)
+        return frames
+
+    def _frame_files(self, camera_id):
+        directory = self.camera_dir(camera_id)
+        if not os.path.isdir(directory):
+            return []
+        return [os.path.join(directory, name) for name in sorted(os.listdir(directory))
+                if name.endswith('.png')]
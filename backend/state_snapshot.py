@@ -0,0 +1,198 @@
+import numpy as np
+import json
+import os
+import threading
+import time
+
+# Bump whenever the exported state layout changes; older snapshots are rejected
+SNAPSHOT_VERSION = 1
+
+def _json_default(value):
+    """Convert numpy scalars for JSON encoding"""
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def _flatten_state(state, prefix, arrays, values):
+    """Split a nested state dict into numpy arrays and JSON values keyed by path"""
+    for key, value in state.items():
+        path = f"{prefix}/{key}" if prefix else key
+        if isinstance(value, np.ndarray):
+            arrays[path] = value
+        elif isinstance(value, dict):
+            values[path] = {}
+            _flatten_state(value, path, arrays, values)
+        else:
+            values[path] = value
+
+def _unflatten_state(arrays, values):
+    """Rebuild the nested state dict from array and JSON paths"""
+    state = {}
+    for path, value in sorted(list(values.items()) + list(arrays.items()), key=lambda item: item[0]):
+        node = state
+        parts = path.split('/')
+        for part in parts[:-1]:
+            node = node.setdefault(part, {})
+        if isinstance(value, dict) and not value:
+            node.setdefault(parts[-1], {})
+        else:
+            node[parts[-1]] = value
+    return state
+
+def save_snapshot(path, state, signature):
+    """Atomically write a versioned detector-state snapshot (npz, no pickling)"""
+    try:
+        arrays = {}
+        values = {}
+        _flatten_state(state, '', arrays, values)
+
+        meta = {
+            'version': SNAPSHOT_VERSION,
+            'signature': signature,
+            'saved_at': time.time(),
+            'values': values
+        }
+        arrays['__meta__'] = np.array(json.dumps(meta, default=_json_default))
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, **arrays)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        return True
+
+    except Exception as e:
+        print(f"[ERROR] Error saving snapshot {path}: {e}")
+        return False
+
+def load_snapshot(path, signature):
+    """Load a snapshot, returning None if it is missing, corrupt or from another layout"""
+    try:
+        if not os.path.exists(path):
+            return None
+
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data['__meta__']))
+            if meta.get('version') != SNAPSHOT_VERSION:
+                print(f"[WARNING] Snapshot {path} rejected: version {meta.get('version')} != {SNAPSHOT_VERSION}")
+                return None
+            # Round-trip through JSON so tuples and lists compare equal
+            if meta.get('signature') != json.loads(json.dumps(signature, default=_json_default)):
+                print(f"[WARNING] Snapshot {path} rejected: detector layout changed")
+                return None
+
+            arrays = {key: data[key] for key in data.files if key != '__meta__'}
+
+        return _unflatten_state(arrays, meta['values'])
+
+    except Exception as e:
+        print(f"[ERROR] Error loading snapshot {path}: {e}")
+        return None
+
+class PeriodicSnapshotter:
+    """
+    Periodic per-camera snapshots of detector state
+    State is exported on the calling (frame-processing) thread so it is
+    consistent, and written to disk on a background thread. Final snapshots
+    (eviction, shutdown) are written synchronously with snapshot_now
+    """
+
+    def __init__(self, snapshot_dir, interval=30.0):
+        self.snapshot_dir = snapshot_dir
+        self.interval = interval
+        self.last_snapshot = {}
+        self.writing = set()
+        self.lock = threading.Lock()
+
+    def snapshot_path(self, camera_id):
+        return os.path.join(self.snapshot_dir, f"{camera_id}.npz")
+
+    def maybe_snapshot(self, camera_id, pipeline, force=False):
+        """Snapshot a pipeline if its interval has elapsed and no write is pending"""
+        now = time.time()
+        with self.lock:
+            if camera_id in self.writing:
+                return False
+            if not force and now - self.last_snapshot.get(camera_id, 0) < self.interval:
+                return False
+            self.writing.add(camera_id)
+            self.last_snapshot[camera_id] = now
+
+        try:
+            state = pipeline.export_state()
+            signature = pipeline.state_signature()
+        except Exception as e:
+            print(f"[ERROR] Error exporting state for {camera_id}: {e}")
+            with self.lock:
+                self.writing.discard(camera_id)
+            return False
+
+        def write():
+            try:
+                save_snapshot(self.snapshot_path(camera_id), state, signature)
+            finally:
+                with self.lock:
+                    self.writing.discard(camera_id)
+
+        thread = threading.Thread(target=write)
+        thread.daemon = True
+        thread.start()
+        return True
+
+    def wait_for_writes(self, timeout=5.0):
+        """Wait for every pending background write; returns True when none are left"""
+        deadline = time.time() + timeout
+        while True:
+            with self.lock:
+                if not self.writing:
+                    return True
+            if time.time() >= deadline:
+                return False
+            time.sleep(0.01)
+
+    def snapshot_now(self, camera_id, pipeline, timeout=5.0):
+        """
+        Snapshot a pipeline synchronously (eviction, shutdown); returns True when saved
+        Waits for the camera's pending background write so it cannot replace this
+        newer state, and holds the camera's write slot while writing
+        """
+        deadline = time.time() + timeout
+        while True:
+            with self.lock:
+                if camera_id not in self.writing:
+                    self.writing.add(camera_id)
+                    break
+            if time.time() >= deadline:
+                print(f"[ERROR] Pending snapshot write for {camera_id} did not finish in {timeout}s")
+                return False
+            time.sleep(0.01)
+
+        try:
+            saved = save_snapshot(self.snapshot_path(camera_id), pipeline.export_state(),
+                                  pipeline.state_signature())
+        except Exception as e:
+            print(f"[ERROR] Error exporting state for {camera_id}: {e}")
+            saved = False
+        finally:
+            with self.lock:
+                self.writing.discard(camera_id)
+                self.last_snapshot[camera_id] = time.time()
+        return saved
+
+    def restore(self, camera_id, pipeline):
+        """Warm-restore a pipeline from its snapshot; returns True when restored"""
+        start = time.time()
+        state = load_snapshot(self.snapshot_path(camera_id), pipeline.state_signature())
+        if state is None:
+            return False
+
+        try:
+            pipeline.import_state(state)
+        except Exception as e:
+            print(f"[ERROR] Error restoring state for {camera_id}: {e}")
+            return False
+
+        print(f"[SUCCESS] Restored {camera_id} detector state in {time.time() - start:.3f}s")
+        return True
@@ -0,0 +1,30 @@
+import json
+import struct
+
+# Binary frame message: 4-byte big-endian sequence number followed by the encoded image
+FRAME_HEADER = struct.Struct('>I')
+
+def parse_frame_message(message):
+    """Split a binary frame message into (sequence, encoded image); None if malformed"""
+    if not isinstance(message, (bytes, bytearray)) or len(message) <= FRAME_HEADER.size:
+        return None
+    sequence, = FRAME_HEADER.unpack_from(message)
+    return sequence, memoryview(message)[FRAME_HEADER.size:]
+
+def pack_frame_message(sequence, encoded_image):
+    """Build a binary frame message (used by Python clients and tests)"""
+    return FRAME_HEADER.pack(sequence & 0xFFFFFFFF) + bytes(encoded_image)
+
+def pack_result(sequence, results, **extra):
+    """Compact JSON result message for one processed frame"""
+    message = {'type': 'result', 'seq': sequence, 'results': results}
+    message.update(extra)
+    return json.dumps(message, separators=(',', ':'))
+
+def pack_error(sequence, error):
+    """Compact JSON error message; sequence is None for connection-level errors"""
+    return json.dumps({'type': 'error', 'seq': sequence, 'error': error}, separators=(',', ':'))
+
+def pack_dropped(sequence):
+    """Frame dropped unprocessed because newer frames arrived (frees the client's slot)"""
+    return json.dumps({'type': 'dropped', 'seq': sequence}, separators=(',', ':'))
@@ -0,0 +1,216 @@
+import itertools
+import os
+import threading
+import time
+import cv2
+from frame_clock import monotonic_now
+
+STREAM_PREFIXES = ('rtsp://', 'rtmp://', 'http://', 'https://')
+
+def open_capture(uri):
+    """cv2.VideoCapture for a device index ("0"), a stream URL or a local video file"""
+    if uri.isdigit():
+        return cv2.VideoCapture(int(uri))
+    return cv2.VideoCapture(uri)
+
+def is_live_source(uri):
+    return uri.isdigit() or uri.lower().startswith(STREAM_PREFIXES)
+
+def validate_source_uri(uri):
+    """Error message for an unusable source, or None"""
+    if not isinstance(uri, str) or not uri.strip():
+        return 'No source provided'
+    if not is_live_source(uri) and not os.path.isfile(uri):
+        return f'Video file not found: {uri}'
+    return None
+
+class VideoSource:
+    """
+    One server-side video source feeding a camera's frame queue
+    - A decode-ahead thread reads the capture and submits frames at `fps`
+    - Files are sampled on their own timeline (skipped frames are grabbed but
+      not decoded) and paced in real time; live sources are drained continuously
+      so the newest frame is always the one submitted
+    - File frames are timestamped from their presentation time, live frames when read
+    - Frames are downscaled to just cover the pipeline's minimum input resolution
+    """
+
+    def __init__(self, source_id, uri, camera_id, fps, get_camera, loop=False):
+        self.source_id = source_id
+        self.uri = uri
+        self.camera_id = camera_id
+        self.fps = fps
+        self.get_camera = get_camera  # camera_id -> CameraPipeline
+        self.loop = loop
+        self.live = is_live_source(uri)
+
+        self.status = 'opening'
+        self.error = None
+        self.stats = {'frames_read': 0, 'frames_submitted': 0}
+        self.position_seconds = 0.0
+        self.started_at = time.time()
+
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self._run, name=f"source-{source_id}", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        self.thread.join(timeout=5)
+        if self.status in ('opening', 'running'):
+            self.status = 'stopped'
+
+    def get_info(self):
+        return dict(self.stats,
+                    source_id=self.source_id,
+                    source=self.uri,
+                    camera_id=self.camera_id,
+                    fps=self.fps,
+                    live=self.live,
+                    loop=self.loop,
+                    status=self.status,
+                    error=self.error,
+                    position_seconds=round(self.position_seconds, 1),
+                    uptime_seconds=round(time.time() - self.started_at, 1))
+
+    def _run(self):
+        capture = open_capture(self.uri)
+        try:
+            if not capture.isOpened():
+                self.status = 'error'
+                self.error = f'Could not open source: {self.uri}'
+                print(f"[ERROR] {self.error}")
+                return
+
+            self.status = 'running'
+            print(f"[INFO] Video source {self.source_id} feeding camera {self.camera_id}")
+            if self.live:
+                self._run_live(capture)
+            else:
+                self._run_file(capture)
+
+        except Exception as e:
+            self.status = 'error'
+            self.error = str(e)
+            print(f"[ERROR] Video source {self.source_id} failed: {e}")
+        finally:
+            capture.release()
+
+    def _run_file(self, capture):
+        source_fps = capture.get(cv2.CAP_PROP_FPS) or 25.0
+        # Decode every step-th frame; the rest are only grabbed
+        step = max(1, int(round(source_fps / self.fps)))
+        interval = step / source_fps
+        frame_index = 0
+        next_due = time.monotonic()
+        # Presentation times continue across loops on the detector clock
+        timeline_start = monotonic_now()
+
+        while not self.stop_event.is_set():
+            if frame_index % step != 0:
+                if not capture.grab():
+                    if not self._rewind(capture):
+                        return
+                    timeline_start += frame_index / source_fps
+                    frame_index = 0
+                    continue
+                frame_index += 1
+                continue
+
+            ok, frame = capture.read()
+            if not ok:
+                if not self._rewind(capture):
+                    return
+                timeline_start += frame_index / source_fps
+                frame_index = 0
+                continue
+
+            self.stats['frames_read'] += 1
+            self.position_seconds = frame_index / source_fps
+            frame_index += 1
+
+            # Real-time pacing on the file's own timeline
+            delay = next_due - time.monotonic()
+            if delay > 0 and self.stop_event.wait(delay):
+                return
+            next_due = max(next_due + interval, time.monotonic() - interval)
+            self._submit(frame, timeline_start + self.position_seconds)
+
+    def _run_live(self, capture):
+        interval = 1.0 / self.fps
+        next_due = time.monotonic()
+
+        while not self.stop_event.is_set():
+            ok, frame = capture.read()
+            if not ok:
+                self.status = 'error'
+                self.error = 'Source stopped delivering frames'
+                print(f"[ERROR] Video source {self.source_id}: {self.error}")
+                return
+
+            self.stats['frames_read'] += 1
+            now = time.monotonic()
+            if now >= next_due:
+                next_due = max(next_due + interval, now)
+                self._submit(frame, monotonic_now())
+
+    def _rewind(self, capture):
+        """Restart a looping file; otherwise mark it finished"""
+        if self.loop and capture.set(cv2.CAP_PROP_POS_FRAMES, 0):
+            return True
+        self.status = 'finished'
+        print(f"[INFO] Video source {self.source_id} finished")
+        return False
+
+    def _submit(self, frame, timestamp):
+        # Looked up per frame so the camera stays alive and is rebuilt after an eviction
+        camera = self.get_camera(self.camera_id)
+        width, height = camera.pipeline.min_input_resolution()
+
+        scale = min(1.0, max(width / frame.shape[1], height / frame.shape[0]))
+        if scale < 1.0:
+            frame = cv2.resize(frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+
+        camera.frame_queue.submit(frame, timestamp=timestamp)
+        self.stats['frames_submitted'] += 1
+
+class VideoSourceManager:
+    """Server-side video sources (files, capture devices, stream URLs) by source id"""
+
+    def __init__(self, get_camera, default_fps=5.0):
+        self.get_camera = get_camera
+        self.default_fps = default_fps
+        self.sources = {}
+        self.source_ids = itertools.count(1)
+        self.lock = threading.Lock()
+
+    def start(self, uri, camera_id=None, fps=None, loop=False):
+        """Open a source and start feeding its camera; returns the new VideoSource"""
+        with self.lock:
+            source_id = f"source-{next(self.source_ids)}"
+        source = VideoSource(source_id, uri, camera_id or source_id, fps or self.default_fps,
+                             self.get_camera, loop=loop)
+        with self.lock:
+            self.sources[source_id] = source
+        return source
+
+    def stop(self, source_id):
+        """Stop and forget a source; returns its final info, or None if unknown"""
+        with self.lock:
+            source = self.sources.pop(source_id, None)
+        if source is None:
+            return None
+        source.stop()
+        return source.get_info()
+
+    def list_sources(self):
+        with self.lock:
+            sources = list(self.sources.values())
+        return [source.get_info() for source in sources]
+
+    def shutdown(self):
+        with self.lock:
+            sources = list(self.sources.values())
+            self.sources.clear()
+        for source in sources:
+            source.stop()
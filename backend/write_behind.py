@@ -0,0 +1,167 @@
+import threading
+import time
+from collections import defaultdict, deque
+
+class WriteBehindBuffer:
+    """
+    In-memory buffer for event-log rows and daily stats increments
+    - The request/detection path only appends; it never touches the database
+    - A background flusher hands everything buffered to flush(events, stats)
+      every interval seconds, or sooner once max_records events are waiting
+    - Stats increments are summed in memory, so a flush writes one update per
+      key no matter how many frames contributed
+    - A failed flush puts its batch back (up to max_backlog events; the oldest
+      are dropped beyond that) and is retried on the next cycle
+    - With a separate flush_stats(stats), events and stats are written and
+      retried independently, so failing stats writes cannot stall event logging
+    """
+
+    def __init__(self, flush, interval=0.5, max_records=500, max_backlog=100000, flush_stats=None):
+        self.flush_batch = flush  # (events, stats) -> None; stats: {key: {column: increment}}, {} with flush_stats
+        self.flush_stats = flush_stats
+        self.interval = interval
+        self.max_records = max_records
+        self.max_backlog = max_backlog
+
+        self.events = deque()
+        self.stats = defaultdict(lambda: defaultdict(int))
+        self.oldest_pending = None
+        self.condition = threading.Condition()
+        # Serializes flushes between the flusher thread and explicit flush() calls
+        self.flush_lock = threading.Lock()
+
+        self.metrics = {'events_flushed': 0, 'stats_flushed': 0, 'flushes': 0,
+                        'errors': 0, 'events_dropped': 0}
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+        self.last_error = None
+
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+        self.thread.start()
+
+    def add_event(self, row):
+        """Buffer one event-log row (a dict of column values)"""
+        with self.condition:
+            self.events.append(row)
+            self._mark_pending()
+            if len(self.events) >= self.max_records:
+                self.condition.notify_all()
+
+    def add_stats(self, key, increments):
+        """Add counter increments ({column: n}) to a stats row key (e.g. a date)"""
+        with self.condition:
+            counters = self.stats[key]
+            for column, value in increments.items():
+                counters[column] += value
+            self._mark_pending()
+
+    def flush(self):
+        """Write everything buffered now (used on shutdown and by tests)"""
+        with self.flush_lock:
+            with self.condition:
+                events, stats = self._take()
+            if events or stats:
+                self._write(events, stats)
+
+    def stop(self):
+        with self.condition:
+            self.running = False
+            self.condition.notify_all()
+        if self.thread is not None:
+            self.thread.join(timeout=10)
+        self.flush()
+
+    def get_stats(self):
+        with self.condition:
+            backlog = len(self.events)
+            stats_backlog = len(self.stats)
+            age = time.monotonic() - self.oldest_pending if self.oldest_pending is not None else 0.0
+        return dict(self.metrics,
+                    backlog_events=backlog,
+                    backlog_stats=stats_backlog,
+                    oldest_pending_ms=round(age * 1000, 1),
+                    last_flush_ms=round(self.last_flush_ms, 1),
+                    max_flush_ms=round(self.max_flush_ms, 1),
+                    interval_ms=round(self.interval * 1000),
+                    max_records=self.max_records,
+                    last_error=self.last_error)
+
+    def _mark_pending(self):
+        if self.oldest_pending is None:
+            self.oldest_pending = time.monotonic()
+
+    def _take(self):
+        """Swap out the buffered batch (caller holds the condition)"""
+        events = list(self.events)
+        stats = {key: dict(counters) for key, counters in self.stats.items()}
+        self.events.clear()
+        self.stats.clear()
+        self.oldest_pending = None
+        return events, stats
+
+    def _run(self):
+        while True:
+            with self.condition:
+                deadline = time.monotonic() + self.interval
+                while self.running and len(self.events) < self.max_records:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self.condition.wait(remaining)
+                if not self.running:
+                    return
+
+            self.flush()
+
+    def _write(self, events, stats):
+        start = time.monotonic()
+        if self.flush_stats is None:
+            events_written = stats_written = self._attempt(lambda: self.flush_batch(events, stats), events, stats)
+        else:
+            events_written = not events or self._attempt(lambda: self.flush_batch(events, {}), events, {})
+            stats_written = not stats or self._attempt(lambda: self.flush_stats(stats), [], stats)
+
+        if events_written:
+            self.metrics['events_flushed'] += len(events)
+        if stats_written:
+            self.metrics['stats_flushed'] += len(stats)
+        if not (events_written and stats_written):
+            return
+
+        elapsed = (time.monotonic() - start) * 1000
+        self.last_flush_ms = elapsed
+        self.max_flush_ms = max(self.max_flush_ms, elapsed)
+        self.metrics['flushes'] += 1
+        self.last_error = None
+
+    def _attempt(self, write, events, stats):
+        """Run one write; on failure count it and put its part of the batch back"""
+        try:
+            write()
+            return True
+        except Exception as e:
+            self.metrics['errors'] += 1
+            self.last_error = str(e)
+            print(f"[ERROR] Write-behind flush failed ({len(events)} events, {len(stats)} stats rows): {e}")
+            self._requeue(events, stats)
+            return False
+
+    def _requeue(self, events, stats):
+        """Put a failed batch back in front of anything buffered since"""
+        with self.condition:
+            self.events.extendleft(reversed(events))
+            overflow = len(self.events) - self.max_backlog
+            for _ in range(max(0, overflow)):
+                self.events.popleft()
+                self.metrics['events_dropped'] += 1
+
+            for key, increments in stats.items():
+                counters = self.stats[key]
+                for column, value in increments.items():
+                    counters[column] += value
+            self._mark_pending()
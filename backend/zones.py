@@ -0,0 +1,146 @@
+import cv2
+import numpy as np
+import json
+import os
+
+def load_zone_config(path):
+    """
+    Load per-camera zone definitions from a JSON file
+    Format: {"<camera_id>": [{"name": "atm_fascia", "polygon": [[x, y], ...], "dwell_seconds": 25}]}
+    Polygon points are normalized (0-1) frame coordinates. A missing file means no zones.
+    """
+    try:
+        if not path or not os.path.exists(path):
+            return {}
+        with open(path, 'r') as f:
+            return json.load(f)
+
+    except Exception as e:
+        print(f"[ERROR] Error loading zone config {path}: {e}")
+        return {}
+
+class ZoneDwellEngine:
+    """
+    Zone-based dwell-time engine for loitering detection
+    - Polygon zones rasterized once into a label mask
+    - Per-zone dwell counters accumulated from each frame's foreground pixels
+      and track positions with O(pixels) integer updates
+    - Decaying occupancy heatmap over the whole frame
+    - Loitering becomes a constant-time query per zone
+    """
+
+    HEATMAP_INCREMENT = 256  # Steady-state maximum is HEATMAP_INCREMENT << decay_shift
+
+    def __init__(self, zones, frame_size=(320, 240), occupancy_threshold=0.15,
+                 absence_grace=3.0, heatmap_decay_shift=6, default_dwell_seconds=25):
+        self.frame_size = frame_size
+        self.occupancy_threshold = occupancy_threshold
+        self.absence_grace_ms = int(absence_grace * 1000)
+        self.heatmap_decay_shift = heatmap_decay_shift
+
+        width, height = frame_size
+        self.zone_names = [zone.get('name', f'zone_{i + 1}') for i, zone in enumerate(zones)]
+        self.dwell_limits_ms = np.array(
+            [0] + [int(zone.get('dwell_seconds', default_dwell_seconds) * 1000) for zone in zones],
+            dtype=np.int64)
+
+        # Rasterize zones once; label 0 is "outside every zone", later zones win overlaps
+        self.labels = np.zeros((height, width), dtype=np.uint8)
+        for label, zone in enumerate(zones, start=1):
+            polygon = np.array(zone['polygon'], dtype=np.float64) * [width, height]
+            cv2.fillPoly(self.labels, [np.round(polygon).astype(np.int32)], label)
+        self.zone_pixels = np.maximum(np.bincount(self.labels.ravel(), minlength=len(zones) + 1), 1)
+
+        # Integer dwell state in milliseconds
+        self.dwell_ms = np.zeros(len(zones) + 1, dtype=np.int64)
+        self.last_occupied_ms = np.zeros(len(zones) + 1, dtype=np.int64)
+        self.occupancy = np.zeros(len(zones) + 1, dtype=np.float64)
+        self.last_update_ms = None
+
+        self.heatmap = np.zeros((height, width), dtype=np.uint16)
+
+    def update(self, fg_mask, timestamp, points=None):
+        """Accumulate one frame of foreground pixels and track positions (frame_size coordinates)"""
+        now_ms = int(timestamp * 1000)
+        elapsed_ms = 0 if self.last_update_ms is None else max(0, now_ms - self.last_update_ms)
+        # Stalls, worker restarts and snapshot restores leave gaps nobody was watching;
+        # credit at most the absence grace period for a single frame
+        elapsed_ms = min(elapsed_ms, self.absence_grace_ms)
+        self.last_update_ms = now_ms
+
+        if fg_mask.shape[:2] != self.labels.shape:
+            fg_mask = cv2.resize(fg_mask, self.frame_size, interpolation=cv2.INTER_NEAREST)
+
+        # MOG2/KNN mark shadows as 127; only count confident foreground
+        foreground = fg_mask > 127
+
+        # Decaying heatmap: h -= h >> shift, then add the new foreground
+        self.heatmap -= self.heatmap >> self.heatmap_decay_shift
+        self.heatmap += foreground.astype(np.uint16) * self.HEATMAP_INCREMENT
+
+        # Per-zone occupancy from one bincount over the foreground labels
+        counts = np.bincount(self.labels[foreground], minlength=len(self.zone_pixels))
+        self.occupancy = counts / self.zone_pixels
+        occupied = self.occupancy >= self.occupancy_threshold
+
+        # A tracked person standing in a zone also marks it occupied
+        if points is not None and len(points) > 0:
+            points = np.asarray(points, dtype=np.int64).reshape(-1, 2)
+            height, width = self.labels.shape
+            xs = np.clip(points[:, 0], 0, width - 1)
+            ys = np.clip(points[:, 1], 0, height - 1)
+            occupied[self.labels[ys, xs]] = True
+
+        occupied[0] = False
+        self.dwell_ms[occupied] += elapsed_ms
+        self.last_occupied_ms[occupied] = now_ms
+
+        # Reset zones that have been empty for longer than the grace period
+        absent = ~occupied & (now_ms - self.last_occupied_ms > self.absence_grace_ms)
+        self.dwell_ms[absent] = 0
+
+    def dwell_seconds(self, zone_index):
+        """Current dwell time of a zone (0-based index)"""
+        return self.dwell_ms[zone_index + 1] / 1000.0
+
+    def is_loitering(self, zone_index):
+        """Constant-time loitering query for one zone (0-based index)"""
+        return bool(self.dwell_ms[zone_index + 1] > self.dwell_limits_ms[zone_index + 1])
+
+    def loitering_zones(self):
+        """Names and dwell times of every zone over its dwell limit"""
+        over = np.flatnonzero(self.dwell_ms[1:] > self.dwell_limits_ms[1:])
+        return [(self.zone_names[i], self.dwell_seconds(i)) for i in over]
+
+    def heatmap_image(self):
+        """Heatmap normalized to uint8 (255 = continuously occupied)"""
+        full_scale = self.HEATMAP_INCREMENT << self.heatmap_decay_shift
+        return np.minimum(self.heatmap.astype(np.uint32) * 255 // full_scale, 255).astype(np.uint8)
+
+    def get_zone_stats(self):
+        """Dwell state of every zone for the dashboard"""
+        return [{
+            'name': name,
+            'occupancy': float(self.occupancy[i + 1]),
+            'dwell_seconds': self.dwell_seconds(i),
+            'dwell_limit_seconds': self.dwell_limits_ms[i + 1] / 1000.0,
+            'loitering': self.is_loitering(i)
+        } for i, name in enumerate(self.zone_names)]
+
+    def export_state(self):
+        """Dwell counters and heatmap for snapshots"""
+        return {
+            'dwell_ms': self.dwell_ms.copy(),
+            'last_occupied_ms': self.last_occupied_ms.copy(),
+            'occupancy': self.occupancy.copy(),
+            'heatmap': self.heatmap.copy(),
+            'last_update_ms': self.last_update_ms
+        }
+
+    def import_state(self, state):
+        """Restore dwell counters and heatmap exported by export_state"""
+        self.dwell_ms = np.array(state['dwell_ms'], dtype=np.int64)
+        self.last_occupied_ms = np.array(state['last_occupied_ms'], dtype=np.int64)
+        self.occupancy = np.array(state['occupancy'], dtype=np.float64)
+        self.heatmap = np.array(state['heatmap'], dtype=np.uint16)
+        self.last_update_ms = state['last_update_ms']
@@ -20,6 +20,7 @@ import {
 import toast from 'react-hot-toast';
 import { sendLoiteringAlert, sendTestEmail } from '../services/emailService';
 import cameraBlackoutMonitor from '../services/cameraBlackoutMonitor';
+import detectionStream from '../services/detectionStream';
 import './DetectionModule.css';
 
 const DetectionModule = () => {
@@ -37,8 +38,23 @@ const DetectionModule = () => {
   const [cameraId, setCameraId] = useState('ATM_CAMERA_001');
   const [location, setLocation] = useState('ATM Surveillance System');
   
+  const [ingestConfig, setIngestConfig] = useState({ preferred_width: 640, preferred_height: 480, jpeg_quality: 0.8 });
+  
   const webcamRef = useRef(null);
   const detectionIntervalRef = useRef(null);
+  const lastResultSequenceRef = useRef(null);
+
+  // Ask the server which frame size its detectors need, so we never upload more pixels
+  useEffect(() => {
+    fetch(`/api/ingest-config?camera_id=${encodeURIComponent(cameraId)}`)
+      .then(response => response.json())
+      .then(config => {
+        if (config.preferred_width && config.preferred_height) {
+          setIngestConfig(config);
+        }
+      })
+      .catch(error => console.error('Error fetching ingest config:', error));
+  }, [cameraId]);
 
   // Cleanup video URL on unmount
   useEffect(() => {
@@ -131,12 +147,27 @@ const DetectionModule = () => {
       }
     }
 
-    // Start detection loop
+    // Prefer the persistent stream; fall back to one HTTP request per second
+    try {
+      await detectionStream.connect(cameraId, handleResults, handleStreamError);
+      startStreamLoop();
+    } catch (error) {
+      console.log('Detection stream unavailable, using HTTP polling');
+      startHttpLoop();
+    }
+  };
+
+  // HTTP detection loop: one JSON request per second
+  const startHttpLoop = () => {
+    if (detectionIntervalRef.current) {
+      clearInterval(detectionIntervalRef.current);
+    }
     detectionIntervalRef.current = setInterval(async () => {
       try {
+        const capturedAt = Date.now(); // Detector clocks run on capture time
         const frame = await captureFrame();
         if (frame) {
-          await processFrame(frame);
+          await processFrame(frame, capturedAt);
         }
       } catch (error) {
         console.error('Detection error:', error);
@@ -144,11 +175,41 @@ const DetectionModule = () => {
     }, 1000); // Process every second
   };
 
+  // Streaming detection loop: binary frames over the WebSocket at 5 fps, several in flight
+  const startStreamLoop = () => {
+    if (detectionIntervalRef.current) {
+      clearInterval(detectionIntervalRef.current);
+    }
+    detectionIntervalRef.current = setInterval(async () => {
+      try {
+        if (!detectionStream.canSend()) {
+          return; // Server is behind; skip this frame instead of queueing it
+        }
+        const blob = await captureFrameBlob();
+        if (blob) {
+          await detectionStream.sendFrame(blob);
+        }
+      } catch (error) {
+        console.error('Detection error:', error);
+      }
+    }, 200); // 5 frames per second
+  };
+
+  const handleStreamError = (error, fatal) => {
+    if (fatal) {
+      // Channel dropped mid-session; keep detecting over HTTP
+      toast.error('Detection stream lost - falling back to HTTP');
+      startHttpLoop();
+    }
+  };
+
   const stopDetection = () => {
     setIsDetecting(false);
     if (detectionIntervalRef.current) {
       clearInterval(detectionIntervalRef.current);
+      detectionIntervalRef.current = null;
     }
+    detectionStream.disconnect();
     
     // Stop camera blackout monitoring
     cameraBlackoutMonitor.stopMonitoring();
@@ -156,10 +217,26 @@ const DetectionModule = () => {
     toast.success('Detection stopped');
   };
 
-  const captureFrame = async () => {
+  // Source size scaled down, keeping its aspect ratio, until it just covers the server's preferred size
+  const scaledFrameSize = (width, height) => {
+    if (!width || !height) {
+      return undefined; // Not known yet: capture at the source size
+    }
+    const scale = Math.min(1, Math.max(
+      ingestConfig.preferred_width / width,
+      ingestConfig.preferred_height / height));
+    return { width: Math.round(width * scale), height: Math.round(height * scale) };
+  };
+
+  const webcamFrameSize = () => {
+    const video = webcamRef.current.video;
+    return video ? scaledFrameSize(video.videoWidth, video.videoHeight) : undefined;
+  };
+
+  // Current frame drawn at the server's preferred size
+  const captureCanvas = () => {
     if (videoSource === 'webcam' && webcamRef.current) {
-      const imageSrc = webcamRef.current.getScreenshot();
-      return imageSrc;
+      return webcamRef.current.getCanvas(webcamFrameSize());
     }
     
     if (videoSource === 'upload' && videoElement) {
@@ -176,16 +253,17 @@ const DetectionModule = () => {
         const canvas = document.createElement('canvas');
         const ctx = canvas.getContext('2d');
         
-        // Set canvas dimensions to match video
-        canvas.width = videoElement.videoWidth;
-        canvas.height = videoElement.videoHeight;
+        // Set canvas dimensions to the video size, scaled down until it just covers the server's preferred size
+        const size = scaledFrameSize(videoElement.videoWidth, videoElement.videoHeight);
+        if (!size) {
+          return null;
+        }
+        canvas.width = size.width;
+        canvas.height = size.height;
         
         // Draw the current video frame to canvas
         ctx.drawImage(videoElement, 0, 0, canvas.width, canvas.height);
-        
-        // Convert canvas to base64 image
-        const imageSrc = canvas.toDataURL('image/jpeg', 0.8);
-        return imageSrc;
+        return canvas;
       } catch (error) {
         console.error('Error capturing video frame:', error);
         return null;
@@ -195,73 +273,100 @@ const DetectionModule = () => {
     return null;
   };
 
-  const processFrame = async (frameData) => {
+  // Binary JPEG of the current frame for the stream
+  const captureFrameBlob = () => {
+    const canvas = captureCanvas();
+    if (!canvas) {
+      return Promise.resolve(null);
+    }
+    return new Promise(resolve => canvas.toBlob(resolve, 'image/jpeg', ingestConfig.jpeg_quality));
+  };
+
+  const captureFrame = async () => {
+    if (videoSource === 'webcam' && webcamRef.current) {
+      const imageSrc = webcamRef.current.getScreenshot(webcamFrameSize());
+      return imageSrc;
+    }
+    
+    // Convert canvas to base64 image
+    const canvas = captureCanvas();
+    return canvas ? canvas.toDataURL('image/jpeg', ingestConfig.jpeg_quality) : null;
+  };
+
+  const processFrame = async (frameData, capturedAt) => {
     try {
       const response = await fetch('/api/process-video', {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
         },
-        body: JSON.stringify({ frame: frameData }),
+        body: JSON.stringify({ frame: frameData, camera_id: cameraId, timestamp: capturedAt }),
       });
 
       const data = await response.json();
       
-      if (data.success) {
-        setDetectionResults(data.results);
+      // The server answers with its freshest completed result, which may repeat under load
+      if (data.success && data.results && data.result_sequence !== lastResultSequenceRef.current) {
+        lastResultSequenceRef.current = data.result_sequence;
+        handleResults(data.results);
+      }
+    } catch (error) {
+      console.error('Error processing frame:', error);
+      toast.error('Error processing video frame');
+    }
+  };
+
+  // Results from either the HTTP endpoint or the stream
+  const handleResults = (results) => {
+    setDetectionResults(results);
+    
+    // Handle alerts
+    if (results.alerts && results.alerts.length > 0) {
+      results.alerts.forEach(alert => {
+        const alertItem = {
+          id: Date.now() + Math.random(),
+          type: alert.type,
+          message: alert.message,
+          confidence: alert.confidence,
+          timestamp: new Date().toLocaleTimeString()
+        };
         
-        // Handle alerts
-        if (data.results.alerts && data.results.alerts.length > 0) {
-          data.results.alerts.forEach(alert => {
-            const alertItem = {
-              id: Date.now() + Math.random(),
-              type: alert.type,
-              message: alert.message,
+        setAlertHistory(prev => [alertItem, ...prev.slice(0, 9)]); // Keep last 10 alerts
+        
+        // Show toast notification
+        toast.error(alert.message, {
+          duration: 4000,
+          icon: '🚨'
+        });
+
+        // Send email alert for loitering detection
+        if (alert.type === 'loitering' && emailAlertsEnabled) {
+          const now = Date.now();
+          // Only send email if 30 seconds have passed since last loitering alert
+          if (!lastLoiteringAlert || (now - lastLoiteringAlert) > 30000) {
+            setLastLoiteringAlert(now);
+            
+            const emailData = {
               confidence: alert.confidence,
-              timestamp: new Date().toLocaleTimeString()
+              duration: 'Ongoing',
+              timestamp: new Date().toISOString()
             };
             
-            setAlertHistory(prev => [alertItem, ...prev.slice(0, 9)]); // Keep last 10 alerts
-            
-            // Show toast notification
-            toast.error(alert.message, {
-              duration: 4000,
-              icon: '🚨'
-            });
-
-            // Send email alert for loitering detection
-            if (alert.type === 'loitering' && emailAlertsEnabled) {
-              const now = Date.now();
-              // Only send email if 30 seconds have passed since last loitering alert
-              if (!lastLoiteringAlert || (now - lastLoiteringAlert) > 30000) {
-                setLastLoiteringAlert(now);
-                
-                const emailData = {
-                  confidence: alert.confidence,
-                  duration: 'Ongoing',
-                  timestamp: new Date().toISOString()
-                };
-                
-                sendLoiteringAlert(emailData).then(result => {
-                  if (result.success) {
-                    toast.success('📧 Email alert sent to security team', {
-                      duration: 5000,
-                      icon: '📧'
-                    });
-                  } else {
-                    toast.error('Failed to send email alert', {
-                      duration: 3000
-                    });
-                  }
+            sendLoiteringAlert(emailData).then(result => {
+              if (result.success) {
+                toast.success('📧 Email alert sent to security team', {
+                  duration: 5000,
+                  icon: '📧'
+                });
+              } else {
+                toast.error('Failed to send email alert', {
+                  duration: 3000
                 });
               }
-            }
-          });
+            });
+          }
         }
-      }
-    } catch (error) {
-      console.error('Error processing frame:', error);
-      toast.error('Error processing video frame');
+      });
     }
   };
 
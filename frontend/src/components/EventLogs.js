@@ -22,6 +22,11 @@ const EventLogs = () => {
   const [filterType, setFilterType] = useState('all');
   const [currentPage, setCurrentPage] = useState(1);
   const [totalPages, setTotalPages] = useState(1);
+  const [totalEvents, setTotalEvents] = useState(0);
+  const [totalEstimated, setTotalEstimated] = useState(false);
+  // Keyset cursor for each visited page (page 1 has none) and the one after the current page
+  const [pageCursors, setPageCursors] = useState([null]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [sortBy, setSortBy] = useState('timestamp');
   const [sortOrder, setSortOrder] = useState('desc');
 
@@ -51,12 +56,19 @@ const EventLogs = () => {
         sort_by: sortBy,
         sort_order: sortOrder
       });
+      const cursor = pageCursors[currentPage - 1];
+      if (cursor) {
+        params.set('cursor', cursor);
+      }
 
       const response = await fetch(`/api/event-logs?${params}`);
       const data = await response.json();
       
       setLogs(data.logs || []);
       setTotalPages(data.pages || 1);
+      setTotalEvents(data.total || 0);
+      setTotalEstimated(Boolean(data.total_estimated));
+      setNextCursor(data.next_cursor || null);
     } catch (error) {
       console.error('Error fetching logs:', error);
     } finally {
@@ -64,14 +76,19 @@ const EventLogs = () => {
     }
   };
 
+  const resetPaging = () => {
+    setCurrentPage(1);
+    setPageCursors([null]);
+  };
+
   const handleSearch = (e) => {
     setSearchTerm(e.target.value);
-    setCurrentPage(1);
+    resetPaging();
   };
 
   const handleFilterChange = (type) => {
     setFilterType(type);
-    setCurrentPage(1);
+    resetPaging();
   };
 
   const handleSort = (field) => {
@@ -81,6 +98,12 @@ const EventLogs = () => {
       setSortBy(field);
       setSortOrder('desc');
     }
+    resetPaging();
+  };
+
+  const goToNextPage = () => {
+    setPageCursors([...pageCursors.slice(0, currentPage), nextCursor]);
+    setCurrentPage(currentPage + 1);
   };
 
   const getEventIcon = (eventType) => {
@@ -128,7 +151,7 @@ const EventLogs = () => {
   };
 
   const stats = {
-    total: logs.length,
+    total: `${totalEstimated ? '~' : ''}${totalEvents.toLocaleString()}`,
     today: logs.filter(log => {
       const logDate = new Date(log.timestamp);
       const today = new Date();
@@ -336,7 +359,7 @@ const EventLogs = () => {
         </table>
       </div>
 
-      {totalPages > 1 && (
+      {(currentPage > 1 || nextCursor) && (
         <div className="pagination">
           <button
             className="page-btn"
@@ -347,24 +370,15 @@ const EventLogs = () => {
           </button>
           
           <div className="page-numbers">
-            {Array.from({ length: Math.min(5, totalPages) }, (_, i) => {
-              const page = i + 1;
-              return (
-                <button
-                  key={page}
-                  className={`page-btn ${currentPage === page ? 'active' : ''}`}
-                  onClick={() => setCurrentPage(page)}
-                >
-                  {page}
-                </button>
-              );
-            })}
+            <span className="page-btn active">
+              Page {currentPage} of {totalEstimated ? '~' : ''}{totalPages}
+            </span>
           </div>
           
           <button
             className="page-btn"
-            onClick={() => setCurrentPage(Math.min(totalPages, currentPage + 1))}
-            disabled={currentPage === totalPages}
+            onClick={goToNextPage}
+            disabled={!nextCursor}
           >
             Next
           </button>
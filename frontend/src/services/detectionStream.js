@@ -0,0 +1,141 @@
+// Detection Streaming Service
+// Keeps one WebSocket per camera session: binary frames go up, compact results come down
+
+const FRAME_HEADER_BYTES = 4; // Big-endian sequence number in front of each JPEG
+
+class DetectionStream {
+  constructor() {
+    this.socket = null;
+    this.sequence = 0;
+    this.inFlight = new Map(); // sequence -> send time
+    this.maxInFlight = 3; // Frames allowed on the wire before capture is skipped
+    this.onResult = null;
+    this.onError = null;
+    this.stats = { sent: 0, received: 0, skipped: 0, dropped: 0, lastLatency: 0 };
+  }
+
+  // Open the channel for a camera; resolves once connected, rejects if the server has no stream endpoint.
+  // onError(error, fatal) is called with fatal=true when an open channel closes.
+  connect(cameraId, onResult, onError) {
+    this.onResult = onResult;
+    this.onError = onError;
+
+    return new Promise((resolve, reject) => {
+      const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
+      const query = cameraId ? `?camera_id=${encodeURIComponent(cameraId)}` : '';
+      const socket = new WebSocket(`${protocol}//${window.location.host}/api/stream${query}`);
+      socket.binaryType = 'arraybuffer';
+
+      socket.onopen = () => {
+        this.socket = socket;
+        this.sequence = 0;
+        this.inFlight.clear();
+        console.log('🔌 Detection stream connected');
+        resolve();
+      };
+
+      socket.onmessage = (event) => this.handleMessage(event.data);
+
+      socket.onerror = (error) => {
+        if (!this.socket) {
+          reject(error);
+        }
+      };
+
+      socket.onclose = () => {
+        const wasOpen = this.socket === socket;
+        this.socket = null;
+        this.inFlight.clear();
+        if (wasOpen) {
+          console.log('🔌 Detection stream closed');
+          if (this.onError) this.onError(new Error('Detection stream closed'), true);
+        } else {
+          reject(new Error('Detection stream unavailable'));
+        }
+      };
+    });
+  }
+
+  // Close the channel
+  disconnect() {
+    if (this.socket) {
+      const socket = this.socket;
+      this.socket = null;
+      socket.close();
+    }
+    this.inFlight.clear();
+  }
+
+  isConnected() {
+    return this.socket !== null && this.socket.readyState === WebSocket.OPEN;
+  }
+
+  // Whether another frame may be sent without exceeding the in-flight window
+  canSend() {
+    return this.isConnected() && this.inFlight.size < this.maxInFlight;
+  }
+
+  // Send one encoded frame (Blob); returns false when skipped for backpressure
+  async sendFrame(blob) {
+    if (!this.canSend()) {
+      this.stats.skipped += 1;
+      return false;
+    }
+
+    const sequence = this.sequence;
+    this.sequence = (this.sequence + 1) >>> 0;
+    this.inFlight.set(sequence, performance.now());
+
+    const image = await blob.arrayBuffer();
+    const message = new Uint8Array(FRAME_HEADER_BYTES + image.byteLength);
+    new DataView(message.buffer).setUint32(0, sequence, false);
+    message.set(new Uint8Array(image), FRAME_HEADER_BYTES);
+
+    if (!this.isConnected()) {
+      this.inFlight.delete(sequence);
+      return false;
+    }
+    this.socket.send(message.buffer);
+    this.stats.sent += 1;
+    return true;
+  }
+
+  handleMessage(data) {
+    let message;
+    try {
+      message = JSON.parse(data);
+    } catch (error) {
+      console.error('Invalid detection stream message:', error);
+      return;
+    }
+
+    if (message.seq !== null && message.seq !== undefined) {
+      const sentAt = this.inFlight.get(message.seq);
+      if (sentAt !== undefined) {
+        this.stats.lastLatency = performance.now() - sentAt;
+        this.inFlight.delete(message.seq);
+      }
+    }
+
+    if (message.type === 'result') {
+      this.stats.received += 1;
+      if (this.onResult) this.onResult(message.results, message);
+    } else if (message.type === 'dropped') {
+      // Server queue replaced this frame with a newer one
+      this.stats.dropped += 1;
+    } else if (message.type === 'error') {
+      console.error('Detection stream error:', message.error);
+      if (this.onError) this.onError(new Error(message.error), false);
+    }
+  }
+
+  getStats() {
+    return { ...this.stats, inFlight: this.inFlight.size };
+  }
+}
+
+// Create global instance
+const detectionStream = new DetectionStream();
+
+export default detectionStream;
+export { DetectionStream };
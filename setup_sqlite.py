@@ -49,7 +49,10 @@ def create_database():
                 posture_violations INTEGER DEFAULT 0,
                 UNIQUE(date)
             )
-            """
+            """,
+            # Newest-first listing and per-type filtering without a full scan
+            "CREATE INDEX IF NOT EXISTS ix_event_log_timestamp ON event_log (timestamp, id)",
+            "CREATE INDEX IF NOT EXISTS ix_event_log_type_timestamp ON event_log (event_type, timestamp, id)"
         ]
         
         for table_sql in tables:
@@ -6,6 +6,12 @@ Compares the original models with the ultra-high accuracy models
 import cv2
 import numpy as np
 import time
+import sys
+import os
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
 from backend.models import WorkingDetectionPipeline
 from backend.models_ultra import UltraHighAccuracyDetectionPipeline
 
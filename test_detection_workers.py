@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+ATM Surveillance System - Detection Worker Tests and Benchmark
+Checks the shared-memory frame ring, camera assignment, result routing and
+worker restarts, then compares multi-camera throughput of in-process pipelines
+against detection worker processes
+"""
+
+import cv2
+import numpy as np
+import tempfile
+import threading
+import time
+import sys
+import os
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from backend.detection_workers import SharedFrameRing, DetectionWorkerPool
+from backend.models_enhanced_people import EnhancedPeopleDetectionPipeline
+
+CAMERAS = 4
+FRAMES_PER_CAMERA = 20
+
+def create_test_frame(width=640, height=480, offset=0):
+    """Create a synthetic frame with a person-like figure"""
+    frame = np.ones((height, width, 3), dtype=np.uint8) * 200
+    x = 250 + offset % 100
+    cv2.rectangle(frame, (x, 200), (x + 140, 450), (100, 100, 100), -1)  # Body
+    cv2.circle(frame, (x + 70, 150), 50, (150, 170, 210), -1)  # Head
+    return frame
+
+def test_shared_frame_ring():
+    """Frames round-trip through ring slots and slots are recycled"""
+    ring = SharedFrameRing(slots=2, slot_bytes=640 * 480 * 3)
+    try:
+        frame = create_test_frame()
+        slot = ring.acquire()
+        ring.write(slot, frame)
+
+        reader = SharedFrameRing(slots=2, slot_bytes=640 * 480 * 3, name=ring.name)
+        copy = reader.read(slot, frame.shape, frame.dtype.str)
+        reader.close()
+
+        assert np.array_equal(copy, frame)
+        assert ring.acquire() is not None and ring.acquire() is None
+        ring.release(slot)
+        assert ring.acquire() == slot
+        assert not ring.fits(np.zeros((1080, 1920, 3), dtype=np.uint8))
+    finally:
+        ring.close()
+
+    print("✅ Shared-memory frame ring")
+    return True
+
+def worker_settings():
+    return {
+        'zones': {},
+        'posture_backend': 'silhouette',
+        'face_backend': 'haar',
+        'snapshots_enabled': False,
+        'snapshot_dir': tempfile.mkdtemp(),
+        'snapshot_interval': 30.0,
+        'reference_dir': tempfile.mkdtemp()
+    }
+
+def uniform_frame(value):
+    return np.full((240, 320, 3), value, dtype=np.uint8)
+
+def test_camera_assignment():
+    """New cameras go to the least-loaded worker and stay pinned there"""
+    pool = DetectionWorkerPool(2, worker_settings(), timeout=60)
+    try:
+        pipelines = {camera_id: pool.create_pipeline(camera_id) for camera_id in ('a', 'b', 'c')}
+        assert pipelines['a'].worker is not pipelines['b'].worker
+        assert sorted(len(worker.cameras) for worker in pool.workers) == [1, 2]
+        assert pool.assign('a') is pipelines['a'].worker
+
+        worker = pipelines['b'].worker
+        pipelines['b'].release()
+        assert 'b' not in worker.cameras and 'b' not in pool.assignments
+        assert pool.create_pipeline('d').worker is worker
+    finally:
+        pool.shutdown()
+
+    print("✅ Camera assignment")
+    return True
+
+def test_result_routing():
+    """Concurrent frames reach their own camera's pipeline and each caller gets its result"""
+    pool = DetectionWorkerPool(2, worker_settings(), timeout=60)
+    try:
+        cameras = {'a': 40, 'b': 220}
+        pipelines = {camera_id: pool.create_pipeline(camera_id) for camera_id in cameras}
+        results = {camera_id: [] for camera_id in cameras}
+
+        def feed(camera_id):
+            for i in range(3):
+                results[camera_id].append(pipelines[camera_id].process_frame(uniform_frame(cameras[camera_id]), float(i)))
+
+        threads = [threading.Thread(target=feed, args=(camera_id,)) for camera_id in cameras]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        for camera_id, value in cameras.items():
+            assert len(results[camera_id]) == 3
+            assert all('people_count' in result for result in results[camera_id])
+            recent = pipelines[camera_id].recent_frames
+            assert len(recent) == 3
+            assert all(frame.min() == value and frame.max() == value for frame in recent)
+    finally:
+        pool.shutdown()
+
+    print("✅ Result routing")
+    return True
+
+def test_worker_restart():
+    """A crashed worker is restarted and its cameras are pinned and rebuilt on their next frame"""
+    pool = DetectionWorkerPool(1, worker_settings(), timeout=60)
+    try:
+        pipeline = pool.create_pipeline('a')
+        pipeline.process_frame(uniform_frame(90), 0.0)
+        worker = pipeline.worker
+
+        worker.process.kill()
+        deadline = time.time() + 30
+        while (worker.stats['restarts'] == 0 or not worker.process.is_alive()) and time.time() < deadline:
+            time.sleep(0.05)
+        assert worker.stats['restarts'] == 1
+        assert 'a' not in pool.assignments and not worker.cameras
+
+        results = pipeline.process_frame(uniform_frame(90), 1.0)
+        assert 'people_count' in results
+        assert pool.assignments['a'] is pipeline.worker
+        assert 'a' in pipeline.worker.cameras
+        assert len(pipeline.recent_frames) == 1  # Rebuilt pipeline
+    finally:
+        pool.shutdown()
+
+    print("✅ Worker restart")
+    return True
+
+def run_cameras(process_frame):
+    """Feed every camera from its own thread; returns frames per second"""
+    frames = [create_test_frame(offset=i * 7) for i in range(FRAMES_PER_CAMERA)]
+
+    def feed(camera_id):
+        for frame in frames:
+            process_frame(camera_id, frame)
+
+    threads = [threading.Thread(target=feed, args=(f"cam{i}",)) for i in range(CAMERAS)]
+    start = time.time()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return CAMERAS * FRAMES_PER_CAMERA / (time.time() - start)
+
+def benchmark_in_process():
+    pipelines = {f"cam{i}": EnhancedPeopleDetectionPipeline() for i in range(CAMERAS)}
+    return run_cameras(lambda camera_id, frame: pipelines[camera_id].process_frame(frame))
+
+def benchmark_workers(num_workers):
+    pool = DetectionWorkerPool(num_workers, worker_settings())
+    try:
+        pipelines = {f"cam{i}": pool.create_pipeline(f"cam{i}") for i in range(CAMERAS)}
+        fps = run_cameras(lambda camera_id, frame: pipelines[camera_id].process_frame(frame))
+        assert sum(worker['shared_memory'] for worker in pool.get_stats()) == CAMERAS * FRAMES_PER_CAMERA
+        return fps
+    finally:
+        pool.shutdown()
+
+def print_header(text):
+    """Print a formatted header"""
+    print("\n" + "="*70)
+    print(f"  {text}")
+    print("="*70)
+
+def main():
+    print_header("DETECTION WORKER BENCHMARK")
+    test_shared_frame_ring()
+    test_camera_assignment()
+    test_result_routing()
+    test_worker_restart()
+
+    baseline = benchmark_in_process()
+    print(f"\n  In-process ({CAMERAS} cameras): {baseline:.1f} frames/s")
+
+    for num_workers in sorted({1, 2, min(CAMERAS, os.cpu_count() or 1)}):
+        fps = benchmark_workers(num_workers)
+        print(f"  {num_workers} worker(s): {fps:.1f} frames/s ({fps / baseline:.2f}x)")
+
+    return True
+
+if __name__ == "__main__":
+    main()
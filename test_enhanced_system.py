@@ -60,8 +60,17 @@ def test_enhanced_detection_functionality():
 def test_backend_app_import():
     """Test if backend app can be imported with enhanced detection"""
     try:
-        from backend.app import app, detection_pipeline
+        from backend.app import app, camera_registry
+        # The app imports its modules from backend/ directly, so compare against those classes
+        from models_enhanced_people import EnhancedPeopleDetectionPipeline
+        from detection_workers import RemotePipeline
         print("✅ Backend app imported successfully with enhanced detection")
+        
+        # Pipelines are per camera; with detection workers enabled they live in a worker process
+        detection_pipeline = camera_registry.get('default').pipeline
+        if not isinstance(detection_pipeline, (EnhancedPeopleDetectionPipeline, RemotePipeline)):
+            print(f"❌ Unexpected detection pipeline type: {type(detection_pipeline).__name__}")
+            return False
         print(f"✅ Detection pipeline type: {type(detection_pipeline).__name__}")
         return True
     except Exception as e:
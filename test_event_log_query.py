@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Test script for /api/event-logs query handling
+Tests filter parsing, keyset cursors and the cached totals
+"""
+
+import sys
+import os
+from datetime import datetime
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from backend.event_log_query import parse_event_query, encode_cursor, decode_cursor, count_key, CountCache
+
+def test_parse_filters():
+    """What EventLogs.js sends is parsed and validated, not ignored"""
+    query = parse_event_query({'filter': 'helmet', 'search': ' remove ', 'sort_by': 'confidence',
+                               'sort_order': 'ASC', 'min_confidence': '0.8', 'per_page': '500',
+                               'start': '2024-05-01T10:00:00+02:00', 'end': '2024-05-02T00:00:00Z'})
+    assert query['event_type'] == 'helmet'
+    assert query['search'] == 'remove'
+    assert query['sort_by'] == 'confidence' and query['sort_order'] == 'asc'
+    assert query['min_confidence'] == 0.8 and query['max_confidence'] is None
+    assert query['per_page'] == 100
+    assert query['start'] == datetime(2024, 5, 1, 8, 0)  # Converted to naive UTC
+    assert query['end'] == datetime(2024, 5, 2)
+
+    defaults = parse_event_query({'filter': 'all', 'search': ''})
+    assert defaults['event_type'] is None and defaults['search'] is None
+    assert defaults['sort_by'] == 'timestamp' and defaults['sort_order'] == 'desc'
+    assert defaults['cursor'] is None and defaults['page'] == 1
+
+    for bad in ({'sort_by': 'description'}, {'sort_order': 'up'}, {'min_confidence': 'high'},
+                {'start': 'yesterday'}, {'page': 'two'}):
+        try:
+            parse_event_query(bad)
+            assert False, bad
+        except ValueError:
+            pass
+
+    print("✅ Event-log filter parsing")
+    return True
+
+def test_cursor_round_trip():
+    """A page's last row becomes the cursor for the next page"""
+    last_seen = datetime(2024, 5, 1, 12, 30, 15, 250000)
+    cursor = encode_cursor(last_seen, 4711)
+    assert parse_event_query({'cursor': cursor})['cursor'] == (last_seen, 4711)
+    assert decode_cursor(encode_cursor(0.85, 12), 'confidence') == (0.85, 12)
+    assert decode_cursor(encode_cursor('helmet', 3), 'event_type') == ('helmet', 3)
+
+    for bad in ('not-a-cursor', encode_cursor('helmet', 3), encode_cursor(last_seen, 'x')):
+        try:
+            decode_cursor(bad, 'timestamp')
+            assert False, bad
+        except ValueError:
+            pass
+
+    print("✅ Keyset cursors")
+    return True
+
+def test_counts_are_cached_per_filter():
+    """Each filter combination is counted once per ttl, whatever the page or sort"""
+    counted = []
+
+    def count():
+        counted.append(1)
+        return 42
+
+    cache = CountCache(ttl=60)
+    first = parse_event_query({'filter': 'helmet'})
+    later_page = parse_event_query({'filter': 'helmet', 'sort_order': 'asc', 'page': '3'})
+    assert count_key(first) == count_key(later_page)
+
+    assert cache.get(count_key(first), count) == 42
+    assert cache.get(count_key(later_page), count) == 42
+    assert len(counted) == 1
+
+    cache.get(count_key(parse_event_query({'filter': 'posture'})), count)
+    assert len(counted) == 2
+
+    expired = CountCache(ttl=0)
+    expired.get('key', count)
+    expired.get('key', count)
+    assert len(counted) == 4
+
+    print("✅ Cached totals")
+    return True
+
+if __name__ == "__main__":
+    test_parse_filters()
+    test_cursor_round_trip()
+    test_counts_are_cached_per_filter()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Test script for the bulk event and daily-stats writers
+Tests the daily-stats upsert on SQLite for new days and legacy rows with NULL counters,
+migrating tables created without a unique date, and storing batch events without the Flask app
+"""
+
+import sys
+import os
+import tempfile
+from datetime import date, datetime
+
+from sqlalchemy import create_engine, func, select, text
+from sqlalchemy.exc import OperationalError
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from backend.event_store import (metadata, event_log, detection_stats, upsert_daily_stats, store_event_rows,
+                                 merge_duplicate_daily_stats)
+
+def read_stats(engine, day):
+    with engine.connect() as connection:
+        row = connection.execute(select(detection_stats).where(detection_stats.c.date == day)).mappings().one()
+    return dict(row)
+
+def test_upsert_new_day():
+    """The first flush of a day inserts the row, later flushes add to it"""
+    engine = create_engine('sqlite://')
+    metadata.create_all(engine)
+    day = date(2024, 5, 1)
+
+    for _ in range(2):
+        with engine.begin() as connection:
+            upsert_daily_stats(connection, {day: {'people_count': 3, 'helmet_violations': 1}})
+
+    row = read_stats(engine, day)
+    assert row['people_count'] == 6
+    assert row['helmet_violations'] == 2
+    assert row['posture_violations'] == 0
+
+    print("✅ Daily stats upsert (new day)")
+    return True
+
+def test_upsert_legacy_null_counters():
+    """Rows written with NULL counters keep counting instead of turning NULL"""
+    engine = create_engine('sqlite://')
+    metadata.create_all(engine)
+    day = date(2024, 5, 2)
+    with engine.begin() as connection:
+        connection.execute(detection_stats.insert().values(
+            date=day, people_count=None, helmet_violations=5, face_cover_violations=None,
+            loitering_events=None, posture_violations=None))
+
+    for _ in range(2):
+        with engine.begin() as connection:
+            upsert_daily_stats(connection, {day: {'people_count': 2, 'loitering_events': 1}})
+
+    row = read_stats(engine, day)
+    assert row['people_count'] == 4
+    assert row['helmet_violations'] == 5
+    assert row['loitering_events'] == 2
+    assert row['face_cover_violations'] == 0
+
+    print("✅ Daily stats upsert (legacy NULL counters)")
+    return True
+
+def test_migrate_table_without_unique_date():
+    """Tables from before the unique date index are merged per day and then indexed"""
+    engine = create_engine('sqlite://')
+    with engine.begin() as connection:
+        # detection_stats as db.create_all() created it before date was unique
+        connection.execute(text(
+            "CREATE TABLE detection_stats (id INTEGER PRIMARY KEY, date DATE, people_count INTEGER, "
+            "helmet_violations INTEGER, face_cover_violations INTEGER, loitering_events INTEGER, "
+            "posture_violations INTEGER)"))
+        for day, people, helmets in ((date(2024, 5, 1), 2, 1), (date(2024, 5, 1), 3, None),
+                                     (date(2024, 5, 1), None, 4), (date(2024, 5, 2), 7, 0)):
+            connection.execute(detection_stats.insert().values(date=day, people_count=people,
+                                                               helmet_violations=helmets))
+
+    try:
+        with engine.begin() as connection:
+            upsert_daily_stats(connection, {date(2024, 5, 1): {'people_count': 1}})
+        assert False, 'upsert needs the unique date index'
+    except OperationalError:
+        pass
+
+    with engine.begin() as connection:
+        assert merge_duplicate_daily_stats(connection) == 2
+        assert merge_duplicate_daily_stats(connection) == 0
+    for index in detection_stats.indexes:
+        index.create(engine, checkfirst=True)
+        index.create(engine, checkfirst=True)
+
+    with engine.begin() as connection:
+        upsert_daily_stats(connection, {date(2024, 5, 1): {'people_count': 1, 'loitering_events': 1}})
+    row = read_stats(engine, date(2024, 5, 1))
+    assert row['id'] == 1
+    assert row['people_count'] == 6 and row['helmet_violations'] == 5 and row['loitering_events'] == 1
+    assert read_stats(engine, date(2024, 5, 2))['people_count'] == 7
+
+    print("✅ Daily stats migration to a unique date")
+    return True
+
+def test_store_event_rows():
+    """Batch events are stored in chunks through a plain engine"""
+    uri = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'events.db')
+    engine = create_engine(uri)
+    metadata.create_all(engine)
+
+    rows = [{'event_type': 'helmet', 'description': 'Helmet detected', 'confidence': 0.9,
+             'timestamp': datetime(2024, 5, 1, 8, 0, i % 60)} for i in range(2500)]
+    assert store_event_rows(uri, rows, batch_size=1000) == 2500
+
+    with engine.connect() as connection:
+        assert connection.execute(select(func.count()).select_from(event_log)).scalar() == 2500
+    engine.dispose()
+
+    print("✅ Batch event storage")
+    return True
+
+if __name__ == "__main__":
+    test_upsert_new_day()
+    test_upsert_legacy_null_counters()
+    test_migrate_table_without_unique_date()
+    test_store_event_rows()
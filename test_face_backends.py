@@ -0,0 +1,141 @@
+"""
+ATM Surveillance System - Face Backend Benchmark
+Compares the Haar cascade and MediaPipe face backends of the face-cover path
+on latency and accuracy
+"""
+
+import cv2
+import numpy as np
+import time
+import sys
+import os
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from backend.models_enhanced_people import EnhancedPeopleDetectionPipeline
+
+BACKENDS = ('haar', 'mediapipe')
+
+def create_face_frame(width=640, height=480, covered=False):
+    """Create a synthetic frame with a face, optionally wearing a mask"""
+    frame = np.ones((height, width, 3), dtype=np.uint8) * 200
+
+    cv2.rectangle(frame, (250, 200), (390, 450), (100, 100, 100), -1)  # Body
+    cv2.ellipse(frame, (320, 140), (55, 70), 0, 0, 360, (150, 170, 210), -1)  # Head
+    cv2.circle(frame, (298, 125), 8, (40, 40, 40), -1)  # Eyes
+    cv2.circle(frame, (342, 125), 8, (40, 40, 40), -1)
+    cv2.line(frame, (305, 175), (335, 175), (60, 60, 140), 3)  # Mouth
+
+    if covered:
+        cv2.rectangle(frame, (268, 150), (372, 200), (200, 100, 50), -1)  # Blue mask
+
+    return frame
+
+def load_labeled_images(directory):
+    """Images under covered/ and uncovered/ subfolders as (frame, is_covered) pairs"""
+    samples = []
+    for label in ('covered', 'uncovered'):
+        folder = os.path.join(directory, label)
+        if not os.path.isdir(folder):
+            continue
+        for name in sorted(os.listdir(folder)):
+            frame = cv2.imread(os.path.join(folder, name))
+            if frame is not None:
+                samples.append((frame, label == 'covered'))
+    return samples
+
+def reset_face_state(pipeline):
+    """Forget previous faces and temporal history so each image is judged alone"""
+    pipeline.previous_faces = []
+    pipeline.face_cover_history.clear()
+
+def benchmark_latency(pipeline, frame, iterations=20):
+    """Face search and full face-cover latency in ms"""
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    search_times = []
+    cover_times = []
+
+    for _ in range(iterations):
+        reset_face_state(pipeline)
+        start = time.time()
+        pipeline._find_faces(frame, gray)
+        search_times.append((time.time() - start) * 1000)
+
+        reset_face_state(pipeline)
+        start = time.time()
+        pipeline.detect_face_cover(frame)
+        cover_times.append((time.time() - start) * 1000)
+
+    return {
+        'search_avg': np.mean(search_times),
+        'cover_avg': np.mean(cover_times),
+        'cover_max': np.max(cover_times)
+    }
+
+def evaluate_accuracy(pipeline, samples):
+    """Face-found rate and face-cover accuracy over labeled samples"""
+    faces_found = 0
+    correct = 0
+
+    for frame, is_covered in samples:
+        reset_face_state(pipeline)
+        faces, _ = pipeline._find_faces(frame, cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY))
+        faces_found += len(faces) > 0
+
+        reset_face_state(pipeline)
+        detected, _ = pipeline.detect_face_cover(frame)
+        correct += detected == is_covered
+
+    total = max(len(samples), 1)
+    return {
+        'face_rate': faces_found / total * 100,
+        'accuracy': correct / total * 100
+    }
+
+def print_header(text):
+    """Print a formatted header"""
+    print("\n" + "="*70)
+    print(f"  {text}")
+    print("="*70)
+
+def main():
+    print_header("FACE BACKEND BENCHMARK")
+
+    if len(sys.argv) > 1:
+        samples = load_labeled_images(sys.argv[1])
+        print(f"\n  Loaded {len(samples)} labeled images from {sys.argv[1]}")
+    else:
+        samples = [(create_face_frame(covered=covered), covered)
+                   for covered in (False, True) for _ in range(5)]
+        print("\n  Using synthetic frames (pass a labeled directory for real accuracy)")
+
+    if not samples:
+        print("  ❌ No images found")
+        return False
+
+    results = {}
+    for name in BACKENDS:
+        pipeline = EnhancedPeopleDetectionPipeline(face_backend=name)
+        if pipeline.face_backend.name != name:
+            print(f"  ⚠️  {name} backend unavailable, skipping")
+            continue
+
+        latency = benchmark_latency(pipeline, samples[0][0])
+        accuracy = evaluate_accuracy(pipeline, samples)
+        results[name] = dict(latency, **accuracy)
+
+    print_header("RESULTS")
+    print(f"  {'Backend':12} | {'Face search':>12} | {'Face cover':>12} | {'Faces found':>11} | {'Accuracy':>8}")
+    for name, result in results.items():
+        print(f"  {name:12} | {result['search_avg']:>10.2f}ms | {result['cover_avg']:>10.2f}ms | "
+              f"{result['face_rate']:>10.1f}% | {result['accuracy']:>7.1f}%")
+
+    if len(results) == 2:
+        speedup = results['haar']['cover_avg'] / max(results['mediapipe']['cover_avg'], 1e-6)
+        print(f"\n  MediaPipe face-cover speedup: {speedup:.1f}x")
+
+    return True
+
+if __name__ == "__main__":
+    main()
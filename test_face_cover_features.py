@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Test script for the single-pass FaceRegionFeatures extractor
+Checks that the shared features reproduce the per-analyzer face-cover numbers
+"""
+
+import cv2
+import numpy as np
+import sys
+import os
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from backend.face_cover_features import FaceRegionFeatures, FaceFeatureBatch
+from backend.models_enhanced_people import EnhancedPeopleDetectionPipeline
+
+def legacy_scores(face_region, mask_ranges):
+    """Per-analyzer computation as it was before the shared extractor"""
+    # Color analysis
+    hsv = cv2.cvtColor(face_region, cv2.COLOR_BGR2HSV)
+    combined_mask = np.zeros(face_region.shape[:2], dtype=np.uint8)
+    for ranges in mask_ranges.values():
+        for lower, upper in ranges:
+            combined_mask = cv2.bitwise_or(combined_mask, cv2.inRange(hsv, lower, upper))
+    lower_portion = face_region[int(face_region.shape[0]*0.4):, :]
+    lower_hsv = cv2.cvtColor(lower_portion, cv2.COLOR_BGR2HSV)
+    lower_mask = np.zeros(lower_hsv.shape[:2], dtype=np.uint8)
+    for ranges in mask_ranges.values():
+        for lower, upper in ranges:
+            lower_mask = cv2.bitwise_or(lower_mask, cv2.inRange(lower_hsv, lower, upper))
+    total_coverage = cv2.countNonZero(combined_mask) / (face_region.shape[0] * face_region.shape[1])
+    lower_coverage = cv2.countNonZero(lower_mask) / (lower_hsv.shape[0] * lower_hsv.shape[1])
+
+    # Texture and edges
+    gray = cv2.cvtColor(face_region, cv2.COLOR_BGR2GRAY)
+    kernel = np.array([[-1, -1, -1], [-1, 8, -1], [-1, -1, -1]])
+    texture_var = np.var(cv2.filter2D(gray, -1, kernel))
+    edges = cv2.bitwise_or(cv2.Canny(gray, 30, 100), cv2.Canny(gray, 50, 150))
+    edge_density = cv2.countNonZero(edges) / (face_region.shape[0] * face_region.shape[1])
+
+    # Lower face
+    lower_face = face_region[face_region.shape[0]//2:, :]
+    lower_face_hsv = cv2.cvtColor(lower_face, cv2.COLOR_BGR2HSV)
+    mask_pixels = 0
+    for ranges in mask_ranges.values():
+        for lower, upper in ranges:
+            mask_pixels += cv2.countNonZero(cv2.inRange(lower_face_hsv, lower, upper))
+    coverage_ratio = mask_pixels / (lower_face.shape[0] * lower_face.shape[1])
+    uniformity = 1.0 - (np.mean(np.std(lower_face_hsv.reshape(-1, 3), axis=0)) / 255.0)
+
+    return [total_coverage, lower_coverage, coverage_ratio, uniformity, texture_var, edge_density]
+
+def test_face_region_features():
+    """Shared features must match the legacy per-analyzer numbers exactly"""
+    pipeline = EnhancedPeopleDetectionPipeline()
+    mask_ranges = pipeline.color_ranges['mask']
+    rng = np.random.RandomState(7)
+
+    faces = [
+        rng.randint(0, 255, (80, 64, 3), dtype=np.uint8),
+        np.full((57, 61, 3), (200, 100, 50), dtype=np.uint8),
+        np.full((3, 3, 3), 255, dtype=np.uint8),
+    ]
+
+    # Face with a blue surgical mask over the lower half
+    masked = rng.randint(120, 200, (96, 96, 3), dtype=np.uint8)
+    cv2.rectangle(masked, (10, 50), (86, 90), (200, 100, 50), -1)
+    faces.append(masked)
+
+    for face in faces:
+        features = FaceRegionFeatures(face, mask_ranges)
+        expected = legacy_scores(face, mask_ranges)
+        assert np.allclose(features.vector, expected, rtol=0, atol=1e-12), (features.vector, expected)
+
+    print("✅ FaceRegionFeatures matches the legacy face-cover numbers")
+    return True
+
+def sample_faces(rng):
+    """Face crops at the sizes the detector really produces, none of them square"""
+    faces = [rng.randint(0, 255, (220, 180, 3), dtype=np.uint8),
+             rng.randint(0, 255, (97, 83, 3), dtype=np.uint8),
+             cv2.GaussianBlur(rng.randint(0, 255, (150, 120, 3), dtype=np.uint8), (9, 9), 0),
+             np.full((41, 37, 3), (120, 140, 160), dtype=np.uint8)]
+
+    # Faces with a blue surgical mask over the lower half
+    for h, w in ((220, 180), (130, 110)):
+        masked = cv2.GaussianBlur(rng.randint(60, 220, (h, w, 3), dtype=np.uint8), (5, 5), 0)
+        cv2.rectangle(masked, (w // 8, h // 2), (w - w // 8, h - h // 10), (200, 100, 50), -1)
+        faces.append(masked)
+    return faces
+
+def test_face_feature_batch():
+    """Batched features must equal single-face features on crops of any size"""
+    pipeline = EnhancedPeopleDetectionPipeline()
+    mask_ranges = pipeline.color_ranges['mask']
+    faces = sample_faces(np.random.RandomState(11))
+
+    batch = FaceFeatureBatch(faces, mask_ranges)
+    assert len(batch) == len(faces)
+
+    for face, features in zip(faces, batch):
+        expected = FaceRegionFeatures(face, mask_ranges).vector
+        assert np.allclose(features.vector, expected, rtol=0, atol=1e-12), (face.shape, features.vector, expected)
+        assert np.array_equal(features.gray, cv2.cvtColor(face, cv2.COLOR_BGR2GRAY))
+
+    # Empty batches are valid and yield nothing
+    assert list(FaceFeatureBatch([], mask_ranges)) == []
+
+    print("✅ FaceFeatureBatch matches per-face features")
+    return True
+
+def test_face_feature_batch_decisions():
+    """The face-cover analyzers score batched and single-face features identically"""
+    pipeline = EnhancedPeopleDetectionPipeline()
+    mask_ranges = pipeline.color_ranges['mask']
+    faces = sample_faces(np.random.RandomState(23))
+
+    def scores(features):
+        return (pipeline._analyze_face_cover_color_advanced(features),
+                pipeline._analyze_face_cover_texture(features),
+                pipeline._analyze_face_cover_edges(features),
+                pipeline._analyze_lower_face_coverage(features),
+                pipeline._analyze_eye_visibility(features))
+
+    for face, features in zip(faces, FaceFeatureBatch(faces, mask_ranges)):
+        assert scores(features) == scores(FaceRegionFeatures(face, mask_ranges)), face.shape
+
+    print("✅ FaceFeatureBatch gives the same face-cover decisions")
+    return True
+
+def test_lazy_eye_matches_eager():
+    """Skipping the eye check never changes the face-cover decision or its confidence"""
+    frame = np.zeros((480, 640, 3), dtype=np.uint8)
+    boxes = [(20 + 100 * i, 40, 80, 80) for i in range(5)]
+    for i, (x, y, w, h) in enumerate(boxes):
+        frame[y:y+h, x:x+w] = i + 1  # Face index in every pixel
+
+    eye_scores = [0.0, 0.2, 0.5, 0.6, 0.9]  # Every value the eye check returns
+    partial_scores = np.linspace(0.55, 0.85, 31)
+
+    def scored_pipeline(scores):
+        """Pipeline whose analyzers return the current (partial, eye) score of each face"""
+        pipeline = EnhancedPeopleDetectionPipeline()
+        pipeline._find_faces = lambda frame, gray: (boxes[:len(scores)], [None] * len(scores))
+        face = lambda features: scores[int(features.face_region[0, 0, 0]) - 1]
+        pipeline._analyze_face_cover_color_advanced = lambda features: face(features)[0] / 0.30
+        pipeline._analyze_face_cover_texture = lambda features: 0.0
+        pipeline._analyze_face_cover_edges = lambda features: 0.0
+        pipeline._analyze_lower_face_coverage = lambda features: 0.0
+        pipeline._analyze_eye_visibility = lambda features: face(features)[1]
+        return pipeline
+
+    scores = []
+    lazy = scored_pipeline(scores)
+    eager = scored_pipeline(scores)
+    eager.face_cover_eye_bounds = (-np.inf, np.inf)  # Always evaluates the eyes
+
+    rng = np.random.RandomState(29)
+    for _ in range(500):
+        scores[:] = zip(rng.choice(partial_scores, rng.randint(1, len(boxes) + 1)),
+                        rng.choice(eye_scores, len(boxes)))
+        lazy.face_cover_history.clear()
+        eager.face_cover_history.clear()
+        assert lazy.detect_face_cover(frame) == eager.detect_face_cover(frame), scores
+
+    assert eager.face_cover_eval_stats['eye_skipped_covered'] == 0
+    assert eager.face_cover_eval_stats['eye_skipped_uncovered'] == 0
+    assert lazy.face_cover_eval_stats['eye_skipped_covered'] > 0
+    assert lazy.face_cover_eval_stats['eye_skipped_uncovered'] > 0
+
+    print("✅ Lazy eye evaluation matches eager decisions")
+    return True
+
+if __name__ == "__main__":
+    test_face_region_features()
+    test_face_feature_batch()
+    test_face_feature_batch_decisions()
+    test_lazy_eye_matches_eager()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Test script for frame-timestamp-driven detector clocks
+Tests timestamp parsing, the monotonic fallback, bounding client timestamps
+and timestamps through the frame queue
+"""
+
+import time
+import sys
+import os
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from backend.frame_clock import FrameClock, monotonic_now, parse_frame_timestamp, ingest_frame_timestamp
+from backend.frame_queue import CameraFrameQueue
+
+def test_parse_frame_timestamp():
+    """Seconds pass through, browser milliseconds are converted, junk is rejected"""
+    assert parse_frame_timestamp('1714550400.5') == 1714550400.5
+    assert parse_frame_timestamp(1714550400500) == 1714550400.5
+    assert parse_frame_timestamp(12.5) == 12.5  # Video PTS
+    assert parse_frame_timestamp(None) is None
+    assert parse_frame_timestamp('nan') is None
+    assert parse_frame_timestamp('-1') is None
+    assert parse_frame_timestamp('soon') is None
+
+    print("✅ Frame timestamp parsing")
+    return True
+
+def test_clock_follows_frames():
+    """Replayed timestamps drive the clock at any speed and never run backwards"""
+    clock = FrameClock()
+    assert [clock.tick(t) for t in (0.0, 0.5, 30.0)] == [0.0, 0.5, 30.0]
+    assert clock.tick(29.0) == 30.0  # Out of order
+
+    fallback = FrameClock()
+    first = fallback.tick()
+    time.sleep(0.01)
+    assert fallback.tick() > first
+    assert abs(monotonic_now() - time.time()) < 5  # Epoch-scaled
+
+    print("✅ Frame clock")
+    return True
+
+def test_client_timestamps_are_bounded():
+    """Client times far from ingest time fall back to it instead of freezing the clock"""
+    now = 1714550400.0
+    assert ingest_frame_timestamp(now - 0.3, max_skew=5.0, now=now) == now - 0.3
+    assert ingest_frame_timestamp((now + 2.0) * 1000, max_skew=5.0, now=now) == now + 2.0
+    assert ingest_frame_timestamp(None, max_skew=5.0, now=now) == now
+    assert ingest_frame_timestamp('soon', max_skew=5.0, now=now) == now
+    assert ingest_frame_timestamp(now + 3600, max_skew=5.0, now=now) == now  # Far future
+    assert ingest_frame_timestamp(now - 3600, max_skew=5.0, now=now) == now  # Far past
+    assert ingest_frame_timestamp(12.5, max_skew=5.0, now=now) == now  # Not a capture time
+
+    # One bad client frame no longer stalls the camera's clock
+    clock = FrameClock()
+    times = [clock.tick(ingest_frame_timestamp(value, max_skew=5.0, now=now + i))
+             for i, value in enumerate([now, now + 1e6, now + 2, now + 3])]
+    assert times == [now, now + 1, now + 2, now + 3]
+
+    assert abs(ingest_frame_timestamp(None) - monotonic_now()) < 1.0
+
+    print("✅ Client timestamps bounded")
+    return True
+
+def test_queue_carries_timestamps():
+    """Each queued frame reaches the pipeline with its own timestamp"""
+    seen = []
+
+    def process(frame, timestamp=None):
+        seen.append((frame, timestamp))
+        return {'frame': frame}
+
+    frame_queue = CameraFrameQueue('test', process, capacity=4)
+    frame_queue.submit('a', timestamp=10.0)
+    frame_queue.wait_for_result(frame_queue.submit('b', timestamp=10.5), timeout=1.0)
+    frame_queue.stop()
+
+    assert seen == [('a', 10.0), ('b', 10.5)]
+
+    print("✅ Timestamps through the frame queue")
+    return True
+
+if __name__ == "__main__":
+    test_parse_frame_timestamp()
+    test_clock_follows_frames()
+    test_client_timestamps_are_bounded()
+    test_queue_carries_timestamps()
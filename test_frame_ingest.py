@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Test script for binary frame decoding
+Tests JPEG header parsing and reduced-resolution decode selection
+"""
+
+import cv2
+import numpy as np
+import sys
+import os
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from backend.frame_ingest import jpeg_dimensions, reduced_decode_factor, decode_frame
+
+def _encode(width, height, ext='.jpg'):
+    frame = np.random.randint(0, 255, (height, width, 3), dtype=np.uint8)
+    ok, encoded = cv2.imencode(ext, frame)
+    assert ok
+    return encoded.tobytes()
+
+def test_jpeg_dimensions():
+    """Header parsing matches the encoded size; non-JPEG data is rejected"""
+    assert jpeg_dimensions(_encode(1920, 1080)) == (1920, 1080)
+    assert jpeg_dimensions(_encode(640, 480)) == (640, 480)
+    assert jpeg_dimensions(_encode(64, 64, '.png')) is None
+    assert jpeg_dimensions(b'') is None
+
+    print("✅ JPEG header dimensions")
+    return True
+
+def test_reduction_factor():
+    """Largest reduction that keeps every side at or above the minimum"""
+    assert reduced_decode_factor((1920, 1080), (640, 480)) == 2
+    assert reduced_decode_factor((3840, 2160), (640, 480)) == 4
+    assert reduced_decode_factor((3840, 2160), (320, 240)) == 8
+    assert reduced_decode_factor((640, 480), (640, 480)) == 1
+    # Portrait frames are compared orientation-agnostically
+    assert reduced_decode_factor((1080, 1920), (640, 480)) == 2
+
+    print("✅ Reduced decode factor")
+    return True
+
+def test_decode_frame():
+    """Large JPEGs decode reduced, small ones and PNGs decode at full size"""
+    frame, factor = decode_frame(_encode(1920, 1080), min_size=(640, 480))
+    assert factor == 2 and frame.shape == (540, 960, 3)
+
+    frame, factor = decode_frame(_encode(640, 480), min_size=(640, 480))
+    assert factor == 1 and frame.shape == (480, 640, 3)
+
+    frame, factor = decode_frame(_encode(1920, 1080, '.png'), min_size=(640, 480))
+    assert factor == 1 and frame.shape == (1080, 1920, 3)
+
+    print("✅ Reduced JPEG decode")
+    return True
+
+if __name__ == "__main__":
+    test_jpeg_dimensions()
+    test_reduction_factor()
+    test_decode_frame()
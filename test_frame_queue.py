@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Test script for the bounded per-camera frame queue
+Tests drop-oldest backpressure, freshest-result reporting and dropping waiting frames on stop
+"""
+
+import threading
+import time
+import sys
+import os
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from backend.frame_queue import CameraFrameQueue
+
+def test_drop_oldest_under_overload():
+    """A slow worker keeps only the newest frames and always finishes the latest one"""
+    processed = []
+    dropped = []
+
+    def slow_process(frame, timestamp=None):
+        time.sleep(0.05)
+        processed.append(frame)
+        return {'frame': frame}
+
+    frame_queue = CameraFrameQueue('test', slow_process, capacity=2)
+    for i in range(10):
+        frame_queue.submit(i, on_drop=lambda i=i: dropped.append(i))
+
+    latest = frame_queue.wait_for_result(9, timeout=2.0)
+    frame_queue.stop()
+
+    assert latest['results'] == {'frame': 9}
+    assert latest['result_sequence'] == 9
+    assert latest['queue']['dropped'] == len(dropped) > 0
+    assert latest['queue']['received'] == 10
+    assert processed[-1] == 9 and len(processed) + len(dropped) == 10
+
+    print("✅ Drop-oldest backpressure")
+    return True
+
+def test_wait_returns_freshest_on_timeout():
+    """A request that cannot wait for its own frame gets the last completed result"""
+    release = threading.Event()
+
+    def blocking_process(frame, timestamp=None):
+        if frame == 'slow':
+            release.wait(2.0)
+        return {'frame': frame}
+
+    frame_queue = CameraFrameQueue('test', blocking_process, capacity=2)
+    first = frame_queue.submit('fast')
+    frame_queue.wait_for_result(first, timeout=1.0)
+
+    slow = frame_queue.submit('slow')
+    latest = frame_queue.wait_for_result(slow, timeout=0.05)
+    assert latest['results'] == {'frame': 'fast'}
+
+    release.set()
+    assert frame_queue.wait_for_result(slow, timeout=1.0)['results'] == {'frame': 'slow'}
+    frame_queue.stop()
+
+    print("✅ Freshest result on timeout")
+    return True
+
+def test_errors_are_counted():
+    """Processing errors are reported to the caller and do not replace the last result"""
+    outcomes = []
+
+    def failing_process(frame, timestamp=None):
+        if frame == 'bad':
+            raise ValueError('bad frame')
+        return {'frame': frame}
+
+    frame_queue = CameraFrameQueue('test', failing_process, capacity=2)
+    frame_queue.wait_for_result(frame_queue.submit('good'), timeout=1.0)
+    latest = frame_queue.wait_for_result(frame_queue.submit('bad', on_result=outcomes.append), timeout=1.0)
+    frame_queue.stop()
+
+    assert latest['results'] == {'frame': 'good'}
+    assert latest['queue']['errors'] == 1
+    assert outcomes == [None]
+
+    print("✅ Frame errors counted")
+    return True
+
+def test_stop_drops_waiting_frames():
+    """Frames still queued at stop are dropped and their callers notified"""
+    started = threading.Event()
+    release = threading.Event()
+    results = []
+    dropped = []
+
+    def blocking_process(frame, timestamp=None):
+        started.set()
+        release.wait(2.0)
+        return {'frame': frame}
+
+    frame_queue = CameraFrameQueue('test', blocking_process, capacity=2)
+    frame_queue.submit('busy', on_result=results.append, on_drop=lambda: dropped.append('busy'))
+    assert started.wait(1.0)
+    waiting = [frame_queue.submit(name, on_drop=lambda name=name: dropped.append(name))
+               for name in ('first', 'second')]
+
+    stopper = threading.Thread(target=frame_queue.stop)
+    stopper.start()
+    deadline = time.monotonic() + 1.0
+    while len(dropped) < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    # Waiting frames are dropped before the in-flight one finishes
+    assert dropped == ['first', 'second']
+    assert not any(frame_queue._pending(sequence) for sequence in waiting)
+    release.set()
+    stopper.join(2.0)
+
+    stats = frame_queue.get_stats()
+    assert results == [{'frame': 'busy'}]
+    assert stats['dropped'] == 2 and stats['depth'] == 0
+
+    # Frames submitted after stop are dropped straight away
+    frame_queue.submit('late', on_drop=lambda: dropped.append('late'))
+    assert dropped[-1] == 'late'
+
+    print("✅ Waiting frames dropped on stop")
+    return True
+
+if __name__ == "__main__":
+    test_drop_oldest_under_overload()
+    test_wait_returns_freshest_on_timeout()
+    test_errors_are_counted()
+    test_stop_drops_waiting_frames()
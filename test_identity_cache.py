@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Test script for per-identity result caching
+Tests TTL expiry, invalidation on appearance changes, hit/miss counters and
+that people detection runs once per frame whatever the cache does
+"""
+
+import numpy as np
+import sys
+import os
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from backend.identity_cache import IdentityResultCache
+from backend.models_enhanced_people import EnhancedPeopleDetectionPipeline
+
+BOX = (80, 60, 40, 80)
+
+def noise_frame(seed=3):
+    return np.random.RandomState(seed).randint(0, 255, (240, 320, 3), dtype=np.uint8)
+
+def test_ttl_expiry():
+    """A cached decision is reused until its confidence-dependent TTL runs out"""
+    cache = IdentityResultCache()
+    frame = noise_frame()
+    ttl = cache.ttl(0.9)
+    assert 2.0 < ttl < 10.0
+    assert cache.ttl(0.5) == 0.0  # Below min_confidence nothing is cached
+
+    slots = cache.observe(frame, [BOX], 0.0)
+    assert cache.lookup('helmet', slots, 0.0) is None
+    cache.store('helmet', slots, (True, 0.9), 0.9, frame, [BOX], 0.0)
+
+    t = 1.0
+    while t < ttl:
+        slots = cache.observe(frame, [BOX], t)
+        assert cache.lookup('helmet', slots, t) == (True, 0.9), t
+        t += 1.0
+    slots = cache.observe(frame, [BOX], ttl)
+    assert cache.lookup('helmet', slots, ttl) is None
+
+    print("✅ Cache TTL expiry")
+    return True
+
+def test_invalidated_on_appearance_change():
+    """A color change or a growing box forces reclassification"""
+    frame = noise_frame()
+
+    cache = IdentityResultCache()
+    slots = cache.observe(frame, [BOX], 0.0)
+    cache.store('posture', slots, (False, 0.0), 1.0, frame, [BOX], 0.0)
+    changed = frame.copy()
+    changed[:, :] = (0, 0, 255)
+    slots = cache.observe(changed, [BOX], 0.5)
+    assert cache.lookup('posture', slots, 0.5) is None
+
+    cache = IdentityResultCache()
+    slots = cache.observe(frame, [BOX], 0.0)
+    cache.store('posture', slots, (False, 0.0), 1.0, frame, [BOX], 0.0)
+    grown = (70, 45, 60, 110)  # Same center, twice the area
+    slots = cache.observe(frame, [grown], 0.5)
+    assert cache.lookup('posture', slots, 0.5) is None
+
+    print("✅ Cache invalidation on appearance change")
+    return True
+
+def test_hit_miss_counters():
+    """Hits and misses are counted per detector"""
+    cache = IdentityResultCache()
+    frame = noise_frame()
+
+    slots = cache.observe(frame, [BOX], 0.0)
+    cache.lookup('face_cover', slots, 0.0)
+    cache.store('face_cover', slots, (False, 0.0), 1.0, frame, [BOX], 0.0)
+    for t in (0.5, 1.0, 1.5):
+        cache.lookup('face_cover', cache.observe(frame, [BOX], t), t)
+    cache.lookup('helmet', [], 2.0)  # No identities is always a miss
+
+    stats = cache.get_stats()
+    assert stats['face_cover'] == {'hits': 3, 'misses': 1, 'hit_rate': 0.75}
+    assert stats['helmet']['misses'] == 1 and stats['helmet']['hits'] == 0
+    assert stats['identities'] == 1
+
+    print("✅ Cache hit/miss counters")
+    return True
+
+def test_people_detection_once_per_frame():
+    """Background model and people history advance once per frame, hit or miss"""
+    pipeline = EnhancedPeopleDetectionPipeline()
+    detect_people = pipeline.detect_people
+    calls = []
+
+    def counting_detect_people(frame):
+        calls.append(1)
+        return detect_people(frame)
+
+    pipeline.detect_people = counting_detect_people
+    for i in range(5):
+        pipeline.process_frame(noise_frame(i), timestamp=float(i))
+
+    assert len(calls) == 5
+
+    print("✅ People detection runs once per frame")
+    return True
+
+if __name__ == "__main__":
+    test_ttl_expiry()
+    test_invalidated_on_appearance_change()
+    test_hit_miss_counters()
+    test_people_detection_once_per_frame()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Test script for scene-change keyframe sampling
+Tests that static scenes are skipped down to the sampling floor, changes are kept
+and that frame-count histories span the same video time as fixed-rate sampling
+"""
+
+import cv2
+import numpy as np
+import sys
+import os
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from backend.keyframes import SceneChangeSampler
+from backend.models_enhanced_people import EnhancedPeopleDetectionPipeline
+
+def create_booth_frame(person_x=None, noise=0, seed=0):
+    """Empty booth, optionally with a person at person_x"""
+    frame = np.ones((480, 640, 3), dtype=np.uint8) * 200
+    if noise:
+        rng = np.random.default_rng(seed)
+        frame = np.clip(frame + rng.integers(-noise, noise + 1, frame.shape), 0, 255).astype(np.uint8)
+    if person_x is not None:
+        cv2.rectangle(frame, (person_x, 200), (person_x + 120, 450), (80, 80, 80), -1)
+        cv2.circle(frame, (person_x + 60, 150), 45, (150, 170, 210), -1)
+    return frame
+
+def test_static_scene_uses_floor():
+    """A static booth at 2fps for 20s only gets the floor keyframes"""
+    sampler = SceneChangeSampler(max_interval=2.0)
+    keyframes = [t / 2 for t in range(40)
+                 if sampler.is_keyframe(create_booth_frame(noise=3, seed=t), t / 2)]
+
+    assert keyframes == [float(t) for t in range(0, 20, 2)]
+    assert sampler.stats['scene_changes'] == 1  # Only the first frame
+
+    print("✅ Static scene sampled at the floor")
+    return True
+
+def test_scene_changes_are_keyframes():
+    """A person entering and moving triggers keyframes between floor samples"""
+    sampler = SceneChangeSampler(max_interval=10.0)
+    sampler.is_keyframe(create_booth_frame(), 0.0)
+
+    assert sampler.is_keyframe(create_booth_frame(person_x=100), 0.5)
+    assert not sampler.is_keyframe(create_booth_frame(person_x=100), 1.0)  # Standing still
+    assert sampler.is_keyframe(create_booth_frame(person_x=300), 1.5)
+
+    print("✅ Scene changes kept")
+    return True
+
+def create_walk_up_frame(t):
+    """Booth at time t: a customer walks up to the ATM after 3s and then stands still"""
+    frame = np.ones((480, 640, 3), dtype=np.uint8) * 200
+    if t >= 3.0:
+        x = 100 + min(int((t - 3.0) * 80), 240)
+        cv2.rectangle(frame, (x, 110), (x + 140, 470), (60, 60, 60), -1)
+        cv2.circle(frame, (x + 70, 70), 40, (150, 170, 210), -1)
+    return frame
+
+def history_lengths(pipeline):
+    detector = pipeline.enhanced_people_detector
+    return (len(detector.people_history), len(detector.detection_history), len(pipeline.helmet_history),
+            len(pipeline.face_cover_history), len(pipeline.posture_history))
+
+def test_held_frames_match_fixed_rate():
+    """With skipped frames held, histories advance as if every candidate were analyzed"""
+    fixed = EnhancedPeopleDetectionPipeline()
+    sampled = EnhancedPeopleDetectionPipeline()
+    sampler = SceneChangeSampler(max_interval=2.0)
+
+    for i in range(24):  # 12s at 2fps, before any history is full
+        t = i * 0.5
+        frame = create_walk_up_frame(t)
+        fixed_result = fixed.process_frame(frame, t)
+        if sampler.is_keyframe(frame, t):
+            assert sampled.process_frame(frame, t)['people_count'] == fixed_result['people_count'], t
+        else:
+            sampled.hold_frame(t)
+        assert history_lengths(sampled) == history_lengths(fixed), t
+
+    # Most of the standing-still frames were held, not analyzed
+    assert sampler.stats['keyframes'] < 16
+    assert sampled.clock.last == fixed.clock.last == 11.5
+    assert list(sampled.enhanced_people_detector.people_history) == list(fixed.enhanced_people_detector.people_history)
+    assert len(fixed.posture_history) > 0
+
+    print(f"✅ Held frames match fixed-rate sampling ({sampler.stats['keyframes']}/24 analyzed)")
+    return True
+
+if __name__ == "__main__":
+    test_static_scene_uses_floor()
+    test_scene_changes_are_keyframes()
+    test_held_frames_match_fixed_rate()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Test script for the array-backed loitering TrackStore
+Tests association, ring-buffer histories and O(expired) cleanup
+"""
+
+import numpy as np
+import sys
+import os
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from backend.loitering_tracks import TrackStore
+
+def test_association_and_history():
+    """Nearby points keep their track, far points start new ones"""
+    store = TrackStore(capacity=2, history_size=5)
+
+    first = store.update([(100, 100), (300, 300)], timestamp=0.0)
+    assert len(store) == 2
+
+    # Same people, slightly moved and listed in the opposite order
+    second = store.update([(305, 298), (102, 101)], timestamp=1.0)
+    assert second[0] == first[1] and second[1] == first[0]
+
+    # A third person arrives; the store grows beyond its initial capacity
+    third = store.update([(600, 100)], timestamp=2.0)
+    assert third[0] not in first and len(store) == 3
+
+    # Ring buffer keeps only the last history_size samples in order
+    for t in range(3, 10):
+        store.update([(100 + t, 100)], timestamp=float(t))
+    history = store.recent_positions(first[0])
+    assert len(history) == 5
+    assert history[-1][0] == 109 and history[0][0] == 105
+
+    print("✅ TrackStore association and histories")
+    return True
+
+def test_time_gap_and_expiry():
+    """Stale tracks are not matched and are expired oldest-first"""
+    store = TrackStore(max_time_gap=5)
+    old = store.update([(50, 50)], timestamp=0.0)
+
+    # Same place but after the allowed time gap - new track
+    new = store.update([(52, 50)], timestamp=10.0)
+    assert new[0] != old[0]
+
+    removed = store.expire(current_time=65.0, max_age=60)
+    assert removed == 1 and len(store) == 1
+
+    removed = store.expire(current_time=500.0, max_age=60)
+    assert removed == 1 and len(store) == 0
+
+    print("✅ TrackStore time gaps and expiry")
+    return True
+
+def test_movement_variance():
+    """Variance is only reported once a full window of samples exists"""
+    store = TrackStore()
+    slot = None
+    for t in range(15):
+        slot = store.update([(200 + (t % 2), 200)], timestamp=float(t))
+
+    variance = store.movement_variance(slot, window=15)
+    assert variance[0] < 1.0
+
+    short = store.update([(700, 700)], timestamp=15.0)
+    assert np.isnan(store.movement_variance(short, window=15)[0])
+
+    print("✅ TrackStore movement variance")
+    return True
+
+if __name__ == "__main__":
+    test_association_and_history()
+    test_time_gap_and_expiry()
+    test_movement_variance()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Test script for per-camera pipelines
+Tests per-camera isolation, idle eviction and LRU capacity eviction
+"""
+
+import time
+import sys
+import os
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from backend.pipeline_registry import PipelineRegistry, normalize_camera_id
+
+def create_counter_pipeline(camera_id):
+    """Stand-in pipeline that counts the frames it has seen"""
+    return {'camera_id': camera_id, 'frames': 0}
+
+def process_counter_frame(camera_id, pipeline, frame, timestamp=None):
+    pipeline['frames'] += 1
+    return {'camera_id': camera_id, 'frames': pipeline['frames']}
+
+def test_cameras_are_isolated():
+    """Each camera keeps its own pipeline state"""
+    registry = PipelineRegistry(create_counter_pipeline, process_counter_frame)
+    lobby = registry.get('lobby')
+    booth = registry.get('booth')
+
+    for _ in range(3):
+        lobby.frame_queue.wait_for_result(lobby.frame_queue.submit('frame'), timeout=1.0)
+    latest = booth.frame_queue.wait_for_result(booth.frame_queue.submit('frame'), timeout=1.0)
+
+    assert registry.get('lobby') is lobby
+    assert lobby.pipeline['frames'] == 3
+    assert latest['results'] == {'camera_id': 'booth', 'frames': 1}
+    registry.shutdown()
+
+    print("✅ Per-camera isolation")
+    return True
+
+def test_idle_cameras_are_evicted():
+    """Idle cameras are evicted with a snapshot callback and rebuilt on the next frame"""
+    evicted = []
+    registry = PipelineRegistry(create_counter_pipeline, process_counter_frame, idle_timeout=60,
+                                on_evict=lambda camera_id, pipeline: evicted.append(camera_id))
+    old = registry.get('lobby')
+    registry.get('booth')
+
+    assert registry.evict_idle(now=time.time() + 30) == []
+    assert registry.evict_idle(now=time.time() + 120) == ['lobby', 'booth']
+    assert evicted == ['lobby', 'booth']
+    assert registry.peek('lobby') is None
+    assert not old.frame_queue.running
+
+    assert registry.get('lobby') is not old
+    assert registry.get_stats()['evicted_idle'] == 2
+    registry.shutdown()
+
+    print("✅ Idle eviction")
+    return True
+
+def test_least_recently_used_evicted_at_capacity():
+    """Beyond max_cameras the least recently used camera goes first"""
+    registry = PipelineRegistry(create_counter_pipeline, process_counter_frame, max_cameras=2)
+    registry.get('a')
+    registry.get('b')
+    registry.get('a')
+    registry.get('c')
+
+    assert [camera['camera_id'] for camera in registry.list_cameras()] == ['a', 'c']
+    assert registry.get_stats()['evicted_capacity'] == 1
+    registry.shutdown()
+
+    print("✅ LRU capacity eviction")
+    return True
+
+def test_camera_id_validation():
+    """Camera ids end up in file paths, so only simple names are accepted"""
+    assert normalize_camera_id(None) == 'default'
+    assert normalize_camera_id('ATM_CAMERA_001') == 'ATM_CAMERA_001'
+    assert normalize_camera_id('../etc') is None
+    assert normalize_camera_id('x' * 65) is None
+
+    print("✅ Camera id validation")
+    return True
+
+if __name__ == "__main__":
+    test_cameras_are_isolated()
+    test_idle_cameras_are_evicted()
+    test_least_recently_used_evicted_at_capacity()
+    test_camera_id_validation()
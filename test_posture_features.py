@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Test script for silhouette posture detection
+Tests the moment-based descriptors on standing and crouching fixture silhouettes,
+the posture classification over the smoothing window and the fallback from the
+pose backend to silhouettes
+"""
+
+import numpy as np
+import cv2
+import sys
+import os
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from backend.posture_features import silhouette_descriptors, posture_score
+from backend.pose_backend import MediaPipePoseBackend
+from backend.models_enhanced_people import EnhancedPeopleDetectionPipeline
+
+# Person boxes in detector (320x240) coordinates
+STANDING_BOX = (78, 34, 44, 194)
+CROUCHING_BOX = (135, 150, 120, 80)
+
+def draw_standing(mask):
+    cv2.circle(mask, (100, 48), 12, 255, -1)                # Head
+    cv2.rectangle(mask, (86, 62), (114, 150), 255, -1)      # Torso
+    cv2.rectangle(mask, (88, 150), (98, 225), 255, -1)      # Legs
+    cv2.rectangle(mask, (102, 150), (112, 225), 255, -1)
+    return mask
+
+def draw_crouching(mask):
+    # Squatting low at the fascia with the torso folded forward over the thighs
+    cv2.ellipse(mask, (185, 180), (45, 14), -15, 0, 360, 255, -1)  # Torso
+    cv2.circle(mask, (235, 172), 12, 255, -1)                       # Head at hip height
+    cv2.rectangle(mask, (150, 192), (215, 204), 255, -1)            # Thighs
+    cv2.rectangle(mask, (150, 192), (162, 225), 255, -1)            # Shins
+    return mask
+
+def silhouette(*draw):
+    mask = np.zeros((240, 320), dtype=np.uint8)
+    for fn in draw:
+        fn(mask)
+    return mask
+
+class FixedPoseBackend(MediaPipePoseBackend):
+    """Pose backend returning preset scores (None = no pose found for that person)"""
+
+    def __init__(self, scores):
+        super().__init__()
+        self.scores = scores
+
+    def score_people(self, frame, boxes, timestamp=None):
+        return list(self.scores)
+
+def posture_pipeline(mask, boxes, pose_backend=None):
+    """Pipeline whose people detector last saw the given silhouettes"""
+    pipeline = EnhancedPeopleDetectionPipeline()
+    detector = pipeline.enhanced_people_detector
+    detector.last_fg_mask = mask
+    detector.person_boxes = list(boxes)
+    detector.person_boxes_shape = mask.shape[:2]
+    if pose_backend is not None:
+        pipeline.pose_backend = pose_backend
+    return pipeline
+
+def run_window(pipeline, frames=15):
+    """Feed one smoothing window of frames; returns every result"""
+    frame = np.zeros((480, 640, 3), dtype=np.uint8)
+    return [pipeline.detect_posture(frame, timestamp=i * 0.2, people_count=1) for i in range(frames)]
+
+def test_standing_descriptors():
+    """An upright silhouette is vertical, tall, solid and balanced"""
+    (descriptor,) = silhouette_descriptors(silhouette(draw_standing), [STANDING_BOX])
+    assert descriptor['box'] == STANDING_BOX
+    assert descriptor['tilt'] < 0.1
+    assert descriptor['aspect_ratio'] > 2.0
+    assert descriptor['solidity'] > 0.9
+    assert 0.8 < descriptor['mass_ratio'] < 1.25
+    assert posture_score(descriptor) > 0.9
+
+    print("✅ Standing silhouette descriptors")
+    return True
+
+def test_crouching_descriptors():
+    """A crouching silhouette is tilted, wider than tall and top-heavy"""
+    (descriptor,) = silhouette_descriptors(silhouette(draw_crouching), [CROUCHING_BOX])
+    assert descriptor['tilt'] > 1.0
+    assert descriptor['aspect_ratio'] < 1.0
+    assert descriptor['mass_ratio'] > 1.5
+    assert posture_score(descriptor) < 0.45
+
+    print("✅ Crouching silhouette descriptors")
+    return True
+
+def test_descriptor_skips():
+    """No mask, tiny boxes, sparse boxes and shadow-only silhouettes give no descriptor"""
+    mask = silhouette(draw_standing)
+    assert silhouette_descriptors(None, [STANDING_BOX]) == []
+    assert silhouette_descriptors(mask, [(100, 100, 3, 40)]) == []
+    assert silhouette_descriptors(mask, [(0, 0, 80, 240)]) == []  # Mostly empty
+    assert silhouette_descriptors(mask // 2, [STANDING_BOX]) == []  # Shadows (127) only
+
+    # Boxes reaching past the frame are clipped
+    (clipped,) = silhouette_descriptors(mask, [(70, 20, 60, 300)])
+    assert clipped['box'] == (70, 20, 60, 220)
+
+    both = silhouette(draw_standing, draw_crouching)
+    assert len(silhouette_descriptors(both, [STANDING_BOX, CROUCHING_BOX])) == 2
+
+    print("✅ Silhouette descriptor skips")
+    return True
+
+def test_detect_posture_classification():
+    """Crouching is reported once the smoothing window fills; standing never is"""
+    standing = run_window(posture_pipeline(silhouette(draw_standing), [STANDING_BOX]))
+    assert all(result == (False, 0.0) for result in standing)
+
+    crouching = run_window(posture_pipeline(silhouette(draw_crouching), [CROUCHING_BOX]))
+    assert all(result == (False, 0.0) for result in crouching[:14])
+    violation, confidence = crouching[-1]
+    assert violation and confidence > 0.55
+
+    # No people, no posture check
+    pipeline = posture_pipeline(silhouette(draw_crouching), [CROUCHING_BOX])
+    frame = np.zeros((480, 640, 3), dtype=np.uint8)
+    assert pipeline.detect_posture(frame, people_count=0) == (False, 0.0)
+    assert len(pipeline.posture_history) == 0
+
+    print("✅ Posture classification")
+    return True
+
+def test_pose_backend_fallback():
+    """People without a pose estimate fall back to their silhouette"""
+    mask = silhouette(draw_standing, draw_crouching)
+    boxes = [STANDING_BOX, CROUCHING_BOX]
+    standing_score, crouching_score = [posture_score(d) for d in silhouette_descriptors(mask, boxes)]
+
+    # Requesting MediaPipe without it installed keeps the silhouette backend
+    if MediaPipePoseBackend().available:
+        print("ℹ️  MediaPipe installed, skipping unavailable-backend check")
+    else:
+        pipeline = EnhancedPeopleDetectionPipeline(posture_backend='mediapipe')
+        assert pipeline.pose_backend is None
+
+        # An unavailable backend finds no poses, so every person uses the silhouette
+        pipeline = posture_pipeline(mask, boxes, MediaPipePoseBackend())
+        run_window(pipeline, frames=1)
+        assert abs(pipeline.posture_history[-1] - (standing_score + crouching_score) / 2) < 1e-9
+
+    # Pose found for the first person only: the second keeps its silhouette score
+    pipeline = posture_pipeline(mask, boxes, FixedPoseBackend([0.2, None]))
+    run_window(pipeline, frames=1)
+    assert abs(pipeline.posture_history[-1] - (0.2 + crouching_score) / 2) < 1e-9
+
+    # Poses for everyone replace the silhouettes entirely
+    pipeline = posture_pipeline(mask, boxes, FixedPoseBackend([0.2, 0.3]))
+    results = run_window(pipeline)
+    assert abs(pipeline.posture_history[-1] - 0.25) < 1e-9
+    assert results[-1][0] and abs(results[-1][1] - 0.75) < 1e-9
+
+    print("✅ Pose backend fallback to silhouettes")
+    return True
+
+if __name__ == "__main__":
+    test_standing_descriptors()
+    test_crouching_descriptors()
+    test_descriptor_skips()
+    test_detect_posture_classification()
+    test_pose_backend_fallback()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Test script for the empty-booth reference background
+Tests frame-count validation, the capture/apply round trip through the store
+and seeding the background models from the stored clip
+"""
+
+import numpy as np
+import cv2
+import sys
+import os
+import tempfile
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from backend.reference_background import ReferenceBackgroundStore
+from backend.models_enhanced_people import EnhancedPeopleDetectionPipeline
+
+def booth_frames(count, seed=5):
+    """Empty booth: a fixed scene with a little sensor noise per frame"""
+    rng = np.random.RandomState(seed)
+    scene = np.zeros((480, 640, 3), dtype=np.uint8)
+    scene[:, :] = (90, 110, 120)
+    cv2.rectangle(scene, (400, 100), (560, 420), (40, 40, 40), -1)  # The ATM
+    noise = rng.randint(-3, 4, (count, 480, 640, 3))
+    return [np.clip(scene.astype(int) + n, 0, 255).astype(np.uint8) for n in noise]
+
+def test_frame_count_validation():
+    """The requested clip length is an integer clamped to 1..max_frames"""
+    store = ReferenceBackgroundStore(tempfile.mkdtemp(), max_frames=10)
+    assert store.frame_count() == 10
+    assert store.frame_count(4) == 4
+    assert store.frame_count('6') == 6
+    assert store.frame_count(7.0) == 7
+    assert store.frame_count(500) == 10
+    assert store.frame_count(0) == 1
+    assert store.frame_count(-3) == 1
+
+    for bad in ('many', 2.5, True, [3], {'n': 3}):
+        try:
+            store.frame_count(bad)
+            assert False, bad
+        except ValueError:
+            pass
+
+    print("✅ Reference frame-count validation")
+    return True
+
+def test_capture_apply_round_trip():
+    """Captured frames come back unchanged (PNG) and in capture order"""
+    store = ReferenceBackgroundStore(tempfile.mkdtemp(), max_frames=10)
+    pipeline = EnhancedPeopleDetectionPipeline()
+    for i, frame in enumerate(booth_frames(12)):
+        pipeline.process_frame(frame, timestamp=float(i))
+
+    # What the capture endpoint stores: the most recent frame_count frames
+    frames = list(pipeline.recent_frames)[-store.frame_count(6):]
+    assert len(frames) == 6
+    assert not store.exists('cam-1')
+    assert store.save('cam-1', frames) == 6
+    assert store.exists('cam-1')
+
+    loaded = store.load('cam-1')
+    assert len(loaded) == 6
+    for stored, original in zip(loaded, frames):
+        assert np.array_equal(stored, original)
+
+    # What the apply endpoint does with them
+    assert EnhancedPeopleDetectionPipeline().bootstrap_background(loaded)
+    assert store.load('cam-2') == []
+
+    print("✅ Reference capture/apply round trip")
+    return True
+
+def test_save_replaces_clip():
+    """A new capture replaces the old clip and keeps at most max_frames"""
+    store = ReferenceBackgroundStore(tempfile.mkdtemp(), max_frames=4)
+    first = [frame[:240, :320] for frame in booth_frames(3, seed=1)]
+    second = [frame[:240, :320] for frame in booth_frames(9, seed=2)]
+
+    assert store.save('cam-1', first) == 3
+    assert store.save('cam-1', second) == 4
+    loaded = store.load('cam-1')
+    assert len(loaded) == 4
+    assert np.array_equal(loaded[0], second[5])
+    assert store.save('cam-1', []) == 0
+    assert len(store.load('cam-1')) == 4  # An empty capture keeps the old clip
+
+    print("✅ Reference clip replacement")
+    return True
+
+def test_bootstrap_learns_empty_booth():
+    """After seeding, the empty booth is background instead of foreground"""
+    frames = [cv2.resize(frame, (320, 240)) for frame in booth_frames(6)]
+    probe = cv2.cvtColor(frames[-1], cv2.COLOR_BGR2GRAY)
+
+    def foreground(detector):
+        mask = detector.bg_subtractor_mog2.apply(probe, learningRate=0)
+        return np.count_nonzero(mask == 255) / mask.size
+
+    fresh = EnhancedPeopleDetectionPipeline().enhanced_people_detector
+    fresh.bg_subtractor_mog2.apply(np.zeros_like(probe), learningRate=1.0)
+    seeded = EnhancedPeopleDetectionPipeline().enhanced_people_detector
+    assert seeded.bootstrap_background(frames)
+
+    assert foreground(fresh) > 0.5
+    assert foreground(seeded) < 0.01
+
+    print("✅ Background seeded from the reference clip")
+    return True
+
+if __name__ == "__main__":
+    test_frame_count_validation()
+    test_capture_apply_round_trip()
+    test_save_replaces_clip()
+    test_bootstrap_learns_empty_booth()
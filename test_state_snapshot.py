@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Test script for detector-state snapshots
+Tests the export/import round trip through a snapshot file and rejecting
+missing, corrupt, other-version and other-layout snapshots
+"""
+
+import numpy as np
+import cv2
+import sys
+import os
+import time
+import tempfile
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+import backend.state_snapshot as state_snapshot
+from backend.state_snapshot import save_snapshot, load_snapshot, PeriodicSnapshotter
+from backend.models_enhanced_people import EnhancedPeopleDetectionPipeline
+
+ZONES = [{'name': 'atm_fascia', 'polygon': [[0.5, 0.2], [0.9, 0.2], [0.9, 0.9], [0.5, 0.9]], 'dwell_seconds': 5}]
+
+def warm_pipeline(frames=15):
+    """A pipeline that has seen a person walk up to the ATM"""
+    pipeline = EnhancedPeopleDetectionPipeline(zones=ZONES)
+    for i in range(frames):
+        frame = np.full((480, 640, 3), 100, dtype=np.uint8)
+        if i >= 5:
+            x = 200 + 20 * (i - 5)
+            cv2.rectangle(frame, (x, 120), (x + 80, 420), (30, 60, 200), -1)
+        pipeline.process_frame(frame, timestamp=float(i) * 0.5)
+    return pipeline
+
+def assert_state_equal(a, b, path='state'):
+    """Compare exported states; tuples and lists compare equal as they do after JSON"""
+    if isinstance(a, np.ndarray) or isinstance(b, np.ndarray):
+        assert np.array_equal(np.asarray(a), np.asarray(b)), path
+        assert np.asarray(a).dtype == np.asarray(b).dtype, path
+    elif isinstance(a, dict):
+        assert isinstance(b, dict) and set(a) == set(b), path
+        for key in a:
+            assert_state_equal(a[key], b[key], f"{path}/{key}")
+    elif isinstance(a, (list, tuple)):
+        assert isinstance(b, (list, tuple)) and len(a) == len(b), path
+        for i, (x, y) in enumerate(zip(a, b)):
+            assert_state_equal(x, y, f"{path}[{i}]")
+    else:
+        assert a == b, (path, a, b)
+
+def test_export_import_round_trip():
+    """A restored pipeline exports exactly the state that was saved"""
+    path = os.path.join(tempfile.mkdtemp(), 'cam-1.npz')
+    pipeline = warm_pipeline()
+    state = pipeline.export_state()
+    assert save_snapshot(path, state, pipeline.state_signature())
+
+    restored = EnhancedPeopleDetectionPipeline(zones=ZONES)
+    loaded = load_snapshot(path, restored.state_signature())
+    assert loaded is not None
+    restored.import_state(loaded)
+    assert_state_equal(state, restored.export_state())
+
+    # Restored pipelines keep processing frames
+    frame = np.full((480, 640, 3), 100, dtype=np.uint8)
+    assert restored.process_frame(frame, timestamp=8.0) is not None
+
+    print("✅ Snapshot export/import round trip")
+    return True
+
+def test_periodic_snapshot_restore():
+    """Forced snapshots are written in the background and restored by camera id"""
+    snapshotter = PeriodicSnapshotter(tempfile.mkdtemp(), interval=30.0)
+    pipeline = warm_pipeline()
+    assert snapshotter.maybe_snapshot('cam-1', pipeline, force=True)
+    deadline = time.time() + 5.0
+    while snapshotter.writing and time.time() < deadline:
+        time.sleep(0.01)
+    assert not snapshotter.writing
+    assert not snapshotter.maybe_snapshot('cam-1', pipeline)  # Interval not elapsed
+
+    restored = EnhancedPeopleDetectionPipeline(zones=ZONES)
+    assert snapshotter.restore('cam-1', restored)
+    assert_state_equal(pipeline.export_state(), restored.export_state())
+    assert not snapshotter.restore('cam-2', EnhancedPeopleDetectionPipeline(zones=ZONES))
+
+    print("✅ Periodic snapshot restore")
+    return True
+
+def test_snapshot_now_after_pending_write():
+    """Final snapshots wait for a pending background write, then save the newer state synchronously"""
+    snapshotter = PeriodicSnapshotter(tempfile.mkdtemp(), interval=30.0)
+    pipeline = warm_pipeline()
+    assert snapshotter.maybe_snapshot('cam-1', pipeline, force=True)
+
+    # Newer state while the background write may still be pending
+    frame = np.full((480, 640, 3), 100, dtype=np.uint8)
+    pipeline.process_frame(frame, timestamp=8.0)
+    assert snapshotter.snapshot_now('cam-1', pipeline)
+    assert not snapshotter.writing
+    assert snapshotter.wait_for_writes(timeout=1.0)
+
+    restored = EnhancedPeopleDetectionPipeline(zones=ZONES)
+    assert snapshotter.restore('cam-1', restored)
+    assert_state_equal(pipeline.export_state(), restored.export_state())
+
+    # A write that never finishes is not overwritten
+    snapshotter.writing.add('cam-2')
+    assert not snapshotter.snapshot_now('cam-2', pipeline, timeout=0.05)
+    assert not snapshotter.wait_for_writes(timeout=0.05)
+    assert not os.path.exists(snapshotter.snapshot_path('cam-2'))
+
+    print("✅ Synchronous final snapshot")
+    return True
+
+def test_rejects_other_version():
+    """Snapshots written by another state layout version are not loaded"""
+    path = os.path.join(tempfile.mkdtemp(), 'cam-1.npz')
+    pipeline = warm_pipeline(frames=3)
+    signature = pipeline.state_signature()
+
+    current = state_snapshot.SNAPSHOT_VERSION
+    state_snapshot.SNAPSHOT_VERSION = current + 1
+    try:
+        assert save_snapshot(path, pipeline.export_state(), signature)
+    finally:
+        state_snapshot.SNAPSHOT_VERSION = current
+
+    assert load_snapshot(path, signature) is None
+
+    print("✅ Snapshot version mismatch rejected")
+    return True
+
+def test_rejects_other_signature():
+    """Snapshots of another detector layout (zones, pipeline) are not loaded"""
+    path = os.path.join(tempfile.mkdtemp(), 'cam-1.npz')
+    pipeline = warm_pipeline(frames=3)
+    assert save_snapshot(path, pipeline.export_state(), pipeline.state_signature())
+    assert load_snapshot(path, pipeline.state_signature()) is not None
+
+    other_zones = [dict(ZONES[0], name='entrance')]
+    for other in (EnhancedPeopleDetectionPipeline(), EnhancedPeopleDetectionPipeline(zones=other_zones)):
+        assert load_snapshot(path, other.state_signature()) is None
+        assert not PeriodicSnapshotter(os.path.dirname(path)).restore('cam-1', other)
+
+    print("✅ Snapshot signature mismatch rejected")
+    return True
+
+def test_rejects_missing_or_corrupt():
+    """Missing and corrupt files load as None instead of raising"""
+    directory = tempfile.mkdtemp()
+    signature = EnhancedPeopleDetectionPipeline().state_signature()
+    assert load_snapshot(os.path.join(directory, 'missing.npz'), signature) is None
+
+    path = os.path.join(directory, 'corrupt.npz')
+    with open(path, 'wb') as f:
+        f.write(b'not a snapshot')
+    assert load_snapshot(path, signature) is None
+
+    print("✅ Missing and corrupt snapshots rejected")
+    return True
+
+if __name__ == "__main__":
+    test_export_import_round_trip()
+    test_periodic_snapshot_restore()
+    test_snapshot_now_after_pending_write()
+    test_rejects_other_version()
+    test_rejects_other_signature()
+    test_rejects_missing_or_corrupt()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Test script for the WebSocket frame stream protocol
+Tests sequence-numbered frame messages and compact result messages
+"""
+
+import json
+import sys
+import os
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from backend.stream_protocol import parse_frame_message, pack_frame_message, pack_result, pack_error
+
+def test_frame_round_trip():
+    """Sequence number and image bytes survive a pack/parse round trip"""
+    jpeg = b'\xff\xd8\xff\xe0fake-jpeg\xff\xd9'
+    sequence, payload = parse_frame_message(pack_frame_message(70000, jpeg))
+    assert sequence == 70000
+    assert bytes(payload) == jpeg
+
+    # Sequence numbers wrap at 32 bits
+    sequence, _ = parse_frame_message(pack_frame_message(2 ** 32 + 5, jpeg))
+    assert sequence == 5
+
+    print("✅ Frame message round trip")
+    return True
+
+def test_malformed_frames():
+    """Text, empty and header-only messages are rejected"""
+    assert parse_frame_message('config') is None
+    assert parse_frame_message(b'') is None
+    assert parse_frame_message(b'\x00\x00\x00\x01') is None
+
+    print("✅ Malformed frame messages")
+    return True
+
+def test_result_messages():
+    """Results and errors are compact JSON carrying the sequence number"""
+    message = pack_result(3, {'people_count': 1, 'alerts': []})
+    assert ' ' not in message
+    decoded = json.loads(message)
+    assert decoded['type'] == 'result' and decoded['seq'] == 3
+    assert decoded['results']['people_count'] == 1
+
+    decoded = json.loads(pack_error(None, 'Malformed frame message'))
+    assert decoded['type'] == 'error' and decoded['seq'] is None
+
+    print("✅ Result messages")
+    return True
+
+if __name__ == "__main__":
+    test_frame_round_trip()
+    test_malformed_frames()
+    test_result_messages()
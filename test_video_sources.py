@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Test script for server-side video sources
+Tests file sampling, downscaling and looping without a browser in the loop
+"""
+
+import cv2
+import numpy as np
+import tempfile
+import time
+import sys
+import os
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from backend.pipeline_registry import PipelineRegistry
+from backend.video_sources import VideoSourceManager, validate_source_uri
+
+class RecordingPipeline:
+    """Stand-in pipeline that records the frame sizes it receives"""
+
+    def __init__(self):
+        self.frame_sizes = []
+
+    def min_input_resolution(self):
+        return 320, 240
+
+def create_test_video(path, frames=50, fps=25, width=1280, height=720):
+    """Write a short synthetic video file"""
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'MJPG'), fps, (width, height))
+    for i in range(frames):
+        frame = np.full((height, width, 3), i * 5 % 255, dtype=np.uint8)
+        writer.write(frame)
+    writer.release()
+
+def create_registry():
+    def process(camera_id, pipeline, frame, timestamp=None):
+        pipeline.frame_sizes.append(frame.shape[:2])
+        return {'frames': len(pipeline.frame_sizes)}
+
+    return PipelineRegistry(lambda camera_id: RecordingPipeline(), process, queue_capacity=50)
+
+def wait_for(source, status, timeout=10.0):
+    deadline = time.time() + timeout
+    while source.status != status and time.time() < deadline:
+        time.sleep(0.05)
+    return source.status == status
+
+def test_file_source_samples_at_fps():
+    """A 2s file at 25fps read at 5fps submits ~10 downscaled frames, then finishes"""
+    path = os.path.join(tempfile.mkdtemp(), 'clip.avi')
+    create_test_video(path)
+
+    registry = create_registry()
+    manager = VideoSourceManager(registry.get)
+    source = manager.start(path, camera_id='lobby', fps=5)
+
+    assert wait_for(source, 'finished')
+    camera = registry.get('lobby')
+    camera.frame_queue.wait_for_result(camera.frame_queue.next_sequence - 1, timeout=2.0)
+
+    info = source.get_info()
+    assert info['frames_submitted'] == 10
+    assert camera.pipeline.frame_sizes[0][0] == 240
+    registry.shutdown()
+
+    print("✅ File source sampling and downscaling")
+    return True
+
+def test_looping_source_can_be_stopped():
+    """A looping file keeps feeding its camera until it is stopped"""
+    path = os.path.join(tempfile.mkdtemp(), 'clip.avi')
+    create_test_video(path, frames=10)
+
+    registry = create_registry()
+    manager = VideoSourceManager(registry.get)
+    source = manager.start(path, fps=25, loop=True)
+    time.sleep(1.0)
+
+    info = manager.stop(source.source_id)
+    assert info['status'] == 'stopped'
+    assert info['frames_submitted'] > 10
+    assert info['camera_id'] == source.source_id
+    assert manager.list_sources() == []
+    registry.shutdown()
+
+    print("✅ Looping source stop")
+    return True
+
+def test_source_validation():
+    """Missing files are rejected up front; devices and stream URLs are accepted"""
+    assert validate_source_uri('/no/such/video.mp4') is not None
+    assert validate_source_uri('') is not None
+    assert validate_source_uri('0') is None
+    assert validate_source_uri('rtsp://camera.local/stream') is None
+
+    print("✅ Source validation")
+    return True
+
+if __name__ == "__main__":
+    test_file_source_samples_at_fps()
+    test_looping_source_can_be_stopped()
+    test_source_validation()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Test script for the write-behind event and stats buffer
+Tests batching, stats aggregation, retry after a failed flush and
+independent retries of events and stats
+"""
+
+import time
+import sys
+import os
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from backend.write_behind import WriteBehindBuffer
+
+def test_batches_by_size_and_interval():
+    """Events reach the database in batches, not one round trip per frame"""
+    batches = []
+    buffer = WriteBehindBuffer(lambda events, stats: batches.append((events, stats)),
+                               interval=0.2, max_records=10)
+    buffer.start()
+
+    for i in range(25):
+        buffer.add_event({'event_type': 'helmet', 'n': i})
+    time.sleep(0.5)
+    buffer.stop()
+
+    flushed = [event['n'] for events, _ in batches for event in events]
+    assert flushed == list(range(25))
+    assert len(batches) <= 4
+    assert buffer.get_stats()['events_flushed'] == 25
+    assert buffer.get_stats()['backlog_events'] == 0
+
+    print(f"✅ Batched flushes ({len(batches)} flushes for 25 events)")
+    return True
+
+def test_stats_are_summed():
+    """Per-frame counter increments become one update per day"""
+    batches = []
+    buffer = WriteBehindBuffer(lambda events, stats: batches.append(stats), interval=10)
+
+    for _ in range(100):
+        buffer.add_stats('2024-05-01', {'people_count': 2, 'helmet_violations': 1})
+    buffer.add_stats('2024-05-02', {'people_count': 1})
+    buffer.flush()
+
+    assert batches == [{'2024-05-01': {'people_count': 200, 'helmet_violations': 100},
+                        '2024-05-02': {'people_count': 1}}]
+
+    print("✅ Stats aggregation")
+    return True
+
+def test_failed_flush_is_retried():
+    """A failed batch is kept, in order, ahead of newer writes"""
+    attempts = []
+
+    def flaky_flush(events, stats):
+        attempts.append([event['n'] for event in events])
+        if len(attempts) == 1:
+            raise ConnectionError('database unavailable')
+
+    buffer = WriteBehindBuffer(flaky_flush, interval=10)
+    buffer.add_event({'n': 1})
+    buffer.add_stats('2024-05-01', {'people_count': 1})
+    buffer.flush()
+    assert buffer.get_stats()['errors'] == 1
+    assert buffer.get_stats()['backlog_events'] == 1
+
+    buffer.add_event({'n': 2})
+    buffer.flush()
+    assert attempts == [[1], [1, 2]]
+    assert buffer.get_stats()['backlog_events'] == 0
+
+    print("✅ Retry after failed flush")
+    return True
+
+def test_failed_stats_do_not_block_events():
+    """With a separate stats writer, only the failed part of a flush is retried"""
+    written = []
+    stats_attempts = []
+
+    def failing_stats(stats):
+        stats_attempts.append(stats)
+        if len(stats_attempts) < 3:
+            raise RuntimeError('ON CONFLICT clause does not match any PRIMARY KEY or UNIQUE constraint')
+
+    buffer = WriteBehindBuffer(lambda events, stats: written.extend(event['n'] for event in events),
+                               interval=10, flush_stats=failing_stats)
+    for n in range(3):
+        buffer.add_event({'n': n})
+        buffer.add_stats('2024-05-01', {'people_count': 1})
+        buffer.flush()
+
+    # Every event was written exactly once while the stats kept failing
+    assert written == [0, 1, 2]
+    metrics = buffer.get_stats()
+    assert metrics['events_flushed'] == 3 and metrics['backlog_events'] == 0
+    assert metrics['errors'] == 2 and metrics['stats_flushed'] == 1
+    # Increments from the failed attempts were carried over, not lost
+    assert stats_attempts[-1] == {'2024-05-01': {'people_count': 3}}
+    assert metrics['backlog_stats'] == 0 and metrics['last_error'] is None
+
+    print("✅ Failed stats do not block events")
+    return True
+
+if __name__ == "__main__":
+    test_batches_by_size_and_interval()
+    test_stats_are_summed()
+    test_failed_flush_is_retried()
+    test_failed_stats_do_not_block_events()
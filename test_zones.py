@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Test script for zone-based dwell-time loitering detection
+Tests zone membership, dwell accumulation and reset across frames,
+the decaying heatmap and loading zone configs
+"""
+
+import numpy as np
+import json
+import sys
+import os
+import tempfile
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from backend.zones import ZoneDwellEngine, load_zone_config
+
+# Two side-by-side zones on a 320x240 frame: the ATM fascia on the right, the door on the left
+ZONES = [
+    {'name': 'atm_fascia', 'polygon': [[0.5, 0.0], [1.0, 0.0], [1.0, 1.0], [0.5, 1.0]], 'dwell_seconds': 5},
+    {'name': 'door', 'polygon': [[0.0, 0.0], [0.25, 0.0], [0.25, 1.0], [0.0, 1.0]]}
+]
+
+def empty_mask():
+    return np.zeros((240, 320), dtype=np.uint8)
+
+def person_mask(x0, x1, value=255):
+    mask = empty_mask()
+    mask[40:220, x0:x1] = value
+    return mask
+
+def test_zone_membership():
+    """Polygons rasterize to labels; foreground and track points mark zones occupied"""
+    engine = ZoneDwellEngine(ZONES, default_dwell_seconds=30)
+    assert engine.zone_names == ['atm_fascia', 'door']
+    assert engine.labels[120, 250] == 1 and engine.labels[120, 40] == 2 and engine.labels[120, 120] == 0
+    assert list(engine.dwell_limits_ms[1:]) == [5000, 30000]
+
+    # Foreground over the fascia only
+    engine.update(person_mask(170, 310), 0.0)
+    engine.update(person_mask(170, 310), 1.0)
+    stats = {zone['name']: zone for zone in engine.get_zone_stats()}
+    assert stats['atm_fascia']['occupancy'] > 0.5 and stats['atm_fascia']['dwell_seconds'] == 1.0
+    assert stats['door']['occupancy'] == 0.0 and stats['door']['dwell_seconds'] == 0.0
+
+    # Shadows (127) are not foreground
+    shadows = ZoneDwellEngine(ZONES)
+    shadows.update(person_mask(170, 310, value=127), 0.0)
+    shadows.update(person_mask(170, 310, value=127), 1.0)
+    assert shadows.dwell_seconds(0) == 0.0
+
+    # A tracked person marks their zone occupied without foreground
+    tracked = ZoneDwellEngine(ZONES)
+    tracked.update(empty_mask(), 0.0, points=[(40, 120)])
+    tracked.update(empty_mask(), 2.0, points=[(40, 120)])
+    assert tracked.dwell_seconds(1) == 2.0 and tracked.dwell_seconds(0) == 0.0
+
+    # Masks at another resolution are resized to the zone grid
+    scaled = ZoneDwellEngine(ZONES)
+    large = np.zeros((480, 640), dtype=np.uint8)
+    large[80:440, 340:620] = 255
+    scaled.update(large, 0.0)
+    scaled.update(large, 1.0)
+    assert scaled.dwell_seconds(0) == 1.0
+
+    print("✅ Zone membership")
+    return True
+
+def test_dwell_accumulation():
+    """Dwell grows with elapsed time, survives short gaps and resets after the grace period"""
+    engine = ZoneDwellEngine(ZONES, absence_grace=3.0)
+    t = 0.0
+    for _ in range(13):  # 6 seconds at 2 fps
+        engine.update(person_mask(170, 310), t)
+        t += 0.5
+    assert abs(engine.dwell_seconds(0) - 6.0) < 1e-9
+    assert engine.is_loitering(0) and not engine.is_loitering(1)
+    assert engine.loitering_zones() == [('atm_fascia', 6.0)]
+
+    # Stepping out of view for less than the grace period keeps the dwell time
+    for _ in range(4):
+        engine.update(empty_mask(), t)
+        t += 0.5
+    assert engine.dwell_seconds(0) == 6.0
+    engine.update(person_mask(170, 310), t)
+    assert engine.dwell_seconds(0) == 6.5
+
+    # Leaving for longer resets it
+    t += 0.5
+    while t < 13.0:
+        engine.update(empty_mask(), t)
+        t += 0.5
+    assert engine.dwell_seconds(0) == 0.0 and not engine.is_loitering(0)
+    assert engine.loitering_zones() == []
+
+    # Time going backwards adds nothing
+    engine.update(person_mask(170, 310), t)
+    dwell = engine.dwell_seconds(0)
+    engine.update(person_mask(170, 310), t - 5.0)
+    assert engine.dwell_seconds(0) == dwell
+
+    # A long gap between two occupied frames credits at most the grace period
+    stalled = ZoneDwellEngine(ZONES, absence_grace=3.0)
+    stalled.update(person_mask(170, 310), 0.0)
+    stalled.update(person_mask(170, 310), 600.0)
+    assert stalled.dwell_seconds(0) == 3.0 and not stalled.is_loitering(0)
+    stalled.update(person_mask(170, 310), 600.5)
+    assert stalled.dwell_seconds(0) == 3.5
+
+    print("✅ Dwell accumulation across frames")
+    return True
+
+def test_heatmap():
+    """The heatmap saturates where foreground persists and decays where it left"""
+    engine = ZoneDwellEngine(ZONES, heatmap_decay_shift=4)
+    mask = person_mask(170, 310)
+    for i in range(200):
+        engine.update(mask, i * 0.1)
+
+    image = engine.heatmap_image()
+    assert image.dtype == np.uint8 and image.shape == (240, 320)
+    assert image[120, 250] >= 250
+    assert image[120, 40] == 0 and image[10, 250] == 0
+
+    for i in range(200, 212):
+        engine.update(empty_mask(), i * 0.1)
+    faded = engine.heatmap_image()
+    assert 0 < faded[120, 250] < image[120, 250] // 2
+
+    for i in range(212, 400):
+        engine.update(empty_mask(), i * 0.1)
+    assert engine.heatmap_image().max() < 16
+
+    print("✅ Decaying heatmap")
+    return True
+
+def test_load_zone_config():
+    """Zone configs load per camera; missing or broken files mean no zones"""
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, 'zones.json')
+    with open(path, 'w') as f:
+        json.dump({'cam-1': ZONES}, f)
+    assert load_zone_config(path) == {'cam-1': ZONES}
+    assert load_zone_config(os.path.join(directory, 'missing.json')) == {}
+    assert load_zone_config(None) == {}
+
+    broken = os.path.join(directory, 'broken.json')
+    with open(broken, 'w') as f:
+        f.write('{"cam-1": [')
+    assert load_zone_config(broken) == {}
+
+    print("✅ Zone config loading")
+    return True
+
+if __name__ == "__main__":
+    test_zone_membership()
+    test_dwell_accumulation()
+    test_heatmap()
+    test_load_zone_config()